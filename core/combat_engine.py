@@ -1,42 +1,201 @@
 # core/combat_engine.py
-import random
 import re
 # Cambiar importaciones relativas a absolutas
 from core.dice import Dice
+from core.effect_scheduler import EffectScheduler, expiry_key, turns_until
+from core.rng import CombatRNG
+from core.undo import UndoHistory, undoable
 from persistence.combat_logger import CombatLogger
+from persistence.event_log import EventLog
 
 class CombatEngine:
     """Clase para manejar mecánicas y flujo de combate."""
     
-    def __init__(self):
+    def __init__(self, logger=None, rng=None, events=None, undo=True, replay=True):
         self.characters = []
         self.monsters = []
         self.initiative_order = []
         self.current_turn_index = 0
         self.round_number = 0
         self.combat_active = False
-        self.logger = CombatLogger()
+        self.logger = logger if logger is not None else CombatLogger()
+        # Generador propio: combates simultáneos en un proceso no se interfieren
+        self.rng = rng if rng is not None else CombatRNG()
+        # Registro estructurado de eventos (ver persistence.event_log)
+        self.events = events if events is not None else EventLog()
+        # Con False no se construye el texto detallado de los ataques (simulaciones)
+        self.render_text = True
+        # Función opcional llamada con el motor tras cada next_turn (autoguardado)
+        self.autosave = None
+        # Deshacer/rehacer por deltas (ver core.undo); undo=False lo desactiva
+        self.history = UndoHistory() if undo else None
+        # Vencimientos de efectos por (ronda, posición en la iniciativa)
+        self.effect_schedule = EffectScheduler()
+        self._positions = {}
+        self._positions_order = None
+        # Semilla, estado inicial y acciones del combate actual (ver core.replay);
+        # replay=False no guarda estado inicial ni acciones (simulaciones)
+        self.replay = replay
+        self.combat_seed = None
+        self.initial_state = None
+        self.action_log = []
     
     def add_character(self, character):
         """Añadir un personaje al combate."""
         self.characters.append(character)
+        character.journal = self.history
         self.logger.log(f"Personaje añadido: {character.name}")
         return f"{character.name} se une a la batalla!"
     
     def add_monster(self, monster):
         """Añadir un monstruo al combate."""
         self.monsters.append(monster)
+        monster.journal = self.history
         self.logger.log(f"Monstruo añadido: {monster.name}")
         return f"{monster.name} aparece!"
     
-    def start_combat(self):
-        """Iniciar un nuevo encuentro de combate."""
+    def fork(self, logger=None, events=None):
+        """
+        Crear un motor independiente con el mismo estado de combate.
+        
+        Pensado para anticipar jugadas (IA, "¿qué pasaría si...?"): las entidades
+        se copian con Entity.clone, que comparte los datos fijos y solo duplica
+        el estado que cambia en combate, y el generador sigue la misma secuencia
+        sin afectar al original. La copia no registra nada ni se autoguarda salvo
+        que se le pasen un logger o un registro de eventos.
+        
+        Args:
+            logger (CombatLogger, optional): Registro de la copia. Por defecto desactivado.
+            events (EventLog, optional): Registro de eventos de la copia. Por defecto desactivado.
+        
+        Returns:
+            CombatEngine: La copia.
+        """
+        engine = CombatEngine.__new__(CombatEngine)
+        engine.__dict__.update(self.__dict__)
+        
+        clones = {id(entity): entity.clone() for entity in self.characters + self.monsters}
+        engine.characters = [clones[id(char)] for char in self.characters]
+        engine.monsters = [clones[id(monster)] for monster in self.monsters]
+        engine.initiative_order = [clones[id(entity)] for entity in self.initiative_order]
+        
+        engine.rng = self.rng.fork()
+        engine.logger = logger if logger is not None else CombatLogger(log_file=None)
+        engine.events = events if events is not None else EventLog(log_file=None)
+        engine.render_text = logger is not None
+        engine.autosave = None
+        engine.history = UndoHistory() if self.history is not None else None
+        for clone in clones.values():
+            clone.journal = engine.history
+        engine.effect_schedule = EffectScheduler()
+        engine.rebuild_effect_schedule()
+        # initial_state no se modifica nunca, así que se comparte
+        engine.action_log = list(self.action_log)
+        return engine
+    
+    def attach_history(self):
+        """Conectar al historial de deshacer las entidades asignadas directamente (p. ej. al cargar)."""
+        for entity in self.characters + self.monsters:
+            entity.journal = self.history
+    
+    def rebuild_effect_schedule(self):
+        """Reconstruir la cola de vencimientos desde los efectos (al cargar, deshacer o bifurcar)."""
+        self.effect_schedule.rebuild(self.characters + self.monsters)
+    
+    def _refresh_effects(self):
+        """Recalcular lo que se deriva de las listas de efectos tras deshacer o rehacer."""
+        for entity in self.characters + self.monsters:
+            entity.refresh_modifiers()
+        self.rebuild_effect_schedule()
+    
+    def undo(self):
+        """Deshacer la última acción del combate."""
+        label = self.history.undo() if self.history is not None else None
+        if label is None:
+            return "No hay acciones para deshacer."
+        
+        self._refresh_effects()
+        self.logger.log(f"Acción deshecha: {label}")
+        return f"Acción deshecha: {label}"
+    
+    def redo(self):
+        """Rehacer la última acción deshecha."""
+        label = self.history.redo() if self.history is not None else None
+        if label is None:
+            return "No hay acciones para rehacer."
+        
+        self._refresh_effects()
+        self.logger.log(f"Acción rehecha: {label}")
+        return f"Acción rehecha: {label}"
+    
+    def get_entity_ref(self, entity):
+        """
+        Obtener una referencia serializable a una entidad del combate.
+        
+        Returns:
+            list: ["character", índice] o ["monster", índice], o None si la entidad
+                  no participa en el combate.
+        """
+        for i, char in enumerate(self.characters):
+            if char is entity:
+                return ["character", i]
+        for i, monster in enumerate(self.monsters):
+            if monster is entity:
+                return ["monster", i]
+        return None
+    
+    def get_entity(self, ref):
+        """Obtener la entidad a partir de una referencia de get_entity_ref."""
+        if ref is None:
+            return None
+        entity_type, index = ref
+        if entity_type == "character":
+            return self.characters[index]
+        return self.monsters[index]
+    
+    def _record(self, action, **fields):
+        """Añadir una acción al registro del combate actual."""
+        if not self.replay:
+            return
+        entry = {"round": self.round_number, "action": action}
+        entry.update(fields)
+        self.action_log.append(entry)
+    
+    def _snapshot_state(self):
+        """
+        Estado inicial de las entidades para repetir el combate.
+        
+        to_dict ya crea diccionarios nuevos; solo se copian los contenedores
+        que comparte con la entidad y que pueden cambiar después: los espacios
+        de conjuro (se gastan en combate), las habilidades y el arma.
+        """
+        state = {"characters": [], "monsters": []}
+        for key, entities in (("characters", self.characters), ("monsters", self.monsters)):
+            for entity in entities:
+                data = entity.to_dict()
+                data["spell_slots"] = dict(data["spell_slots"])
+                data["abilities"] = list(data["abilities"])
+                if data.get("weapon") is not None:
+                    data["weapon"] = dict(data["weapon"])
+                state[key].append(data)
+        return state
+    
+    def start_combat(self, seed=None):
+        """
+        Iniciar un nuevo encuentro de combate.
+        
+        Args:
+            seed (int, optional): Semilla del encuentro. Si es None se toma del
+                generador del motor; la semilla usada queda en combat_seed.
+        """
         if not self.characters:
             return "¡No hay personajes disponibles para el combate!"
         
         if not self.monsters:
             return "¡No hay monstruos disponibles para el combate!"
         
+        # Los efectos que queden del combate anterior vuelven a contar por turnos restantes
+        self._release_effects()
         self.combat_active = True
         self.round_number = 0
         self.initiative_order = []
@@ -45,22 +204,39 @@ class CombatEngine:
         for entity in self.characters + self.monsters:
             entity.initiative_roll = 0
         
+        # Cada encuentro tiene su semilla: con ella y action_log se puede repetir
+        self.combat_seed = seed if seed is not None else self.rng.randint(0, 2 ** 63 - 1)
+        self.rng.reseed(self.combat_seed)
+        self.initial_state = self._snapshot_state() if self.replay else None
+        self.action_log = []
+        # Los d20 forzados antes del combate siguen pendientes y la repetición los necesita
+        if self.rng.forced_d20:
+            self._record("force_d20", values=list(self.rng.forced_d20))
+        if self.history is not None:
+            self.history.clear()
+        
+        self.logger.start_encounter()
         self.logger.log("Combate iniciado")
         return "¡Combate iniciado! Tira por iniciativa."
     
+    @undoable
     def roll_initiative(self):
         """Tirar iniciativa para todas las entidades y ordenar el orden de iniciativa."""
         if not self.combat_active:
             return "¡El combate no ha comenzado aún!"
         
+        self._record("roll_initiative")
+        self._release_effects()
         self.initiative_order = []
         all_entities = self.characters + self.monsters
         
         # Tirar iniciativa para cada entidad que no ha tirado aún
         for entity in all_entities:
             if entity.initiative_roll == 0:
-                initiative_die_roll = random.randint(1, 20)
+                initiative_die_roll = self.rng.randint(1, 20)
                 initiative_total = entity.roll_initiative(initiative_die_roll)
+                self.events.emit("initiative", entity=entity.name, roll=initiative_die_roll,
+                                 modifier=entity.initiative_mod, total=initiative_total)
                 self.logger.log(f"{entity.name} tira iniciativa: {initiative_die_roll} + {entity.initiative_mod} = {initiative_total}")
         
         # Ordenar entidades por iniciativa (descendente)
@@ -76,12 +252,84 @@ class CombatEngine:
         # Iniciar la primera ronda
         self.round_number = 1
         
+        # Programar el vencimiento de los efectos que ya tengan las entidades
+        for entity in self.initiative_order:
+            for effect in entity.effects:
+                self.schedule_effect(entity, effect)
+        
         # Crear resumen de iniciativa
         result = "Orden de iniciativa:\n"
         for i, entity in enumerate(self.initiative_order, 1):
             result += f"{i}. {entity.name}: {entity.initiative_roll}\n"
         
         self.logger.log(f"Ronda {self.round_number} iniciada, iniciativa tirada")
+        self.events.emit("turn_start", round=self.round_number, entity=self.initiative_order[0].name)
+        return result
+    
+    def _initiative_position(self, entity):
+        """Posición de una entidad en el orden de iniciativa, o None si no está."""
+        # El orden se sustituye entero (tirada, carga, deshacer), nunca se modifica en su sitio
+        if self._positions_order is not self.initiative_order or len(self._positions) != len(self.initiative_order):
+            self._positions = {id(e): i for i, e in enumerate(self.initiative_order)}
+            self._positions_order = self.initiative_order
+        return self._positions.get(id(entity))
+    
+    def schedule_effect(self, entity, effect):
+        """
+        Programar el vencimiento de un efecto recién aplicado a una entidad.
+        
+        El efecto termina al empezar el turno de la entidad en que se agotan
+        sus turnos restantes. Los efectos permanentes, y los aplicados fuera
+        de un combate con iniciativa, no se programan.
+        
+        Args:
+            entity (Entity): Entidad afectada.
+            effect (Effect): Efecto ya añadido a entity.effects.
+        """
+        if effect.duration == -1 or not self.combat_active:
+            return
+        
+        position = self._initiative_position(entity)
+        if position is None:
+            return
+        
+        now = (self.round_number, self.current_turn_index)
+        self.effect_schedule.schedule(entity, effect, expiry_key(now, position, max(1, effect.remaining_turns)))
+    
+    def effect_remaining_turns(self, effect):
+        """Turnos restantes de un efecto, contando los que ya han pasado en el combate."""
+        if effect.expires_at is None:
+            return effect.remaining_turns
+        return turns_until(effect.expires_at, (self.round_number, self.current_turn_index))
+    
+    def _release_effects(self):
+        """
+        Sacar los efectos de la cola al terminar el combate o volver a tirar iniciativa.
+        
+        Los turnos que quedan se guardan otra vez en remaining_turns, para que
+        el siguiente combate los programe a partir de su propio orden.
+        """
+        for entity in self.characters + self.monsters:
+            for effect in entity.effects:
+                if effect.expires_at is None:
+                    continue
+                
+                old_turns = effect.remaining_turns
+                effect.remaining_turns = self.effect_remaining_turns(effect)
+                old_expires_at, effect.expires_at = effect.expires_at, None
+                if entity.journal is not None:
+                    entity.journal.record_attribute(effect, "remaining_turns", old_turns)
+                    entity.journal.record_attribute(effect, "expires_at", old_expires_at)
+        self.effect_schedule.clear()
+    
+    def _expire_effects(self):
+        """Terminar los efectos que vencen al empezar el turno actual."""
+        result = ""
+        for entity, effect in self.effect_schedule.pop_due((self.round_number, self.current_turn_index)):
+            message = effect.expire(entity)
+            self.logger.log(message)
+            self.events.emit("effect_expired", target=entity.name, effect=effect.name)
+            result += message + "\n"
         return result
     
     def get_current_entity(self):
@@ -91,6 +339,7 @@ class CombatEngine:
         
         return self.initiative_order[self.current_turn_index]
     
+    @undoable
     def next_turn(self):
         """Avanzar al siguiente turno en el orden de iniciativa."""
         if not self.combat_active:
@@ -99,6 +348,14 @@ class CombatEngine:
         if not self.initiative_order:
             return "¡La iniciativa no ha sido tirada aún!"
         
+        self._record("next_turn")
+        result = self._advance_turn()
+        if self.autosave is not None:
+            self.autosave(self)
+        return result
+    
+    def _advance_turn(self):
+        """Avanzar el turno saltando a las entidades derrotadas."""
         # Moverse a la siguiente entidad en el orden de iniciativa
         self.current_turn_index = (self.current_turn_index + 1) % len(self.initiative_order)
         
@@ -110,17 +367,21 @@ class CombatEngine:
         else:
             result = ""
         
+        result += self._expire_effects()
+        
         current_entity = self.get_current_entity()
         result += f"Es el turno de {current_entity.name}"
         
         # Verificar si la entidad está viva
         if not current_entity.is_alive:
             result += f" (Derrotado - se salta su turno)"
-            return self.next_turn()
+            return self._advance_turn()
         
         self.logger.log(f"Turno de {current_entity.name}")
+        self.events.emit("turn_start", round=self.round_number, entity=current_entity.name)
         return result
     
+    @undoable
     def attack(self, attacker, target):
         """Realizar un ataque de una entidad a otra."""
         if not self.combat_active:
@@ -132,17 +393,21 @@ class CombatEngine:
         if not target.is_alive:
             return f"{target.name} ya está derrotado!"
         
+        self._record("attack", actor=self.get_entity_ref(attacker), target=self.get_entity_ref(target))
+        
         # Tirar para atacar
-        attack_roll = random.randint(1, 20)
+        attack_roll = self.rng.randint(1, 20)
         
         # Verificar si es un crítico (20 natural)
         is_critical = attack_roll == 20
+        hp_before = target.current_hp
         
         # Permitir que la entidad ejecute su ataque
         if isinstance(attacker, type(self.characters[0])):  # Si es un personaje
+            attack_bonus = attacker.get_attack_modifier(attacker.weapon)
             # Tirar el daño específico del arma
             damage_dice = attacker.weapon['damage_dice']
-            raw_damage, damage_rolls, damage_mod = Dice.roll(damage_dice)
+            raw_damage, damage_rolls, damage_mod = Dice.roll(damage_dice, rng=self.rng)
             # Si es crítico, duplicar los dados de daño
             if is_critical:
                 raw_damage = sum(damage_rolls) * 2 + damage_mod
@@ -150,83 +415,224 @@ class CombatEngine:
             result = attacker.attack(target, attack_roll)
             
             # Reemplazar el marcador de daño con la tirada real
-            if "¡IMPACTO!" in result:
-                if is_critical:
-                    result = result.replace("¡IMPACTO!", "¡CRÍTICO!") 
-                    
+            is_hit = "¡IMPACTO!" in result
+            if is_hit:
                 damage_mod = attacker.get_damage_modifier(attacker.weapon)
                 total_damage = raw_damage + damage_mod
                 
-                # Reemplazar el placeholder del daño
-                result = re.sub(r"Daño: \d+ \+ \d+ = \d+", 
-                                f"Daño: {'+'.join(map(str, damage_rolls))} ({sum(damage_rolls)}) + {damage_mod} = {total_damage}", 
-                                result)
+                if self.render_text:
+                    if is_critical:
+                        result = result.replace("¡IMPACTO!", "¡CRÍTICO!")
+                    
+                    # Reemplazar el placeholder del daño
+                    result = re.sub(r"Daño: -?\d+ \+ -?\d+ = -?\d+", 
+                                    f"Daño: {'+'.join(map(str, damage_rolls))} ({sum(damage_rolls)}) + {damage_mod} = {total_damage}", 
+                                    result)
                 
                 # Aplicar el daño real al objetivo
                 target.take_damage(total_damage)
         else:  # Si es un monstruo
             # Tirar el daño específico del monstruo
-            raw_damage, damage_rolls, _ = Dice.roll(attacker.damage_dice)
+            attack_bonus = attacker.get_attack_modifier()
+            raw_damage, damage_rolls, _ = Dice.roll(attacker.damage_dice, rng=self.rng)
             # Si es crítico, duplicar los dados de daño
             if is_critical:
-                raw_damage = sum(damage_rolls) * 2 + attacker.damage_bonus
+                raw_damage = sum(damage_rolls) * 2 + attacker.get_damage_modifier()
             
             result = attacker.attack(target, attack_roll)
             
             # Reemplazar el marcador de daño con la tirada real
-            if "¡IMPACTO!" in result:
-                if is_critical:
-                    result = result.replace("¡IMPACTO!", "¡CRÍTICO!")
-                    
-                total_damage = raw_damage + attacker.damage_bonus
+            is_hit = "¡IMPACTO!" in result
+            if is_hit:
+                damage_mod = attacker.get_damage_modifier()
+                total_damage = raw_damage + damage_mod
                 
-                # Reemplazar el placeholder del daño
-                result = re.sub(r"Daño: \d+ \+ \d+ = \d+", 
-                                f"Daño: {'+'.join(map(str, damage_rolls))} ({sum(damage_rolls)}) + {attacker.damage_bonus} = {total_damage}", 
-                                result)
+                if self.render_text:
+                    if is_critical:
+                        result = result.replace("¡IMPACTO!", "¡CRÍTICO!")
+                    
+                    # Reemplazar el placeholder del daño
+                    result = re.sub(r"Daño: -?\d+ \+ -?\d+ = -?\d+", 
+                                    f"Daño: {'+'.join(map(str, damage_rolls))} ({sum(damage_rolls)}) + {damage_mod} = {total_damage}", 
+                                    result)
                 
                 # Aplicar el daño real al objetivo
                 target.take_damage(total_damage)
         
+        self.events.emit("attack", attacker=attacker.name, target=target.name, roll=attack_roll,
+                         bonus=attack_bonus, armor_class=target.get_armor_class(),
+                         hit=is_hit, critical=is_hit and is_critical)
+        if is_hit:
+            # amount incluye el daño provisional que aplica Entity.attack
+            self.events.emit("damage", target=target.name, amount=hp_before - target.current_hp,
+                             dice=damage_rolls, modifier=damage_mod, critical=is_critical,
+                             hp=target.current_hp, max_hp=target.max_hp, source="attack")
+        
         self.logger.log(result)
         return result
     
-    def cast_spell(self, caster, spell_name, target=None):
-        """Hacer que una entidad lance un hechizo."""
+    @undoable
+    def cast_spell(self, caster, spell, target=None, spell_level=None):
+        """
+        Hacer que una entidad lance un hechizo.
+        
+        Args:
+            caster (Entity): Quien lanza el hechizo.
+            spell (Spell | str): El hechizo o su nombre.
+            target (Entity, optional): Objetivo del hechizo.
+            spell_level (int, optional): Nivel al que lanzar el hechizo (para potenciar).
+        """
         if not self.combat_active:
             return "¡El combate no ha comenzado aún!"
         
         if not caster.is_alive:
             return f"{caster.name} está derrotado y no puede lanzar hechizos!"
         
-        # Buscar el hechizo
-        spell = next((s for s in caster.spells if s['name'] == spell_name), None)
-        if not spell:
+        # Buscar el hechizo entre los que conoce el lanzador
+        spell_name = spell if isinstance(spell, str) else spell.name
+        spell_index = next((i for i, s in enumerate(caster.spells)
+                            if s is spell or s.name == spell_name), None)
+        if spell_index is None:
             return f"{caster.name} no conoce el hechizo {spell_name}!"
+        spell = caster.spells[spell_index]
+        
+        self._record("cast_spell", actor=self.get_entity_ref(caster), spell=spell_index,
+                     target=self.get_entity_ref(target), level=spell_level)
+        
+        hp_before = target.current_hp if target else None
+        effects_before = len(target.effects) if target else 0
         
         # Implementar lógica de lanzamiento de hechizos
-        result = caster.cast_spell(spell, target)
+        result = caster.cast_spell(spell, target, spell_level, rng=self.rng)
+        
+        self.events.emit("spell_cast", caster=caster.name, spell=spell.name,
+                         target=target.name if target else None,
+                         level=spell_level or spell.level, base_level=spell.level)
+        if target:
+            for effect in target.effects[effects_before:]:
+                self.schedule_effect(target, effect)
+            self._emit_spell_results(target, hp_before, effects_before)
         
         self.logger.log(result)
         return result
     
+    def _emit_spell_results(self, target, hp_before, effects_before):
+        """Emitir los eventos de daño, curación y efectos que dejó un hechizo."""
+        if not self.events.enabled:
+            return
+        
+        if target.current_hp < hp_before:
+            self.events.emit("damage", target=target.name, amount=hp_before - target.current_hp,
+                             hp=target.current_hp, max_hp=target.max_hp, source="spell")
+        elif target.current_hp > hp_before:
+            self.events.emit("heal", target=target.name, amount=target.current_hp - hp_before,
+                             hp=target.current_hp, max_hp=target.max_hp)
+        
+        for effect in target.effects[effects_before:]:
+            self.events.emit("effect_applied", target=target.name, effect=effect.name,
+                             effect_type=effect.effect_type, duration=effect.duration)
+    
+    @undoable
+    def choose_monster_action(self, monster):
+        """
+        Elegir la acción de un monstruo controlado por el motor.
+        
+        Args:
+            monster (Monster): El monstruo que actúa.
+            
+        Returns:
+            tuple: (spell, target) donde spell es el hechizo a lanzar o None para un
+                   ataque normal, y target es el personaje objetivo o None si no hay objetivos.
+        """
+        self._record("choose_monster_action", actor=self.get_entity_ref(monster))
+        spell = None
+        
+        # Si tiene hechizos, 30% de probabilidad de lanzar uno aleatorio
+        if monster.spells and self.rng.random() < 0.3:
+            spell = self.rng.choice(monster.spells)
+        
+        alive_characters = [char for char in self.characters if char.is_alive]
+        if not alive_characters:
+            return spell, None
+        
+        return spell, self.rng.choice(alive_characters)
+    
+    @undoable
+    def choose_random_enemy(self, entity):
+        """
+        Elegir al azar un enemigo vivo de una entidad con el generador del combate.
+        
+        Returns:
+            Entity: El enemigo elegido, o None si no quedan enemigos vivos.
+        """
+        self._record("choose_random_enemy", actor=self.get_entity_ref(entity))
+        enemies = self.monsters if entity in self.characters else self.characters
+        alive_enemies = [enemy for enemy in enemies if enemy.is_alive]
+        if not alive_enemies:
+            return None
+        return self.rng.choice(alive_enemies)
+    
+    @undoable
+    def force_d20(self, *values):
+        """
+        Forzar los resultados de las siguientes tiradas de d20 (menú de trampas).
+        
+        Sustituye los valores forzados pendientes; sin valores las tiradas vuelven
+        a ser aleatorias. Se registra como acción para que la repetición saque
+        los mismos d20.
+        
+        Args:
+            *values (int): Resultados en el orden en que se tirarán.
+        """
+        self._record("force_d20", values=list(values))
+        self.rng.clear_forced()
+        for value in values:
+            self.rng.force_d20(value)
+    
+    def get_winner(self):
+        """
+        Obtener el bando ganador sin modificar el estado del combate.
+        
+        Returns:
+            str: "monsters" si todos los personajes están derrotados, "characters" si
+                 todos los monstruos están derrotados, o None si el combate sigue.
+        """
+        if all(not char.is_alive for char in self.characters):
+            return "monsters"
+        if all(not monster.is_alive for monster in self.monsters):
+            return "characters"
+        return None
+    
+    @undoable
     def check_combat_status(self):
         """Verificar el estado actual del combate."""
         if not self.combat_active:
             return "No hay un combate activo."
         
+        winner = self.get_winner()
+        
         # Verificar si todos los personajes han sido derrotados
-        all_characters_defeated = all(not char.is_alive for char in self.characters)
+        all_characters_defeated = winner == "monsters"
         if all_characters_defeated:
+            self._record("check_combat_status")
+            self._release_effects()
             self.combat_active = False
             self.logger.log("Combate terminado - Todos los personajes han sido derrotados")
+            self.events.emit("combat_end", winner=winner, round=self.round_number)
+            self.logger.end_encounter()
+            self.events.flush()
             return "¡Todos los personajes han sido derrotados! El combate ha terminado."
         
         # Verificar si todos los monstruos han sido derrotados
-        all_monsters_defeated = all(not monster.is_alive for monster in self.monsters)
+        all_monsters_defeated = winner == "characters"
         if all_monsters_defeated:
+            self._record("check_combat_status")
+            self._release_effects()
             self.combat_active = False
             self.logger.log("Combate terminado - Todos los monstruos han sido derrotados")
+            self.events.emit("combat_end", winner=winner, round=self.round_number)
+            self.logger.end_encounter()
+            self.events.flush()
             return "¡Todos los monstruos han sido derrotados! Victoria para el equipo de aventureros."
         
         # Si el combate sigue activo, mostrar el estado actual
@@ -244,13 +650,19 @@ class CombatEngine:
         
         return result
     
+    @undoable
     def end_combat(self):
         """Terminar el combate actual."""
         if not self.combat_active:
             return "No hay un combate activo para terminar."
         
+        self._record("end_combat")
+        self._release_effects()
         self.combat_active = False
         self.logger.log("Combate terminado manualmente")
+        self.events.emit("combat_end", winner=None, round=self.round_number)
+        self.logger.end_encounter()
+        self.events.flush()
         return "El combate ha finalizado."
     
     def save_state(self, filename):
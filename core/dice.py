@@ -1,50 +1,382 @@
 # core/dice.py
 import random
 import re
+from array import array
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # Sin NumPy las tiradas masivas devuelven array('i')
+    np = None
+
+# Tamaño máximo de la caché de expresiones compiladas
+DICE_CACHE_SIZE = 512
+
+# Un término: dados ("2d6", "d20"), número ("3") o modificador simbólico ("modificador")
+_TERM_PATTERN = re.compile(r"\s*([+-]?)\s*(?:(\d*)d(\d+)|(\d+)|([a-záéíóúñ_]+))\s*")
+
+
+class DiceExpr:
+    """Expresión de dados compilada (ej., "2d6+1d4+3" o "1d8+modificador")."""
+    
+    def __init__(self, notation, terms, modifier, symbols):
+        """
+        Inicializar una expresión ya analizada. Usar DiceExpr.compile en su lugar.
+        
+        Args:
+            notation (str): La notación original normalizada.
+            terms (tuple): Términos de dados como tuplas (signo, número de dados, caras).
+            modifier (int): Suma de los modificadores numéricos.
+            symbols (tuple): Modificadores simbólicos como tuplas (signo, nombre).
+        """
+        self.notation = notation
+        self.terms = terms
+        self.modifier = modifier
+        self.symbols = symbols
+    
+    @staticmethod
+    def compile(dice_notation):
+        """
+        Obtener la expresión compilada de una notación (con caché LRU acotada).
+        
+        Args:
+            dice_notation (str): La notación de dados (ej., "2d6+1d4-1")
+            
+        Returns:
+            DiceExpr: La expresión compilada, compartida entre llamadas.
+        """
+        return _compile(dice_notation)
+    
+    def __repr__(self):
+        return f"DiceExpr({self.notation!r})"
+    
+    def has_symbol(self, name):
+        """Comprobar si la expresión contiene un modificador simbólico."""
+        return any(symbol == name for _, symbol in self.symbols)
+    
+    def resolve_modifier(self, values=None):
+        """
+        Calcular el modificador fijo total.
+        
+        Args:
+            values (dict, optional): Valores de los modificadores simbólicos.
+                Los que no aparezcan valen 0.
+        """
+        modifier = self.modifier
+        if values and self.symbols:
+            for sign, symbol in self.symbols:
+                modifier += sign * values.get(symbol, 0)
+        return modifier
+    
+    def roll(self, values=None, rng=None):
+        """
+        Tirar la expresión.
+        
+        Args:
+            values (dict, optional): Valores de los modificadores simbólicos.
+            rng (CombatRNG, optional): Generador a usar. Por defecto el módulo random.
+            
+        Returns:
+            tuple: (total, rolls, modifier) con el mismo significado que Dice.roll.
+        """
+        randint = (rng or random).randint
+        rolls = []
+        dice_total = 0
+        for sign, num_dice, dice_type in self.terms:
+            for _ in range(num_dice):
+                result = randint(1, dice_type)
+                rolls.append(result)
+                dice_total += sign * result
+        
+        modifier = self.resolve_modifier(values)
+        return dice_total + modifier, rolls, modifier
+    
+    def scaled(self, extra_dice):
+        """
+        Obtener la expresión con dados adicionales en el primer término de dados,
+        como al lanzar un hechizo a nivel superior.
+        
+        Args:
+            extra_dice (int): Número de dados a añadir.
+            
+        Returns:
+            DiceExpr: La nueva expresión (también en caché).
+        """
+        if extra_dice <= 0 or not self.terms:
+            return self
+        return _scaled(self, extra_dice)
+    
+    def as_single_term(self):
+        """
+        Obtener (num_dice, dice_type, modifier) para expresiones de un solo término.
+        
+        Raises:
+            ValueError: Si la expresión no tiene exactamente un término de dados positivo.
+        """
+        if len(self.terms) != 1 or self.terms[0][0] < 0:
+            raise ValueError(f"Se esperaba un único término de dados: {self.notation}")
+        _, num_dice, dice_type = self.terms[0]
+        return num_dice, dice_type, self.modifier
+
+
+@lru_cache(maxsize=DICE_CACHE_SIZE)
+def _compile(dice_notation):
+    """Analizar una notación una sola vez; las siguientes llamadas salen de la caché."""
+    notation = dice_notation.lower().strip()
+    terms = []
+    modifier = 0
+    symbols = []
+    
+    position = 0
+    while position < len(notation):
+        match = _TERM_PATTERN.match(notation, position)
+        # Todos los términos salvo el primero necesitan un signo explícito
+        if not match or match.end() == position or (position and not match.group(1)):
+            raise ValueError(f"Notación de dados inválida: {dice_notation}")
+        
+        sign = -1 if match.group(1) == "-" else 1
+        if match.group(3):
+            num_dice = int(match.group(2)) if match.group(2) else 1
+            terms.append((sign, num_dice, int(match.group(3))))
+        elif match.group(4):
+            modifier += sign * int(match.group(4))
+        else:
+            symbols.append((sign, match.group(5)))
+        position = match.end()
+    
+    if not terms:
+        raise ValueError(f"Notación de dados inválida: {dice_notation}")
+    
+    return DiceExpr(notation, tuple(terms), modifier, tuple(symbols))
+
+
+@lru_cache(maxsize=DICE_CACHE_SIZE)
+def _scaled(expr, extra_dice):
+    """Versión en caché de DiceExpr.scaled."""
+    sign, num_dice, dice_type = expr.terms[0]
+    terms = ((sign, num_dice + extra_dice, dice_type),) + expr.terms[1:]
+    
+    parts = []
+    for term_sign, term_dice, term_type in terms:
+        parts.append(f"{'-' if term_sign < 0 else '+'}{term_dice}d{term_type}")
+    if expr.modifier:
+        parts.append(f"{expr.modifier:+d}")
+    for symbol_sign, symbol in expr.symbols:
+        parts.append(f"{'-' if symbol_sign < 0 else '+'}{symbol}")
+    notation = "".join(parts).lstrip("+")
+    
+    return DiceExpr(notation, terms, expr.modifier, expr.symbols)
+
 
 class Dice:
     """Clase para manejar tiradas de dados."""
     
     @staticmethod
-    def roll(dice_notation):
+    def parse(dice_notation):
         """
-        Tirar dados basados en la notación estándar de dados (ej., "3d6+2").
+        Analizar una notación de dados de un solo término (ej., "3d6+2").
+        
+        Args:
+            dice_notation (str): La notación de dados a analizar
+            
+        Returns:
+            tuple: (num_dice, dice_type, modifier)
+        """
+        return _compile(dice_notation).as_single_term()
+    
+    @staticmethod
+    def is_valid(dice_notation):
+        """Comprobar si una notación de dados se puede tirar (para validar entradas)."""
+        try:
+            _compile(dice_notation)
+            return True
+        except ValueError:
+            return False
+    
+    @staticmethod
+    def roll(dice_notation, values=None, rng=None):
+        """
+        Tirar dados basados en la notación estándar de dados (ej., "3d6+2" o "2d6+1d4-1").
         
         Args:
             dice_notation (str): La notación de dados para tirar (ej., "3d6+2")
+            values (dict, optional): Valores de los modificadores simbólicos (ej., {"modificador": 3})
+            rng (CombatRNG, optional): Generador a usar. Por defecto el módulo random.
             
         Returns:
             tuple: (total, rolls, modifier) donde total es la suma de todas las tiradas más el modificador,
                   rolls es una lista de resultados individuales de dados, y modifier es el modificador estático
         """
-        # Analizar la notación de dados
-        pattern = r"(\d+)d(\d+)([+-]\d+)?"
-        match = re.match(pattern, dice_notation.lower())
+        return _compile(dice_notation).roll(values, rng)
+    
+    @staticmethod
+    def roll_many(dice_notation, n, values=None, rng=None):
+        """
+        Tirar la misma notación n veces de una sola vez.
         
-        if not match:
-            raise ValueError(f"Notación de dados inválida: {dice_notation}")
+        Args:
+            dice_notation (str): La notación de dados (ej., "2d6+1d4+3")
+            n (int): Número de tiradas
+            values (dict, optional): Valores de los modificadores simbólicos
+            rng (CombatRNG, optional): Generador a usar. Por defecto el del proceso.
+            
+        Returns:
+            numpy.ndarray o array('i'): Los n totales (incluido el modificador).
+        """
+        expr = _compile(dice_notation)
+        modifier = expr.resolve_modifier(values)
         
-        num_dice = int(match.group(1))
-        dice_type = int(match.group(2))
-        modifier_str = match.group(3) or "+0"
-        modifier = int(modifier_str)
+        if np is not None:
+            generator = rng.numpy_generator() if rng is not None else _numpy_rng()
+            totals = np.full(n, modifier, dtype=np.int64)
+            for sign, num_dice, dice_type in expr.terms:
+                rolls = generator.integers(1, dice_type + 1, size=(n, num_dice))
+                totals += sign * rolls.sum(axis=1)
+            return totals
+        
+        randint = (rng or random).randint
+        totals = array('i', [modifier]) * n
+        for sign, num_dice, dice_type in expr.terms:
+            for i in range(n):
+                totals[i] += sign * sum(randint(1, dice_type) for _ in range(num_dice))
+        return totals
+    
+    @staticmethod
+    def d20_many(n, advantage=None, rng=None):
+        """
+        Tirar n d20, opcionalmente con ventaja o desventaja.
         
-        # Tirar los dados
-        rolls = [random.randint(1, dice_type) for _ in range(num_dice)]
-        total = sum(rolls) + modifier
+        Args:
+            n (int): Número de tiradas
+            advantage (bool, optional): True para ventaja (mayor de dos), False para
+                desventaja (menor de dos) y None para una tirada normal.
+            rng (CombatRNG, optional): Generador a usar. Por defecto el del proceso.
+            
+        Returns:
+            numpy.ndarray o array('i'): Los n resultados.
+        """
+        if np is not None:
+            generator = rng.numpy_generator() if rng is not None else _numpy_rng()
+            if advantage is None:
+                return generator.integers(1, 21, size=n)
+            pairs = generator.integers(1, 21, size=(n, 2))
+            return pairs.max(axis=1) if advantage else pairs.min(axis=1)
         
-        return total, rolls, modifier
+        randint = (rng or random).randint
+        if advantage is None:
+            return array('i', [randint(1, 20) for _ in range(n)])
+        pick = max if advantage else min
+        return array('i', [pick(randint(1, 20), randint(1, 20)) for _ in range(n)])
     
     @staticmethod
-    def advantage():
+    def advantage(rng=None):
         """Tirar con ventaja (tirar d20 dos veces, tomar el mayor)."""
-        roll1 = random.randint(1, 20)
-        roll2 = random.randint(1, 20)
+        rng = rng or random
+        roll1 = rng.randint(1, 20)
+        roll2 = rng.randint(1, 20)
         return max(roll1, roll2), (roll1, roll2)
     
     @staticmethod
-    def disadvantage():
+    def disadvantage(rng=None):
         """Tirar con desventaja (tirar d20 dos veces, tomar el menor)."""
-        roll1 = random.randint(1, 20)
-        roll2 = random.randint(1, 20)
-        return min(roll1, roll2), (roll1, roll2)
\ No newline at end of file
+        rng = rng or random
+        roll1 = rng.randint(1, 20)
+        roll2 = rng.randint(1, 20)
+        return min(roll1, roll2), (roll1, roll2)
+    
+    @staticmethod
+    def distribution(dice_notation, critical=False, halved=False):
+        """
+        Calcular la distribución exacta de probabilidad de una tirada.
+        
+        Args:
+            dice_notation (str): La notación de dados (ej., "2d8+3")
+            critical (bool, optional): Duplicar la suma de los dados como en un
+                crítico de CombatEngine.attack (el modificador no se duplica).
+            halved (bool, optional): Reducir el total a la mitad redondeando hacia
+                abajo, como el daño con salvación superada de cast_spell.
+            
+        Returns:
+            dict: {total: probabilidad} ordenado por total.
+        """
+        return dict(_distribution(dice_notation.lower(), critical, halved))
+    
+    @staticmethod
+    def expected_value(dice_notation, critical=False, halved=False):
+        """Obtener el valor esperado exacto de una tirada (ver distribution)."""
+        return sum(total * p for total, p in _distribution(dice_notation.lower(), critical, halved))
+    
+    @staticmethod
+    def percentile(dice_notation, q, critical=False, halved=False):
+        """
+        Obtener el menor total cuya probabilidad acumulada alcanza q.
+        
+        Args:
+            dice_notation (str): La notación de dados (ej., "2d8+3")
+            q (float): Probabilidad acumulada entre 0 y 1 (0.5 es la mediana)
+            
+        Returns:
+            int: El percentil q de la tirada.
+        """
+        cumulative = 0.0
+        pmf = _distribution(dice_notation.lower(), critical, halved)
+        for total, p in pmf:
+            cumulative += p
+            if cumulative >= q - 1e-12:
+                return total
+        return pmf[-1][0]
+
+
+_numpy_generator = None
+
+
+def _numpy_rng():
+    """Generador de NumPy del proceso, creado al primer uso."""
+    global _numpy_generator
+    if _numpy_generator is None:
+        _numpy_generator = np.random.default_rng()
+    return _numpy_generator
+
+
+@lru_cache(maxsize=None)
+def _dice_sum_counts(num_dice, dice_type):
+    """Número de combinaciones para cada suma de num_dice dados de dice_type caras."""
+    counts = {0: 1}
+    for _ in range(num_dice):
+        # Convolución con un dado más
+        next_counts = {}
+        for partial, ways in counts.items():
+            for face in range(1, dice_type + 1):
+                next_counts[partial + face] = next_counts.get(partial + face, 0) + ways
+        counts = next_counts
+    return counts
+
+
+@lru_cache(maxsize=1024)
+def _distribution(dice_notation, critical, halved):
+    """Distribución memorizada por notación como tupla de pares (total, probabilidad)."""
+    expr = _compile(dice_notation)
+    modifier = expr.modifier
+    
+    # Convolución de todos los términos de dados (los negativos restan)
+    counts = {0: 1}
+    outcomes = 1
+    for sign, num_dice, dice_type in expr.terms:
+        term_counts = _dice_sum_counts(num_dice, dice_type)
+        next_counts = {}
+        for partial, ways in counts.items():
+            for term_sum, term_ways in term_counts.items():
+                value = partial + sign * term_sum
+                next_counts[value] = next_counts.get(value, 0) + ways * term_ways
+        counts = next_counts
+        outcomes *= dice_type ** num_dice
+    
+    pmf = {}
+    for dice_sum, ways in counts.items():
+        total = (dice_sum * 2 if critical else dice_sum) + modifier
+        if halved:
+            total //= 2
+        pmf[total] = pmf.get(total, 0) + ways
+    
+    # Las probabilidades se calculan desde recuentos enteros exactos
+    return tuple((total, pmf[total] / outcomes) for total in sorted(pmf))
\ No newline at end of file
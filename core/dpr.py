@@ -0,0 +1,168 @@
+# core/dpr.py
+from functools import lru_cache
+from core.dice import Dice
+
+
+def hit_probability(attack_bonus, armor_class):
+    """
+    Probabilidad de impactar con d20 + attack_bonus contra armor_class.
+
+    Igual que en CombatEngine.attack, el 20 natural no impacta automáticamente
+    ni el 1 natural falla automáticamente.
+    """
+    hits = sum(1 for face in range(1, 21) if face + attack_bonus >= armor_class)
+    return hits / 20
+
+
+def critical_probability(attack_bonus, armor_class):
+    """Probabilidad de un crítico: 20 natural que además impacta."""
+    return 1 / 20 if 20 + attack_bonus >= armor_class else 0.0
+
+
+def weapon_damage_distribution(damage_terms, damage, critical=False):
+    """
+    Distribución exacta del daño de un arma tal como lo tira CombatEngine.attack.
+
+    Args:
+        damage_terms (tuple): Términos de dados del perfil de ataque (signo, número, caras).
+        damage (int): Daño fijo que se suma a los dados.
+        critical (bool, optional): En un crítico el motor duplica la suma de todas
+            las tiradas, incluidas las de los términos que restan.
+
+    Returns:
+        dict: {daño: probabilidad} (sin recortar a 0).
+    """
+    parts = []
+    for sign, num_dice, dice_type in damage_terms:
+        parts.append(f"{'-' if sign < 0 and not critical else '+'}{num_dice}d{dice_type}")
+    notation = "".join(parts).lstrip("+")
+    return {total + damage: p for total, p in Dice.distribution(notation, critical=critical).items()}
+
+
+def _mean_damage(damage_terms, damage, critical=False):
+    """Daño medio de un impacto con el mínimo de 0 de take_damage."""
+    return sum(max(0, total) * p
+               for total, p in weapon_damage_distribution(damage_terms, damage, critical).items())
+
+
+@lru_cache(maxsize=4096)
+def _weapon_dpr(attack_bonus, damage_terms, hit_damage, crit_damage, placeholder_damage, armor_class):
+    """Cálculo memorizado por (perfil de ataque, CA del objetivo)."""
+    p_hit = hit_probability(attack_bonus, armor_class)
+    p_crit = critical_probability(attack_bonus, armor_class)
+
+    # El daño provisional de attack() se aplica en cualquier impacto; cada
+    # take_damage recorta su cantidad a 0 por separado
+    placeholder = max(0, placeholder_damage)
+    normal_damage = _mean_damage(damage_terms, hit_damage) + placeholder
+    critical_damage = _mean_damage(damage_terms, crit_damage, critical=True) + placeholder
+
+    expected = (p_hit - p_crit) * normal_damage + p_crit * critical_damage
+    return {
+        "hit_chance": p_hit,
+        "crit_chance": p_crit,
+        "expected_damage": expected
+    }
+
+
+def attack_dpr(attacker, armor_class):
+    """
+    Daño esperado por ataque de arma contra una CA, sin muestreo.
+
+    Args:
+        attacker (Entity): Personaje o monstruo que ataca.
+        armor_class (int): CA del objetivo.
+
+    Returns:
+        dict: Probabilidad de impacto, de crítico y daño esperado
+              (None si el atacante no puede atacar).
+    """
+    profile = attacker.get_attack_profile()
+    if profile is None:
+        return None
+
+    return dict(_weapon_dpr(
+        profile["attack_bonus"],
+        profile["damage_terms"],
+        profile["hit_damage"],
+        profile["crit_damage"],
+        profile["placeholder_damage"],
+        armor_class
+    ))
+
+
+@lru_cache(maxsize=4096)
+def _attack_spell_dpr(attack_bonus, damage_formula, armor_class):
+    """Hechizo con tirada de ataque: sin crítico, daño completo al impactar."""
+    p_hit = hit_probability(attack_bonus, armor_class)
+    return {
+        "hit_chance": p_hit,
+        "crit_chance": 0.0,
+        "expected_damage": p_hit * Dice.expected_value(damage_formula)
+    }
+
+
+@lru_cache(maxsize=4096)
+def _save_spell_dpr(save_dc, damage_formula):
+    """Hechizo con salvación: el objetivo tira d20 + 0 y reduce el daño a la mitad."""
+    p_save = hit_probability(0, save_dc)
+    full = Dice.expected_value(damage_formula)
+    half = Dice.expected_value(damage_formula, halved=True)
+    return {
+        "hit_chance": 1 - p_save,
+        "crit_chance": 0.0,
+        "expected_damage": (1 - p_save) * full + p_save * half
+    }
+
+
+def get_spell_attack_bonus(caster):
+    """Bono de ataque con hechizos tal como lo calcula cast_spell (incluye los efectos)."""
+    if hasattr(caster, "get_spell_attack_modifier"):
+        return caster.get_spell_attack_modifier()
+    return caster.get_attack_modifier()
+
+
+def get_spell_save_dc(caster):
+    """CD de salvación de los hechizos tal como la calcula cast_spell."""
+    return caster.get_spell_save_dc()
+
+
+def spell_dpr(caster, spell, armor_class, cast_level=None):
+    """
+    Daño esperado de un hechizo de daño lanzado contra un objetivo, sin muestreo.
+
+    Sigue las tres ramas de cast_spell: tirada de ataque, tirada de salvación
+    (mitad de daño si se supera) o daño directo.
+
+    Args:
+        caster (Entity): Personaje o monstruo que lanza el hechizo.
+        spell (Spell): El hechizo.
+        armor_class (int): CA del objetivo (solo afecta a hechizos de ataque).
+        cast_level (int, optional): Nivel de lanzamiento para potenciar el hechizo.
+
+    Returns:
+        dict: Probabilidad de impacto (o de fallar la salvación), de crítico y daño
+              esperado. None si el hechizo no causa daño.
+    """
+    if not spell.damage_dice:
+        return None
+
+    damage_formula = spell.scale_dice(spell.damage_dice, cast_level or spell.level)
+
+    if spell.attack_roll:
+        return dict(_attack_spell_dpr(get_spell_attack_bonus(caster), damage_formula, armor_class))
+    if spell.saving_throw:
+        return dict(_save_spell_dpr(get_spell_save_dc(caster), damage_formula))
+
+    return {
+        "hit_chance": 1.0,
+        "crit_chance": 0.0,
+        "expected_damage": Dice.expected_value(damage_formula)
+    }
+
+
+def clear_cache():
+    """Vaciar las cachés de cálculo (p. ej. tras cambiar reglas)."""
+    _weapon_dpr.cache_clear()
+    _attack_spell_dpr.cache_clear()
+    _save_spell_dpr.cache_clear()
\ No newline at end of file
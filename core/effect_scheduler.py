@@ -0,0 +1,105 @@
+# core/effect_scheduler.py
+import heapq
+import itertools
+
+def expiry_key(now, position, turns):
+    """
+    Calcular el turno en cuyo inicio vence un efecto.
+    
+    Un efecto con N turnos restantes termina al empezar el N-ésimo turno
+    siguiente de la entidad afectada (el turno en curso no cuenta).
+    
+    Args:
+        now (tuple): (ronda, posición en la iniciativa) del turno actual.
+        position (int): Posición en la iniciativa de la entidad afectada.
+        turns (int): Turnos restantes del efecto (al menos 1).
+    
+    Returns:
+        tuple: (ronda, posición) del vencimiento.
+    """
+    round_number, current = now
+    next_round = round_number if position > current else round_number + 1
+    return (next_round + turns - 1, position)
+
+def turns_until(expires_at, now):
+    """Turnos de la entidad afectada que faltan hasta el vencimiento (inversa de expiry_key)."""
+    round_number, current = now
+    expiry_round, position = expires_at
+    next_round = round_number if position > current else round_number + 1
+    return max(0, expiry_round - next_round + 1)
+
+class EffectScheduler:
+    """
+    Vencimientos de los efectos de un combate en una cola de prioridad.
+    
+    Cada efecto con duración entra una sola vez, con la clave (ronda,
+    posición en la iniciativa) del turno en que termina, que también queda en
+    effect.expires_at. Al empezar un turno solo se sacan los efectos que
+    vencen, con un coste O(log n) por vencimiento, en lugar de recorrer los
+    efectos de todas las entidades en cada turno.
+    
+    Los efectos que se quitan antes de tiempo (menú de trampas, descanso) no
+    se borran de la cola: su entrada se descarta cuando llega su turno.
+    """
+    
+    def __init__(self):
+        """Inicializar la cola vacía."""
+        self.queue = []
+        # Desempate entre claves iguales: las entidades y efectos no se comparan
+        self._counter = itertools.count()
+    
+    def __len__(self):
+        """Entradas en la cola (incluidas las ya descartables)."""
+        return len(self.queue)
+    
+    def clear(self):
+        """Vaciar la cola (los expires_at de los efectos no se tocan)."""
+        self.queue = []
+    
+    def schedule(self, entity, effect, expires_at):
+        """
+        Programar el vencimiento de un efecto.
+        
+        Args:
+            entity (Entity): Entidad afectada.
+            effect (Effect): Efecto aplicado a la entidad.
+            expires_at (tuple): (ronda, posición) de expiry_key.
+        """
+        old_expires_at = effect.expires_at
+        effect.expires_at = expires_at
+        if entity.journal is not None:
+            entity.journal.record_attribute(effect, "expires_at", old_expires_at)
+        heapq.heappush(self.queue, (expires_at, next(self._counter), entity, effect))
+    
+    def pop_due(self, now):
+        """
+        Sacar de la cola los efectos que vencen hasta el turno now incluido.
+        
+        Args:
+            now (tuple): (ronda, posición) del turno que empieza.
+        
+        Returns:
+            list: Pares (entidad, efecto) que siguen activos y deben terminar.
+        """
+        due = []
+        while self.queue and self.queue[0][0] <= now:
+            expires_at, _, entity, effect = heapq.heappop(self.queue)
+            # Entrada obsoleta: el efecto ya no está o se volvió a programar
+            if effect.expires_at == expires_at and effect in entity.effects:
+                due.append((entity, effect))
+        return due
+    
+    def rebuild(self, entities):
+        """
+        Reconstruir la cola a partir de los expires_at de los efectos.
+        
+        Se usa cuando los efectos cambian por fuera de la cola: al cargar un
+        combate, al deshacer o rehacer y al bifurcar el motor.
+        
+        Args:
+            entities (list): Todas las entidades del combate.
+        """
+        self.queue = [(effect.expires_at, next(self._counter), entity, effect)
+                      for entity in entities for effect in entity.effects
+                      if effect.expires_at is not None]
+        heapq.heapify(self.queue)
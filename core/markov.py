@@ -0,0 +1,214 @@
+# core/markov.py
+from itertools import permutations
+from core.dpr import weapon_damage_distribution
+from core.simulation import DEFAULT_MAX_ROUNDS
+
+
+def initiative_order_probabilities(entities):
+    """
+    Calcular la probabilidad exacta de cada orden de iniciativa.
+
+    Reproduce CombatEngine.roll_initiative: d20 + initiative_mod, orden descendente
+    y, en caso de empate, el orden original de la lista (sorted es estable).
+
+    Args:
+        entities (list): Entidades en el orden en que se añaden al combate.
+
+    Returns:
+        dict: {tupla de índices en orden de actuación: probabilidad}
+    """
+    # Distribución de la iniciativa total de cada entidad
+    totals = [{face + entity.initiative_mod: 1 / 20 for face in range(1, 21)} for entity in entities]
+
+    orders = {}
+    for order in permutations(range(len(entities))):
+        # f[v] = probabilidad de que los ya colocados sean consistentes y el último saque v
+        f = dict(totals[order[0]])
+        for previous, current in zip(order, order[1:]):
+            next_f = {}
+            for value, p_value in totals[current].items():
+                # El siguiente debe sacar menos, o lo mismo si va después en la lista original
+                p = sum(p_prev for prev_value, p_prev in f.items()
+                        if value < prev_value or (value == prev_value and current > previous))
+                if p:
+                    next_f[value] = p * p_value
+            f = next_f
+        probability = sum(f.values())
+        if probability:
+            orders[order] = probability
+    return orders
+
+
+def _attack_outcomes(profile, armor_class, target_hp):
+    """
+    Distribución exacta del HP del objetivo tras un ataque de arma.
+
+    Aplica, como CombatEngine.attack, el daño provisional de attack() y después el
+    daño real. Un objetivo derrotado se representa con HP 0.
+
+    Returns:
+        list: Pares (nuevo_hp, probabilidad).
+    """
+    if profile is None:
+        return [(target_hp, 1.0)]
+
+    outcomes = {}
+
+    def add(damage, p):
+        # Daño provisional y después daño real, cada uno con su mínimo de 0
+        hp = max(0, target_hp - max(0, profile["placeholder_damage"]))
+        if hp:
+            hp = max(0, hp - max(0, damage))
+        outcomes[hp] = outcomes.get(hp, 0.0) + p
+
+    # Agrupar las caras del d20 en fallo, impacto normal y crítico
+    hits = sum(1 for face in range(1, 21) if face + profile["attack_bonus"] >= armor_class)
+    p_crit = 1 / 20 if 20 + profile["attack_bonus"] >= armor_class else 0.0
+    p_normal = hits / 20 - p_crit
+
+    if hits < 20:
+        outcomes[target_hp] = 1 - hits / 20
+    if p_normal:
+        for damage, p in weapon_damage_distribution(profile["damage_terms"], profile["hit_damage"]).items():
+            add(damage, p * p_normal)
+    if p_crit:
+        for damage, p in weapon_damage_distribution(profile["damage_terms"], profile["crit_damage"],
+                                                    critical=True).items():
+            add(damage, p * p_crit)
+
+    return list(outcomes.items())
+
+
+def solve_encounter(characters, monsters, max_rounds=DEFAULT_MAX_ROUNDS, initiative_order=None,
+                    tolerance=1e-12):
+    """
+    Calcular exactamente la probabilidad de victoria de cada bando.
+
+    La cadena de Markov tiene como estado el HP de cada entidad y el índice del
+    turno; la distribución de estados se propaga turno a turno con transiciones
+    memorizadas construidas a partir de las distribuciones exactas de los dados.
+    Usa la misma política que core.simulation (atacar a un enemigo vivo al azar)
+    y, como core.vectorized, no modela los hechizos de los monstruos.
+
+    Pensado para combates pequeños: el número de estados crece con el producto
+    de los HP de todas las entidades.
+
+    Args:
+        characters (list): Lista de objetos Character.
+        monsters (list): Lista de objetos Monster.
+        max_rounds (int, optional): Rondas máximas; la masa restante cuenta como empate.
+        initiative_order (list, optional): Orden de iniciativa fijo (lista de
+            entidades). Si es None se promedia sobre todos los órdenes posibles.
+        tolerance (float, optional): Probabilidad por debajo de la cual un estado
+            se descarta al final de cada ronda; la masa descartada cuenta como
+            empate. Con 0 no se descarta nada.
+
+    Returns:
+        dict: Probabilidades de victoria, derrota y empate, la distribución del
+              número de rondas de los combates terminados y las rondas esperadas.
+    """
+    entities = list(characters) + list(monsters)
+    n_characters = len(characters)
+    profiles = [entity.get_attack_profile() for entity in entities]
+
+    if initiative_order is None:
+        orders = initiative_order_probabilities(entities)
+    else:
+        position = {id(entity): i for i, entity in enumerate(entities)}
+        orders = {tuple(position[id(entity)] for entity in initiative_order): 1.0}
+
+    transitions = {}
+    attack_outcomes = {}
+
+    def outcomes_for(actor, target, target_hp):
+        key = (actor, target, target_hp)
+        if key not in attack_outcomes:
+            attack_outcomes[key] = _attack_outcomes(profiles[actor], entities[target].get_armor_class(), target_hp)
+        return attack_outcomes[key]
+
+    def step(actor, hp):
+        """
+        Transición memorizada del turno de actor desde el estado hp.
+
+        Returns:
+            tuple: (lista de pares (nuevo estado, probabilidad), probabilidad de
+                   que el bando del actor gane en este turno)
+        """
+        key = (actor, hp)
+        if key in transitions:
+            return transitions[key]
+
+        enemies = range(n_characters, len(entities)) if actor < n_characters else range(n_characters)
+        targets = [i for i in enemies if hp[i]]
+        p_target = 1 / len(targets)
+
+        next_states = {}
+        p_win = 0.0
+        for target in targets:
+            for new_hp, p in outcomes_for(actor, target, hp[target]):
+                # Si el objetivo cae y no quedan más enemigos, gana el bando del actor
+                if not new_hp and len(targets) == 1:
+                    p_win += p_target * p
+                    continue
+                state = hp[:target] + (new_hp,) + hp[target + 1:]
+                next_states[state] = next_states.get(state, 0.0) + p_target * p
+
+        transitions[key] = (list(next_states.items()), p_win)
+        return transitions[key]
+
+    def winner_of(hp):
+        if not any(hp[:n_characters]):
+            return "monsters"
+        if not any(hp[n_characters:]):
+            return "characters"
+        return None
+
+    result = {"characters": 0.0, "monsters": 0.0}
+    rounds = {}
+
+    def absorb(side, round_number, p):
+        result[side] += p
+        rounds[round_number] = rounds.get(round_number, 0.0) + p
+
+    initial_hp = tuple(entity.current_hp if entity.is_alive else 0 for entity in entities)
+
+    for order, p_order in orders.items():
+        if winner_of(initial_hp):
+            absorb(winner_of(initial_hp), 1, p_order)
+            continue
+
+        states = {initial_hp: p_order}
+        for round_number in range(1, max_rounds + 1):
+            for actor in order:
+                # Una entidad derrotada o sin arma no cambia el estado
+                if profiles[actor] is None:
+                    continue
+                side = "characters" if actor < n_characters else "monsters"
+
+                next_states = {}
+                for hp, p_state in states.items():
+                    if not hp[actor]:
+                        next_states[hp] = next_states.get(hp, 0.0) + p_state
+                        continue
+
+                    outcomes, p_win = step(actor, hp)
+                    if p_win:
+                        absorb(side, round_number, p_state * p_win)
+                    for state, p in outcomes:
+                        next_states[state] = next_states.get(state, 0.0) + p_state * p
+                states = next_states
+
+            # Descartar la cola de estados improbables (determinista, sin ruido)
+            if tolerance:
+                states = {hp: p for hp, p in states.items() if p >= tolerance}
+            if not states:
+                break
+
+    total_finished = result["characters"] + result["monsters"]
+    return {
+        "win_probability": result["characters"],
+        "loss_probability": result["monsters"],
+        "draw_probability": max(0.0, 1.0 - total_finished),
+        "rounds": dict(sorted(rounds.items())),
+        "expected_rounds": sum(r * p for r, p in rounds.items()) / total_finished if total_finished else 0.0
+    }
\ No newline at end of file
@@ -0,0 +1,165 @@
+# core/replay.py
+from core.combat_engine import CombatEngine
+from core.rng import BACKENDS, CombatRNG
+from models.character import Character
+from models.monster import Monster
+from persistence.combat_logger import CombatLogger
+from persistence.event_log import EventLog
+
+
+class CombatReplay:
+    """
+    Registro reproducible de un combate: semilla, estado inicial y acciones.
+
+    Como todas las tiradas salen del CombatRNG del motor, volver a aplicar las
+    mismas acciones con la misma semilla reproduce el combate exactamente. Los
+    d20 forzados pasan por CombatEngine.force_d20 y se registran; el resto de
+    cambios del menú de trampas no pasan por el motor y no se registran.
+    """
+
+    def __init__(self, seed, characters, monsters, actions=None, backend="random"):
+        """
+        Inicializar la repetición.
+
+        Args:
+            seed (int): Semilla del encuentro (CombatEngine.combat_seed).
+            characters (list): Personajes serializados con to_dict() al iniciar.
+            monsters (list): Monstruos serializados con to_dict() al iniciar.
+            actions (list, optional): Acciones en orden (CombatEngine.action_log).
+            backend (str, optional): Nombre del backend de CombatRNG.
+        """
+        self.seed = seed
+        self.characters = characters
+        self.monsters = monsters
+        self.actions = actions or []
+        self.backend = backend
+
+    @classmethod
+    def from_engine(cls, combat_engine):
+        """Crear la repetición del combate actual de un motor."""
+        if combat_engine.combat_seed is None:
+            raise ValueError("El combate no se inició con start_combat y no se puede repetir")
+        if combat_engine.initial_state is None:
+            raise ValueError("El motor se creó con replay=False y no guarda el combate")
+
+        backend = next((name for name, backend_class in BACKENDS.items()
+                        if backend_class is combat_engine.rng.backend_class), None)
+        if backend is None:
+            raise ValueError("Solo se pueden repetir combates con un backend registrado en BACKENDS")
+
+        return cls(
+            seed=combat_engine.combat_seed,
+            characters=combat_engine.initial_state["characters"],
+            monsters=combat_engine.initial_state["monsters"],
+            actions=list(combat_engine.action_log),
+            backend=backend
+        )
+
+    def build_engine(self, logger=None, events=None):
+        """
+        Crear un motor con el estado inicial del combate, antes de cualquier acción.
+
+        Args:
+            logger (CombatLogger, optional): Registro a usar. Por defecto desactivado.
+            events (EventLog, optional): Registro de eventos. Por defecto desactivado.
+        """
+        engine = CombatEngine(
+            logger=logger if logger is not None else CombatLogger(log_file=None),
+            rng=CombatRNG(self.seed, self.backend),
+            events=events if events is not None else EventLog(log_file=None),
+            # Nadie deshace acciones de una repetición: sin historial no se registran deltas
+            undo=False
+        )
+        # Sin registro de texto nadie lee los mensajes detallados
+        engine.render_text = logger is not None
+        for data in self.characters:
+            engine.add_character(Character.from_dict(data))
+        for data in self.monsters:
+            engine.add_monster(Monster.from_dict(data))
+
+        engine.start_combat(self.seed)
+        return engine
+
+    def run(self, until_round=None, logger=None, events=None):
+        """
+        Repetir el combate.
+
+        Args:
+            until_round (int, optional): Avanzar solo hasta el inicio de esa ronda.
+                Si es None se aplican todas las acciones.
+            logger (CombatLogger, optional): Registro a usar. Por defecto desactivado.
+            events (EventLog, optional): Registro de eventos. Por defecto desactivado.
+
+        Returns:
+            CombatEngine: El motor en el estado alcanzado.
+        """
+        engine = self.build_engine(logger, events)
+        for entry in self.actions:
+            if until_round is not None and entry["round"] >= until_round:
+                break
+            self.apply(engine, entry)
+        return engine
+
+    @staticmethod
+    def apply(engine, entry):
+        """Aplicar una acción registrada a un motor."""
+        action = entry["action"]
+        actor = engine.get_entity(entry.get("actor"))
+        target = engine.get_entity(entry.get("target"))
+
+        if action == "roll_initiative":
+            return engine.roll_initiative()
+        elif action == "next_turn":
+            return engine.next_turn()
+        elif action == "attack":
+            return engine.attack(actor, target)
+        elif action == "cast_spell":
+            return engine.cast_spell(actor, actor.spells[entry["spell"]], target, entry.get("level"))
+        elif action == "choose_monster_action":
+            # Solo consume las mismas tiradas; la acción elegida viene a continuación
+            return engine.choose_monster_action(actor)
+        elif action == "choose_random_enemy":
+            return engine.choose_random_enemy(actor)
+        elif action == "force_d20":
+            return engine.force_d20(*entry["values"])
+        elif action == "check_combat_status":
+            return engine.check_combat_status()
+        elif action == "end_combat":
+            return engine.end_combat()
+
+        raise ValueError(f"Acción de repetición desconocida: {action}")
+
+    def outcome(self, until_round=None):
+        """
+        Repetir el combate y resumir el resultado, con el formato de run_encounter.
+
+        Útil para comparar combates archivados antes y después de un cambio de reglas.
+        """
+        engine = self.run(until_round)
+        return {
+            "winner": engine.get_winner(),
+            "rounds": engine.round_number,
+            "character_hp": [char.current_hp for char in engine.characters],
+            "monster_hp": [monster.current_hp for monster in engine.monsters]
+        }
+
+    def to_dict(self):
+        """Convertir la repetición a un diccionario para serialización."""
+        return {
+            "seed": self.seed,
+            "backend": self.backend,
+            "characters": self.characters,
+            "monsters": self.monsters,
+            "actions": self.actions
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Crear una repetición a partir de un diccionario."""
+        return cls(
+            seed=data["seed"],
+            characters=data["characters"],
+            monsters=data["monsters"],
+            actions=data.get("actions", []),
+            backend=data.get("backend", "random")
+        )
\ No newline at end of file
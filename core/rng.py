@@ -0,0 +1,169 @@
+# core/rng.py
+import copy
+import random
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:  # El backend de NumPy es opcional
+    np = None
+
+
+class RandomBackend:
+    """Backend basado en random.Random de la biblioteca estándar."""
+
+    def __init__(self, seed=None):
+        self._random = random.Random(seed)
+
+    def randint(self, a, b):
+        return self._random.randint(a, b)
+
+    def random(self):
+        return self._random.random()
+
+    def choice(self, seq):
+        return self._random.choice(seq)
+
+    def getstate(self):
+        return self._random.getstate()
+
+    def setstate(self, state):
+        self._random.setstate(state)
+
+    def fork(self):
+        clone = RandomBackend.__new__(RandomBackend)
+        # Sin __init__: sembrar para sobrescribir después con setstate sería trabajo perdido
+        clone._random = random.Random.__new__(random.Random)
+        clone._random.setstate(self._random.getstate())
+        return clone
+
+
+class NumpyBackend:
+    """Backend basado en numpy.random.Generator (PCG64)."""
+
+    def __init__(self, seed=None):
+        if np is None:
+            raise ImportError("El backend 'numpy' necesita NumPy (pip install numpy)")
+        self.generator = np.random.default_rng(seed)
+
+    def randint(self, a, b):
+        return int(self.generator.integers(a, b + 1))
+
+    def random(self):
+        return float(self.generator.random())
+
+    def choice(self, seq):
+        return seq[int(self.generator.integers(len(seq)))]
+
+    def getstate(self):
+        return self.generator.bit_generator.state
+
+    def setstate(self, state):
+        self.generator.bit_generator.state = state
+
+    def fork(self):
+        clone = NumpyBackend.__new__(NumpyBackend)
+        clone.generator = copy.deepcopy(self.generator)
+        return clone
+
+
+BACKENDS = {
+    "random": RandomBackend,
+    "numpy": NumpyBackend
+}
+
+
+class CombatRNG:
+    """
+    Generador de números aleatorios propio de cada CombatEngine.
+
+    Expone randint, random y choice con la misma firma que el módulo random, de
+    modo que puede pasarse donde antes se usaba el módulo global. Incluye una
+    cola de valores forzados para el d20 (menú de trampas).
+    """
+
+    def __init__(self, seed=None, backend="random"):
+        """
+        Inicializar el generador.
+
+        Args:
+            seed (int, optional): Semilla. None usa una semilla aleatoria del sistema.
+            backend (str, optional): Nombre del backend ("random" o "numpy") o una
+                clase con la misma interfaz que RandomBackend.
+        """
+        self.backend_class = BACKENDS[backend] if isinstance(backend, str) else backend
+        self.forced_d20 = deque()
+        self.reseed(seed)
+
+    def reseed(self, seed):
+        """Reiniciar el generador con una nueva semilla (los valores forzados se mantienen)."""
+        self.seed = seed
+        self.backend = self.backend_class(seed)
+        self._numpy_generator = None
+
+    def force_d20(self, value):
+        """Forzar el resultado de la siguiente tirada de d20 que aún no esté forzada."""
+        self.forced_d20.append(value)
+
+    def clear_forced(self):
+        """Eliminar todos los valores forzados pendientes."""
+        self.forced_d20.clear()
+
+    def randint(self, a, b):
+        """Entero aleatorio en [a, b]; los d20 consumen primero los valores forzados."""
+        if self.forced_d20 and a == 1 and b == 20:
+            return self.forced_d20.popleft()
+        return self.backend.randint(a, b)
+
+    def d20(self):
+        """Tirar un d20."""
+        return self.randint(1, 20)
+
+    def random(self):
+        """Número real aleatorio en [0, 1)."""
+        return self.backend.random()
+
+    def choice(self, seq):
+        """Elegir un elemento aleatorio de una secuencia no vacía."""
+        return self.backend.choice(seq)
+
+    def numpy_generator(self):
+        """
+        Obtener un numpy.random.Generator derivado de este generador, para tiradas masivas.
+
+        Con el backend de NumPy es el propio generador; con el de random se crea uno
+        sembrado desde este generador, de modo que también es reproducible.
+        """
+        if isinstance(self.backend, NumpyBackend):
+            return self.backend.generator
+        if self._numpy_generator is None:
+            if np is None:
+                raise ImportError("Las tiradas masivas con NumPy necesitan NumPy (pip install numpy)")
+            self._numpy_generator = np.random.default_rng(self.backend.randint(0, 2 ** 63 - 1))
+        return self._numpy_generator
+
+    def fork(self):
+        """
+        Crear un generador independiente en el mismo estado.
+
+        Ambos producen la misma secuencia a partir de aquí, sin afectarse entre sí.
+        """
+        clone = CombatRNG.__new__(CombatRNG)
+        clone.backend_class = self.backend_class
+        clone.seed = self.seed
+        clone.backend = self.backend.fork()
+        clone.forced_d20 = deque(self.forced_d20)
+        clone._numpy_generator = None
+        if self._numpy_generator is not None:
+            clone._numpy_generator = copy.deepcopy(self._numpy_generator)
+        return clone
+
+    def getstate(self):
+        """Estado completo del generador, incluidos los valores forzados."""
+        return self.backend.getstate(), tuple(self.forced_d20)
+
+    def setstate(self, state):
+        """Restaurar un estado obtenido con getstate."""
+        backend_state, forced = state
+        self.backend.setstate(backend_state)
+        self.forced_d20 = deque(forced)
@@ -0,0 +1,207 @@
+# core/simulation.py
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from core.combat_engine import CombatEngine
+from core.rng import CombatRNG
+from models.character import Character
+from models.monster import Monster
+from persistence.combat_logger import CombatLogger
+from persistence.event_log import EventLog
+
+# Límite de rondas para evitar combates infinitos (p. ej. CA inalcanzable)
+DEFAULT_MAX_ROUNDS = 100
+
+# Separación entre semillas de combates consecutivos (ver run_seed)
+_SEED_STRIDE = 2 ** 32
+
+
+def run_encounter(party_data, monster_data, max_rounds=DEFAULT_MAX_ROUNDS, seed=None):
+    """
+    Ejecutar un único combate sin interacción del usuario.
+
+    Args:
+        party_data (list): Personajes serializados con to_dict().
+        monster_data (list): Monstruos serializados con to_dict().
+        max_rounds (int, optional): Rondas máximas antes de declarar empate.
+        seed (int, optional): Semilla del generador propio del combate.
+
+    Returns:
+        dict: Resultado del combate con el ganador ("characters", "monsters" o None
+              si se alcanzó el límite de rondas), las rondas jugadas y los HP finales.
+    """
+    # Registro desactivado: nadie lee el texto ni repite miles de combates simulados
+    engine = CombatEngine(logger=CombatLogger(log_file=None), rng=CombatRNG(seed),
+                          events=EventLog(log_file=None), undo=False, replay=False)
+    engine.render_text = False
+
+    for data in party_data:
+        engine.add_character(Character.from_dict(data))
+    for data in monster_data:
+        engine.add_monster(Monster.from_dict(data))
+
+    engine.start_combat(seed)
+    engine.roll_initiative()
+
+    winner = engine.get_winner()
+    while winner is None and engine.round_number <= max_rounds:
+        entity = engine.get_current_entity()
+
+        if entity.is_alive:
+            if entity in engine.characters:
+                take_character_turn(engine, entity)
+            else:
+                take_monster_turn(engine, entity)
+
+        winner = engine.get_winner()
+        if winner is None:
+            engine.next_turn()
+
+    # Cerrar el combate igual que lo haría la interfaz
+    engine.check_combat_status()
+
+    return {
+        "winner": winner,
+        "rounds": engine.round_number,
+        "character_hp": [char.current_hp for char in engine.characters],
+        "monster_hp": [monster.current_hp for monster in engine.monsters]
+    }
+
+
+def take_character_turn(engine, character):
+    """Turno automático de un personaje: atacar a un monstruo vivo al azar."""
+    if not character.weapon:
+        return None
+
+    target = engine.choose_random_enemy(character)
+    if not target:
+        return None
+
+    return engine.attack(character, target)
+
+
+def take_monster_turn(engine, monster):
+    """Turno automático de un monstruo con la misma lógica que la interfaz."""
+    spell, target = engine.choose_monster_action(monster)
+
+    if not target:
+        return None
+
+    if spell:
+        return engine.cast_spell(monster, spell, target)
+    return engine.attack(monster, target)
+
+
+def summarize_runs(results):
+    """
+    Calcular estadísticas agregadas a partir de los resultados de cada combate.
+
+    Args:
+        results (list): Lista de resultados devueltos por run_encounter.
+
+    Returns:
+        dict: Número de combates, victorias, tasa de victoria, rondas medias,
+              HP medio superviviente del grupo y los resultados individuales.
+    """
+    n_runs = len(results)
+    wins = sum(1 for result in results if result["winner"] == "characters")
+    losses = sum(1 for result in results if result["winner"] == "monsters")
+
+    return {
+        "runs": n_runs,
+        "wins": wins,
+        "losses": losses,
+        "draws": n_runs - wins - losses,
+        "win_rate": wins / n_runs if n_runs else 0.0,
+        "average_rounds": sum(r["rounds"] for r in results) / n_runs if n_runs else 0.0,
+        "average_party_hp": sum(sum(r["character_hp"]) for r in results) / n_runs if n_runs else 0.0,
+        "results": results
+    }
+
+
+def run_seed(seed, index):
+    """
+    Obtener la semilla del combate número index dentro de una simulación.
+    
+    Cada combate tiene su propio flujo aleatorio que depende solo de la semilla
+    base y de su índice, nunca del proceso que lo ejecuta.
+    """
+    return seed * _SEED_STRIDE + index
+
+
+def run_chunk(party_data, monster_data, max_rounds, seed, start, stop):
+    """
+    Ejecutar los combates con índices [start, stop) de una simulación con semilla.
+    
+    Se usa tanto en el proceso principal como en los procesos del pool; cada
+    combate tiene su propio CombatRNG, así que el estado global de random no cambia.
+    
+    Returns:
+        list: Resultados de run_encounter en orden de índice.
+    """
+    return [run_encounter(party_data, monster_data, max_rounds, run_seed(seed, index))
+            for index in range(start, stop)]
+
+
+def split_runs(n_runs, n_chunks):
+    """Dividir n_runs en como mucho n_chunks rangos contiguos (start, stop)."""
+    n_chunks = max(1, min(n_chunks, n_runs))
+    base, extra = divmod(n_runs, n_chunks)
+    
+    ranges = []
+    start = 0
+    for i in range(n_chunks):
+        stop = start + base + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def simulate(party, monsters, n_runs, max_rounds=DEFAULT_MAX_ROUNDS, seed=None, workers=1):
+    """
+    Simular muchos combates entre un grupo y un conjunto de monstruos.
+    
+    Los personajes atacan a un monstruo vivo al azar con su arma y los monstruos
+    usan la misma lógica que en la interfaz (CombatEngine.choose_monster_action).
+    Las entidades originales no se modifican: cada combate usa copias nuevas.
+    
+    Cada combate se siembra con run_seed(seed, índice), por lo que con la misma
+    semilla los resultados son idénticos sea cual sea el número de procesos.
+    
+    Args:
+        party (list): Lista de objetos Character.
+        monsters (list): Lista de objetos Monster.
+        n_runs (int): Número de combates a simular.
+        max_rounds (int, optional): Rondas máximas por combate.
+        seed (int, optional): Semilla base. Si es None se elige una al azar.
+        workers (int, optional): Número de procesos. 1 ejecuta todo en el proceso
+            actual; None usa todos los núcleos disponibles.
+        
+    Returns:
+        dict: Estadísticas agregadas (ver summarize_runs) más la semilla usada.
+    """
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 63)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    party_data = [char.to_dict() for char in party]
+    monster_data = [monster.to_dict() for monster in monsters]
+    
+    # Varios bloques por proceso para repartir mejor la carga
+    chunks = split_runs(n_runs, workers * 4 if workers > 1 else 1)
+    
+    if workers <= 1 or len(chunks) <= 1:
+        chunk_results = [run_chunk(party_data, monster_data, max_rounds, seed, start, stop)
+                         for start, stop in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_chunk, party_data, monster_data, max_rounds, seed, start, stop)
+                       for start, stop in chunks]
+            # Fusionar en el orden de los bloques, no en el de finalización
+            chunk_results = [future.result() for future in futures]
+    
+    results = [result for chunk in chunk_results for result in chunk]
+    summary = summarize_runs(results)
+    summary["seed"] = seed
+    return summary
\ No newline at end of file
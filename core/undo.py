@@ -0,0 +1,232 @@
+# core/undo.py
+import functools
+
+# Campos del motor que cambian al avanzar turnos y rondas
+ENGINE_FIELDS = ("current_turn_index", "round_number", "combat_active", "initiative_order")
+
+# Marcador de clave inexistente en un diccionario (p. ej. un espacio de hechizo nuevo)
+_MISSING = object()
+
+class UndoHistory:
+    """
+    Historial de deshacer/rehacer de un combate basado en deltas.
+    
+    Cada acción del motor es un paso formado por los cambios que produjo
+    (HP, espacios de hechizo, efectos, turno y ronda), no por una copia del
+    estado, así que deshacer cuesta lo mismo que el tamaño del cambio aunque
+    haya cientos de entidades. Las entidades informan de sus cambios a través
+    de su atributo journal; los campos del motor se comparan al cerrar el paso.
+    
+    Deltas:
+        ("attr", objeto, nombre, anterior, nuevo)
+        ("item", diccionario, clave, anterior, nuevo)
+        ("insert", lista, índice, elemento)
+        ("delete", lista, índice, elemento)
+        ("extend", lista, inicio, elementos)
+    
+    Además cada paso guarda el estado del generador al empezar, de modo que
+    deshacer también lo devuelve atrás: repetir la acción da las mismas tiradas
+    y la repetición (core.replay) sigue siendo válida. El estado posterior solo
+    se lee al deshacer, para poder rehacer.
+    """
+    
+    def __init__(self, max_steps=500):
+        """
+        Inicializar el historial.
+        
+        Args:
+            max_steps (int, optional): Pasos que se conservan para deshacer.
+        """
+        self.max_steps = max_steps
+        self.undo_stack = []
+        self.redo_stack = []
+        self._step = None
+        self._depth = 0
+        self._before = None
+    
+    def clear(self):
+        """Olvidar todos los pasos (p. ej. al empezar un combate)."""
+        self.undo_stack = []
+        self.redo_stack = []
+    
+    def _add(self, delta):
+        """Añadir un delta al paso abierto, o como paso propio si no hay ninguno."""
+        if self._step is not None:
+            self._step.append(delta)
+        else:
+            # Cambio fuera de una acción del motor (menú de trampas): paso independiente
+            self._push(["cambio", [delta], None, None, None])
+    
+    def record_attribute(self, obj, name, old):
+        """Registrar que obj.name pasó de old a su valor actual."""
+        new = getattr(obj, name)
+        if new != old:
+            self._add(("attr", obj, name, old, new))
+    
+    def record_item(self, mapping, key, old=_MISSING):
+        """Registrar que mapping[key] pasó de old (o no existía) a su valor actual."""
+        self._add(("item", mapping, key, old, mapping[key]))
+    
+    def record_insert(self, sequence, index, item):
+        """Registrar que item se insertó en sequence en la posición index."""
+        self._add(("insert", sequence, index, item))
+    
+    def record_delete(self, sequence, index, item):
+        """Registrar que item se eliminó de sequence desde la posición index."""
+        self._add(("delete", sequence, index, item))
+    
+    def begin(self, engine):
+        """Abrir un paso para una acción del motor (las llamadas anidadas se agrupan)."""
+        self._depth += 1
+        if self._depth > 1:
+            return
+        
+        self._step = []
+        self._before = (tuple(getattr(engine, name) for name in ENGINE_FIELDS),
+                        len(engine.action_log), engine.rng.getstate())
+    
+    def end(self, engine, label):
+        """Cerrar el paso abierto con begin y guardarlo si cambió algo."""
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        
+        step, self._step = self._step, None
+        fields, log_length, rng_state = self._before
+        self._before = None
+        
+        for name, old in zip(ENGINE_FIELDS, fields):
+            new = getattr(engine, name)
+            if new is not old and new != old:
+                step.append(("attr", engine, name, old, new))
+        
+        log_entries = engine.action_log[log_length:]
+        log_delta = ("extend", engine.action_log, log_length, log_entries) if log_entries else None
+        
+        if not step:
+            if not log_delta:
+                return
+            # Acciones sin efecto en el estado (consultas, elegir objetivo) se
+            # unen al paso anterior para que el registro de acciones siga cuadrando
+            # (el estado inicial del generador del paso anterior ya las cubre).
+            # Con pasos por rehacer van en un paso propio, que los descarta: las
+            # tiradas ya no coinciden con las de la rama deshecha
+            previous = self.undo_stack[-1] if self.undo_stack else None
+            if previous is not None and previous[2] is not None and not self.redo_stack:
+                previous[1].append(log_delta)
+                return
+        
+        if log_delta:
+            step.append(log_delta)
+        self._push([label, step, engine.rng, rng_state, None])
+    
+    def _push(self, entry):
+        """Guardar un paso cerrado ([nombre, deltas, generador, estado antes, estado después])."""
+        self.undo_stack.append(entry)
+        self.redo_stack = []
+        if len(self.undo_stack) > self.max_steps:
+            del self.undo_stack[0]
+    
+    def can_undo(self):
+        """Indica si hay algún paso para deshacer."""
+        return bool(self.undo_stack)
+    
+    def can_redo(self):
+        """Indica si hay algún paso para rehacer."""
+        return bool(self.redo_stack)
+    
+    def undo(self):
+        """
+        Deshacer el último paso.
+        
+        Returns:
+            str: Nombre de la acción deshecha, o None si no había ninguna.
+        """
+        if not self.undo_stack:
+            return None
+        
+        entry = self.undo_stack.pop()
+        label, step, rng, rng_before, _ = entry
+        for delta in reversed(step):
+            _revert(delta)
+        if rng is not None:
+            entry[4] = rng.getstate()
+            rng.setstate(rng_before)
+        self.redo_stack.append(entry)
+        return label
+    
+    def redo(self):
+        """
+        Rehacer el último paso deshecho.
+        
+        Returns:
+            str: Nombre de la acción rehecha, o None si no había ninguna.
+        """
+        if not self.redo_stack:
+            return None
+        
+        entry = self.redo_stack.pop()
+        label, step, rng, _, rng_after = entry
+        for delta in step:
+            _apply(delta)
+        if rng is not None:
+            rng.setstate(rng_after)
+        self.undo_stack.append(entry)
+        return label
+
+
+def _revert(delta):
+    """Deshacer un delta."""
+    kind = delta[0]
+    if kind == "attr":
+        _, obj, name, old, _ = delta
+        setattr(obj, name, old)
+    elif kind == "item":
+        _, mapping, key, old, _ = delta
+        if old is _MISSING:
+            del mapping[key]
+        else:
+            mapping[key] = old
+    elif kind == "insert":
+        _, sequence, index, _ = delta
+        del sequence[index]
+    elif kind == "delete":
+        _, sequence, index, item = delta
+        sequence.insert(index, item)
+    elif kind == "extend":
+        _, sequence, start, items = delta
+        del sequence[start:start + len(items)]
+
+def _apply(delta):
+    """Rehacer un delta."""
+    kind = delta[0]
+    if kind == "attr":
+        _, obj, name, _, new = delta
+        setattr(obj, name, new)
+    elif kind == "item":
+        _, mapping, key, _, new = delta
+        mapping[key] = new
+    elif kind == "insert":
+        _, sequence, index, item = delta
+        sequence.insert(index, item)
+    elif kind == "delete":
+        _, sequence, index, _ = delta
+        del sequence[index]
+    elif kind == "extend":
+        _, sequence, start, items = delta
+        sequence[start:start] = items
+
+def undoable(method):
+    """Decorador de métodos de CombatEngine: agrupa sus cambios en un paso deshacible."""
+    @functools.wraps(method)
+    def wrapper(engine, *args, **kwargs):
+        history = engine.history
+        if history is None:
+            return method(engine, *args, **kwargs)
+        
+        history.begin(engine)
+        try:
+            return method(engine, *args, **kwargs)
+        finally:
+            history.end(engine, method.__name__)
+    return wrapper
\ No newline at end of file
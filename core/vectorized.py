@@ -0,0 +1,185 @@
+# core/vectorized.py
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: solo lo necesita este módulo
+    np = None
+
+from core.simulation import DEFAULT_MAX_ROUNDS
+
+# Códigos de ganador en los arrays de resultados
+WINNER_NONE = 0
+WINNER_CHARACTERS = 1
+WINNER_MONSTERS = 2
+
+
+def pack_entities(characters, monsters):
+    """
+    Empaquetar las estadísticas de combate en arrays (estructura de arrays).
+
+    Los personajes ocupan las primeras posiciones y los monstruos las siguientes,
+    el mismo orden que usa CombatEngine.roll_initiative para desempatar.
+
+    Args:
+        characters (list): Lista de objetos Character.
+        monsters (list): Lista de objetos Monster.
+
+    Returns:
+        dict: Arrays de NumPy indexados por entidad con HP, CA, iniciativa, bando
+              y el perfil de ataque de cada una (ver get_attack_profile). Los dados
+              de daño van un dado por columna: "dice_faces" (0 en las columnas
+              sobrantes) y "dice_signs" (-1 en los términos que restan).
+    """
+    if np is None:
+        raise ImportError("El núcleo vectorizado necesita NumPy (pip install numpy)")
+
+    entities = list(characters) + list(monsters)
+    profiles = [entity.get_attack_profile() for entity in entities]
+
+    def column(key, default=0):
+        return np.array([p[key] if p else default for p in profiles], dtype=np.int64)
+
+    # Un dado por columna, con el signo de su término
+    dice = [[(sign, dice_type) for sign, num_dice, dice_type in p["damage_terms"] for _ in range(num_dice)]
+            if p else [] for p in profiles]
+    max_dice = max([1] + [len(row) for row in dice])
+    dice_faces = np.zeros((len(entities), max_dice), dtype=np.int64)
+    dice_signs = np.zeros((len(entities), max_dice), dtype=np.int64)
+    for i, row in enumerate(dice):
+        for j, (sign, dice_type) in enumerate(row):
+            dice_faces[i, j] = dice_type
+            dice_signs[i, j] = sign
+
+    return {
+        "hp": np.array([e.current_hp for e in entities], dtype=np.int64),
+        "alive": np.array([e.is_alive for e in entities], dtype=bool),
+        "armor_class": np.array([e.get_armor_class() for e in entities], dtype=np.int64),
+        "initiative_mod": np.array([e.initiative_mod for e in entities], dtype=np.int64),
+        "is_character": np.array([i < len(characters) for i in range(len(entities))], dtype=bool),
+        "can_attack": np.array([p is not None for p in profiles], dtype=bool),
+        "attack_bonus": column("attack_bonus"),
+        "dice_faces": dice_faces,
+        "dice_signs": dice_signs,
+        "hit_damage": column("hit_damage"),
+        "crit_damage": column("crit_damage"),
+        "placeholder_damage": column("placeholder_damage")
+    }
+
+
+def _take_damage(hp, alive, amount):
+    """Versión vectorizada de Entity.take_damage: devuelve (hp, alive) nuevos."""
+    # Con modificadores negativos el daño no puede curar
+    hp = np.maximum(0, hp - np.maximum(amount, 0))
+    return hp, alive & (hp != 0)
+
+
+def simulate_vectorized(characters, monsters, n_encounters, max_rounds=DEFAULT_MAX_ROUNDS, seed=None):
+    """
+    Simular muchos combates independientes a la vez con operaciones de NumPy.
+
+    Reproduce las reglas de CombatEngine.attack (sin ventaja de 20 natural para
+    impactar, dados doblados en crítico y el daño provisional de attack()) y la
+    política de core.simulation: cada entidad ataca a un enemigo vivo al azar.
+    Los hechizos de los monstruos no se modelan; para eso usar simulate().
+
+    Args:
+        characters (list): Lista de objetos Character.
+        monsters (list): Lista de objetos Monster.
+        n_encounters (int): Número de combates a simular.
+        max_rounds (int, optional): Rondas máximas por combate.
+        seed (int, optional): Semilla del generador de NumPy.
+
+    Returns:
+        dict: Mismas estadísticas que summarize_runs, con arrays por combate en
+              lugar de la lista de resultados ("winner", "rounds", "character_hp",
+              "monster_hp").
+    """
+    stats = pack_entities(characters, monsters)
+    rng = np.random.default_rng(seed)
+
+    n = n_encounters
+    n_entities = len(stats["hp"])
+    n_characters = len(characters)
+    rows = np.arange(n)
+    max_dice = stats["dice_faces"].shape[1]
+
+    hp = np.tile(stats["hp"], (n, 1))
+    alive = np.tile(stats["alive"], (n, 1))
+    is_character = stats["is_character"]
+
+    # Iniciativa: orden descendente estable, igual que sorted(..., reverse=True)
+    initiative = rng.integers(1, 21, size=(n, n_entities)) + stats["initiative_mod"]
+    order = np.argsort(-initiative, axis=1, kind="stable")
+
+    winner = np.full(n, WINNER_NONE, dtype=np.int8)
+    rounds = np.full(n, max_rounds + 1, dtype=np.int64)
+
+    def update_winner(round_number):
+        characters_alive = alive[:, is_character].any(axis=1)
+        monsters_alive = alive[:, ~is_character].any(axis=1)
+        pending = winner == WINNER_NONE
+
+        lost = pending & ~characters_alive
+        won = pending & characters_alive & ~monsters_alive
+        winner[lost] = WINNER_MONSTERS
+        winner[won] = WINNER_CHARACTERS
+        rounds[lost | won] = round_number
+
+    update_winner(1)
+
+    for round_number in range(1, max_rounds + 1):
+        if not (winner == WINNER_NONE).any():
+            break
+
+        for position in range(n_entities):
+            actor = order[:, position]
+            active = (winner == WINNER_NONE) & alive[rows, actor] & stats["can_attack"][actor]
+
+            # Elegir un enemigo vivo uniformemente al azar
+            actor_is_character = is_character[actor]
+            enemies = alive & (is_character[None, :] != actor_is_character[:, None])
+            weights = np.where(enemies, rng.random((n, n_entities)), -1.0)
+            target = weights.argmax(axis=1)
+            active &= enemies[rows, target]
+
+            attack_roll = rng.integers(1, 21, size=n)
+            hit = active & (attack_roll + stats["attack_bonus"][actor] >= stats["armor_class"][target])
+            critical = hit & (attack_roll == 20)
+
+            # Dados del arma del atacante (columnas sobrantes a cero)
+            faces = stats["dice_faces"][actor]
+            dice = np.floor(rng.random((n, max_dice)) * faces).astype(np.int64) + 1
+            dice[faces == 0] = 0
+
+            # En crítico el motor duplica la suma de todas las tiradas, sin signo
+            damage = np.where(critical,
+                              dice.sum(axis=1) * 2 + stats["crit_damage"][actor],
+                              (dice * stats["dice_signs"][actor]).sum(axis=1) + stats["hit_damage"][actor])
+
+            # Daño provisional de attack() seguido del daño real del motor
+            target_hp, target_alive = hp[rows, target], alive[rows, target]
+            target_hp, target_alive = _take_damage(target_hp, target_alive, stats["placeholder_damage"][actor])
+            target_hp, target_alive = _take_damage(target_hp, target_alive, damage)
+
+            hp[rows[hit], target[hit]] = target_hp[hit]
+            alive[rows[hit], target[hit]] = target_alive[hit]
+
+            update_winner(round_number)
+
+    n_wins = int((winner == WINNER_CHARACTERS).sum())
+    n_losses = int((winner == WINNER_MONSTERS).sum())
+    character_hp = hp[:, :n_characters]
+
+    return {
+        "runs": n,
+        "wins": n_wins,
+        "losses": n_losses,
+        "draws": n - n_wins - n_losses,
+        "win_rate": n_wins / n if n else 0.0,
+        "average_rounds": float(rounds.mean()) if n else 0.0,
+        "average_party_hp": float(character_hp.sum(axis=1).mean()) if n else 0.0,
+        "seed": seed,
+        "winner": winner,
+        "rounds": rounds,
+        "character_hp": character_hp,
+        "monster_hp": hp[:, n_characters:]
+    }
\ No newline at end of file
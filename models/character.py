@@ -1,10 +1,24 @@
 # models/character.py
 from models.entity import Entity
-from core.dice import Dice
+from core.dice import Dice, DiceExpr
+
+# Nombre de cada atributo en los efectos (Effect.attribute)
+ATTRIBUTE_EFFECT_KEYS = {
+    "strength": "fuerza",
+    "dexterity": "destreza",
+    "constitution": "constitución",
+    "intelligence": "inteligencia",
+    "wisdom": "sabiduría",
+    "charisma": "carisma"
+}
 
 class Character(Entity):
     """Clase que representa a un personaje jugador."""
     
+    __slots__ = ("strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma",
+                 "level", "proficiency_bonus", "experience", "weapon", "spells", "abilities",
+                 "max_mana", "current_mana", "spell_slots")
+    
     def __init__(self, name, max_hp, armor_class, 
                  strength, dexterity, constitution, intelligence, wisdom, charisma,
                  level=1, proficiency_bonus=2):
@@ -37,29 +51,44 @@ class Character(Entity):
         """Calcular el modificador de atributo."""
         return (stat - 10) // 2
     
-    def get_attack_modifier(self, weapon=None):
-        """Obtener el modificador de ataque para un arma específica."""
+    def get_attribute(self, name):
+        """
+        Obtener el valor efectivo de un atributo (base más los efectos que lo modifican).
+        
+        Args:
+            name (str): Nombre del atributo ("strength", "dexterity"...).
+        """
+        return getattr(self, name) + self.modifiers.get(ATTRIBUTE_EFFECT_KEYS[name], 0)
+    
+    def _weapon_ability_modifier(self, weapon):
+        """Modificador de atributo que usa un arma."""
         if weapon and weapon.get('finesse', False):
             # Usar el mejor entre FUE o DES para armas con finesse
-            return max(self._get_modifier(self.strength), self._get_modifier(self.dexterity)) + self.proficiency_bonus
+            return max(self._get_modifier(self.get_attribute("strength")),
+                       self._get_modifier(self.get_attribute("dexterity")))
         else:
             # Por defecto FUE para cuerpo a cuerpo, DES para a distancia
             if weapon and weapon.get('type') == 'ranged':
-                return self._get_modifier(self.dexterity) + self.proficiency_bonus
+                return self._get_modifier(self.get_attribute("dexterity"))
             else:
-                return self._get_modifier(self.strength) + self.proficiency_bonus
+                return self._get_modifier(self.get_attribute("strength"))
+    
+    def get_attack_modifier(self, weapon=None):
+        """Obtener el modificador de ataque para un arma específica (incluye los efectos de ataque)."""
+        return self._weapon_ability_modifier(weapon) + self.proficiency_bonus + self.modifiers.get("ataque", 0)
     
     def get_damage_modifier(self, weapon=None):
-        """Obtener el modificador de daño para un arma específica."""
-        if weapon and weapon.get('finesse', False):
-            # Usar el mejor entre FUE o DES para armas con finesse
-            return max(self._get_modifier(self.strength), self._get_modifier(self.dexterity))
-        else:
-            # Por defecto FUE para cuerpo a cuerpo, DES para a distancia
-            if weapon and weapon.get('type') == 'ranged':
-                return self._get_modifier(self.dexterity)
-            else:
-                return self._get_modifier(self.strength)
+        """Obtener el modificador de daño para un arma específica (incluye los efectos de daño)."""
+        return self._weapon_ability_modifier(weapon) + self.modifiers.get("daño", 0)
+    
+    def get_spell_attack_modifier(self):
+        """Obtener el modificador de ataque de los hechizos (inteligencia, competencia y efectos de ataque)."""
+        return (self._get_modifier(self.get_attribute("intelligence")) + self.proficiency_bonus
+                + self.modifiers.get("ataque", 0))
+    
+    def get_spell_save_dc(self):
+        """Obtener la CD de salvación de los hechizos (8 + competencia + inteligencia)."""
+        return 8 + self.proficiency_bonus + self._get_modifier(self.get_attribute("intelligence"))
     
     def calculate_max_mana(self):
         """Calcular puntos de maná máximos basados en nivel e inteligencia."""
@@ -123,9 +152,10 @@ class Character(Entity):
         total_attack_roll = attack_roll + attack_mod
         
         result = f"{self.name} ataca a {target.name} con {self.weapon['name']} - "
-        result += f"Tirada: {attack_roll} + {attack_mod} = {total_attack_roll} vs CA {target.armor_class}"
+        target_ac = target.get_armor_class()
+        result += f"Tirada: {attack_roll} + {attack_mod} = {total_attack_roll} vs CA {target_ac}"
         
-        if total_attack_roll >= target.armor_class:
+        if total_attack_roll >= target_ac:
             # Impacto
             damage_dice = self.weapon['damage_dice']
             damage_mod = self.get_damage_modifier(self.weapon)
@@ -142,6 +172,29 @@ class Character(Entity):
         
         return result
     
+    def get_attack_profile(self):
+        """
+        Describir cómo resuelve CombatEngine.attack un ataque con el arma actual.
+        
+        Returns:
+            dict: Bono de ataque, términos de dados de daño (signo, número, caras),
+                  daño fijo en impacto normal y en crítico, y el daño que aplica
+                  attack() antes de la tirada real del motor. None si no hay arma equipada.
+        """
+        if not self.weapon:
+            return None
+        
+        damage_dice = DiceExpr.compile(self.weapon['damage_dice'])
+        damage_mod = self.get_damage_modifier(self.weapon)
+        
+        return {
+            "attack_bonus": self.get_attack_modifier(self.weapon),
+            "damage_terms": damage_dice.terms,
+            "hit_damage": damage_dice.modifier + damage_mod,
+            "crit_damage": damage_dice.modifier + damage_mod,
+            "placeholder_damage": damage_mod
+        }
+    
     def add_spell(self, spell):
         """
         Añadir un hechizo al repertorio del personaje.
@@ -156,7 +209,8 @@ class Character(Entity):
         if any(s.name.lower() == spell.name.lower() for s in self.spells):
             return f"{self.name} ya conoce el hechizo {spell.name}."
         
-        self.spells.append(spell)
+        # Lista nueva en lugar de append: las copias de CombatEngine.fork la comparten
+        self.spells = self.spells + [spell]
         return f"{self.name} ha aprendido el hechizo {spell.name}!"
 
     def remove_spell(self, spell_name):
@@ -215,10 +269,12 @@ class Character(Entity):
         
         if self.spell_slots.get(level, 0) > 0:
             self.spell_slots[level] -= 1
+            if self.journal is not None:
+                self.journal.record_item(self.spell_slots, level, self.spell_slots[level] + 1)
             return True
         return False
     
-    def cast_spell(self, spell, target=None, spell_level=None):
+    def cast_spell(self, spell, target=None, spell_level=None, rng=None):
         """
         Lanzar un hechizo.
         
@@ -226,11 +282,13 @@ class Character(Entity):
             spell (Spell): El hechizo a lanzar.
             target (Entity, optional): Objetivo del hechizo si es necesario.
             spell_level (int, optional): Nivel al que lanzar el hechizo (para potenciar).
+            rng (CombatRNG, optional): Generador del combate. Por defecto el módulo random.
             
         Returns:
             str: Resultado del lanzamiento del hechizo.
         """
         import random
+        rng = rng or random
         
         if not self.is_alive:
             return f"{self.name} está derrotado y no puede lanzar hechizos!"
@@ -255,23 +313,10 @@ class Character(Entity):
         # Aplicar efectos del hechizo según su tipo
         if spell.healing_dice and target:
             # Escalar curación si se lanza a nivel superior
-            healing_formula = spell.healing_dice
-            if cast_level > spell.level:
-                # Añadir dados adicionales por nivel
-                level_diff = cast_level - spell.level
-                # Extraer el número de dados y tipo
-                dice_parts = spell.healing_dice.split('d')
-                if len(dice_parts) == 2 and dice_parts[0].isdigit():
-                    num_dice = int(dice_parts[0]) + level_diff
-                    dice_type = dice_parts[1]
-                    healing_formula = f"{num_dice}d{dice_type}"
+            healing_formula = spell.scale_dice(spell.healing_dice, cast_level)
             
-            # Calcular curación
-            healing_roll, dice_rolls, mod = Dice.roll(healing_formula)
-            if "modificador" in healing_formula:
-                # Añadir modificador de habilidad
-                modifier = self._get_modifier(self.wisdom)  # Usar sabiduría como estándar
-                healing_roll += modifier
+            # Calcular curación; "modificador" usa la sabiduría como estándar
+            healing_roll, dice_rolls, mod = Dice.roll(healing_formula, {"modificador": self._get_modifier(self.wisdom)}, rng)
             
             # Aplicar curación
             heal_message = target.heal(healing_roll)
@@ -279,29 +324,22 @@ class Character(Entity):
         
         elif spell.damage_dice and target:
             # Escalar daño si se lanza a nivel superior
-            damage_formula = spell.damage_dice
-            if cast_level > spell.level:
-                # Añadir dados adicionales por nivel
-                level_diff = cast_level - spell.level
-                # Extraer el número de dados y tipo
-                dice_parts = spell.damage_dice.split('d')
-                if len(dice_parts) == 2 and dice_parts[0].isdigit():
-                    num_dice = int(dice_parts[0]) + level_diff
-                    dice_type = dice_parts[1]
-                    damage_formula = f"{num_dice}d{dice_type}"
+            damage_formula = spell.scale_dice(spell.damage_dice, cast_level)
             
             # Calcular daño
-            damage_roll, dice_rolls, mod = Dice.roll(damage_formula)
+            damage_roll, dice_rolls, mod = Dice.roll(damage_formula, rng=rng)
             
             # Si requiere tirada de ataque
             if spell.attack_roll:
-                attack_roll = random.randint(1, 20)
-                spell_mod = self._get_modifier(self.intelligence)  # Usar inteligencia como estándar
-                spell_attack = attack_roll + spell_mod + self.proficiency_bonus
+                attack_roll = rng.randint(1, 20)
+                # Inteligencia como estándar, más competencia y efectos de ataque
+                spell_mod = self.get_spell_attack_modifier()
+                spell_attack = attack_roll + spell_mod
                 
-                result += f"\nTirada de ataque: {attack_roll} + {spell_mod} + {self.proficiency_bonus} = {spell_attack} vs CA {target.armor_class}"
+                target_ac = target.get_armor_class()
+                result += f"\nTirada de ataque: {attack_roll} + {spell_mod} = {spell_attack} vs CA {target_ac}"
                 
-                if spell_attack >= target.armor_class:
+                if spell_attack >= target_ac:
                     result += f"\n¡IMPACTO! Daño: {'+'.join(map(str, dice_rolls))} ({sum(dice_rolls)}) = {damage_roll} de daño {spell.damage_type}"
                     target.take_damage(damage_roll)
                 else:
@@ -313,8 +351,8 @@ class Character(Entity):
                 result += f"\n{target.name} debe realizar una tirada de salvación de {spell.saving_throw}"
                 
                 # Simular la tirada de salvación (esto sería diferente en un combate real)
-                save_dc = 8 + self.proficiency_bonus + self._get_modifier(self.intelligence)
-                save_roll = random.randint(1, 20)
+                save_dc = self.get_spell_save_dc()
+                save_roll = rng.randint(1, 20)
                 
                 # Determinar el modificador del objetivo basado en el atributo requerido
                 # (Esto es una simplificación, en un caso real se usaría el modificador del objetivo)
@@ -397,7 +435,7 @@ class Character(Entity):
         removed_effects = []
         for effect in list(self.effects):
             if effect.duration != -1:  # Si no es permanente
-                self.effects.remove(effect)
+                effect.remove(self)
                 removed_effects.append(effect.name)
         
         result = f"{self.name} toma un descanso largo y está completamente restaurado!"
@@ -416,6 +454,26 @@ class Character(Entity):
         # Implementación de marcador
         return max(0, self.level // 2)
     
+    def clone(self):
+        """Copiar el personaje para CombatEngine.fork (ver Entity.clone)."""
+        clone = super().clone()
+        clone.strength = self.strength
+        clone.dexterity = self.dexterity
+        clone.constitution = self.constitution
+        clone.intelligence = self.intelligence
+        clone.wisdom = self.wisdom
+        clone.charisma = self.charisma
+        clone.level = self.level
+        clone.proficiency_bonus = self.proficiency_bonus
+        clone.experience = self.experience
+        clone.weapon = self.weapon
+        clone.spells = self.spells
+        clone.abilities = self.abilities
+        clone.max_mana = self.max_mana
+        clone.current_mana = self.current_mana
+        clone.spell_slots = dict(self.spell_slots)
+        return clone
+    
     def to_dict(self):
         """Convertir el personaje a un diccionario para serialización."""
         data = super().to_dict()
@@ -460,17 +518,19 @@ class Character(Entity):
         character.experience = data.get("experience", 0)
         character.weapon = data.get("weapon")
         
-        # Cargar hechizos
+        # Cargar hechizos (compartidos con otras entidades que conocen los mismos)
         from models.spell import Spell
-        character.spells = [Spell.from_dict(spell_data) for spell_data in data.get("spells", [])]
+        character.spells = [Spell.shared_from_dict(spell_data) for spell_data in data.get("spells", [])]
         
         character.abilities = data.get("abilities", [])
-        character.spell_slots = data.get("spell_slots", {})
+        # JSON convierte las claves a texto; los niveles de espacio son enteros
+        character.spell_slots = {int(level): slots for level, slots in data.get("spell_slots", {}).items()}
         character.max_mana = data.get("max_mana", character.calculate_max_mana())
         character.current_mana = data.get("current_mana", character.max_mana)
         
         # Cargar efectos
         from models.effect import Effect
         character.effects = [Effect.from_dict(effect_data) for effect_data in data.get("effects", [])]
+        character.refresh_modifiers()
         
         return character
\ No newline at end of file
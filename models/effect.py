@@ -2,6 +2,9 @@
 class Effect:
     """Clase que representa un efecto o estado que puede afectar a una entidad."""
     
+    __slots__ = ("name", "description", "duration", "effect_type", "modifier",
+                 "attribute", "value", "remaining_turns", "expires_at")
+    
     def __init__(self, name, description, duration, effect_type, 
                  modifier=None, attribute=None, value=0):
         """
@@ -24,6 +27,8 @@ class Effect:
         self.attribute = attribute
         self.value = value
         self.remaining_turns = duration
+        # (ronda, posición en la iniciativa) en que vence durante un combate (ver core.effect_scheduler)
+        self.expires_at = None
     
     def apply(self, entity):
         """
@@ -37,6 +42,9 @@ class Effect:
         """
         # Añadir el efecto a la lista de efectos de la entidad
         entity.effects.append(self)
+        if entity.journal is not None:
+            entity.journal.record_insert(entity.effects, len(entity.effects) - 1, self)
+        entity.adjust_modifiers(self, 1)
         
         return f"{entity.name} está afectado por {self.name}. {self.description}"
     
@@ -52,7 +60,11 @@ class Effect:
         """
         # Eliminar el efecto de la lista de efectos de la entidad
         if self in entity.effects:
-            entity.effects.remove(self)
+            index = entity.effects.index(self)
+            del entity.effects[index]
+            if entity.journal is not None:
+                entity.journal.record_delete(entity.effects, index, self)
+            entity.adjust_modifiers(self, -1)
         
         return f"El efecto {self.name} ha terminado para {entity.name}."
     
@@ -71,12 +83,56 @@ class Effect:
             return True
         
         self.remaining_turns -= 1
+        if entity.journal is not None:
+            entity.journal.record_attribute(self, "remaining_turns", self.remaining_turns + 1)
         
         if self.remaining_turns <= 0:
             self.remove(entity)
             return False
         return True
     
+    def expire(self, entity):
+        """
+        Terminar el efecto porque se agotó su duración (lo llama el motor de combate).
+        
+        Args:
+            entity: La entidad afectada.
+            
+        Returns:
+            str: Mensaje describiendo el efecto eliminado.
+        """
+        old_turns = self.remaining_turns
+        self.remaining_turns = 0
+        if entity.journal is not None:
+            entity.journal.record_attribute(self, "remaining_turns", old_turns)
+        return self.remove(entity)
+    
+    def copy(self):
+        """Crear una copia independiente del efecto (con sus turnos restantes)."""
+        clone = object.__new__(Effect)
+        for name in Effect.__slots__:
+            setattr(clone, name, getattr(self, name))
+        return clone
+    
+    def modifier_keys(self):
+        """
+        Obtener las claves del efecto en el caché de modificadores de la entidad.
+        
+        Un efecto puede indicar a la vez el tipo de modificación y el atributo
+        (p. ej. modifier "ataque" con attribute "FU"); su valor cuenta para los dos.
+        
+        Returns:
+            tuple: El tipo de modificación y el atributo afectado (en minúsculas
+                   y sin repetir), vacía si el efecto no modifica nada.
+        """
+        if not self.value:
+            return ()
+        keys = []
+        for key in (self.modifier, self.attribute):
+            if key and key.lower() not in keys:
+                keys.append(key.lower())
+        return tuple(keys)
+    
     def get_modifier_value(self):
         """
         Obtener el valor de modificación del efecto.
@@ -96,7 +152,8 @@ class Effect:
             "modifier": self.modifier,
             "attribute": self.attribute,
             "value": self.value,
-            "remaining_turns": self.remaining_turns
+            "remaining_turns": self.remaining_turns,
+            "expires_at": self.expires_at
         }
     
     @classmethod
@@ -112,4 +169,7 @@ class Effect:
             value=data.get("value", 0)
         )
         effect.remaining_turns = data.get("remaining_turns", effect.duration)
+        # JSON convierte la tupla en lista
+        expires_at = data.get("expires_at")
+        effect.expires_at = tuple(expires_at) if expires_at is not None else None
         return effect
\ No newline at end of file
@@ -2,7 +2,17 @@ from abc import ABC, abstractmethod
 import json
 
 class Entity(ABC):
-    """Clase base para todas las entidades del juego (personajes y monstruos)."""
+    """
+    Clase base para todas las entidades del juego (personajes y monstruos).
+    
+    Las entidades usan __slots__ en lugar de un __dict__ por instancia: en
+    rosters y batallas de cientos de miles de entidades el diccionario de
+    atributos era la mayor parte de la memoria de cada una. Las subclases
+    deben declarar en sus __slots__ todos los atributos que asignan.
+    """
+    
+    __slots__ = ("name", "max_hp", "current_hp", "armor_class", "initiative_mod",
+                 "initiative_roll", "is_alive", "effects", "modifiers", "journal")
     
     def __init__(self, name, max_hp, armor_class, initiative_mod=0):
         self.name = name
@@ -13,12 +23,22 @@ class Entity(ABC):
         self.initiative_roll = 0
         self.is_alive = True
         self.effects = []  # Efectos de estado
+        # Suma de los efectos activos por modificador ("ataque", "daño", "ca"...) y
+        # por atributo ("fuerza"...); Effect.apply y Effect.remove la mantienen al día
+        self.modifiers = {}
+        self.journal = None  # Historial de deshacer del combate (ver core.undo)
         
     def take_damage(self, amount):
         """Aplicar daño a la entidad."""
+        # Con modificadores negativos el daño no puede curar
+        amount = max(0, amount)
+        old_hp, old_alive = self.current_hp, self.is_alive
         self.current_hp = max(0, self.current_hp - amount)
         if self.current_hp == 0:
             self.is_alive = False
+        if self.journal is not None:
+            self.journal.record_attribute(self, "current_hp", old_hp)
+            self.journal.record_attribute(self, "is_alive", old_alive)
         return f"{self.name} recibe {amount} de daño! HP: {self.current_hp}/{self.max_hp}"
         
     def heal(self, amount):
@@ -26,16 +46,86 @@ class Entity(ABC):
         if not self.is_alive:
             return f"{self.name} está derrotado y no puede ser curado!"
         
+        old_hp, old_alive = self.current_hp, self.is_alive
         self.current_hp = min(self.max_hp, self.current_hp + amount)
         if self.current_hp > 0:
             self.is_alive = True
+        if self.journal is not None:
+            self.journal.record_attribute(self, "current_hp", old_hp)
+            self.journal.record_attribute(self, "is_alive", old_alive)
         return f"{self.name} se cura {amount} HP! HP: {self.current_hp}/{self.max_hp}"
     
     def roll_initiative(self, initiative_roll):
         """Establecer la tirada de iniciativa para esta entidad."""
+        old_roll = self.initiative_roll
         self.initiative_roll = initiative_roll + self.initiative_mod
+        if self.journal is not None:
+            self.journal.record_attribute(self, "initiative_roll", old_roll)
         return self.initiative_roll
     
+    def get_effect_modifier(self, key):
+        """
+        Obtener la suma de los efectos activos para un modificador o atributo.
+        
+        Args:
+            key (str): Modificador ("ataque", "daño", "ca") o atributo ("fuerza"...).
+            
+        Returns:
+            int: Total de los efectos (0 si no hay ninguno).
+        """
+        return self.modifiers.get(key, 0)
+    
+    def get_armor_class(self):
+        """Obtener la CA efectiva (base más los efectos de CA)."""
+        return self.armor_class + self.modifiers.get("ca", 0)
+    
+    def adjust_modifiers(self, effect, sign):
+        """
+        Sumar (sign=1) o restar (sign=-1) la modificación de un efecto al caché de modificadores.
+        
+        El caché no pasa por el historial de deshacer: es un derivado de la
+        lista de efectos y CombatEngine lo recalcula al deshacer o rehacer.
+        
+        Args:
+            effect (Effect): Efecto que se aplica o se elimina.
+            sign (int): 1 al aplicarlo, -1 al eliminarlo.
+        """
+        for key in effect.modifier_keys():
+            self.modifiers[key] = self.modifiers.get(key, 0) + sign * effect.value
+    
+    def refresh_modifiers(self):
+        """Recalcular el caché de modificadores desde los efectos (tras asignar la lista directamente)."""
+        self.modifiers = {}
+        for effect in self.effects:
+            for key in effect.modifier_keys():
+                self.modifiers[key] = self.modifiers.get(key, 0) + effect.value
+    
+    def clone(self):
+        """
+        Copiar la entidad para CombatEngine.fork.
+        
+        Los atributos se comparten con el original; solo se copian los
+        contenedores que el combate modifica en su sitio (los efectos, y en las
+        subclases los espacios de hechizo). Las listas de hechizos y habilidades
+        se comparten porque se sustituyen en lugar de modificarse.
+        
+        Cada clase copia explícitamente los atributos de sus __slots__ (una
+        asignación directa es varias veces más rápida que recorrerlos con
+        getattr/setattr), así que un atributo nuevo debe añadirse también aquí.
+        """
+        clone = object.__new__(self.__class__)
+        clone.name = self.name
+        clone.max_hp = self.max_hp
+        clone.current_hp = self.current_hp
+        clone.armor_class = self.armor_class
+        clone.initiative_mod = self.initiative_mod
+        clone.initiative_roll = self.initiative_roll
+        clone.is_alive = self.is_alive
+        clone.effects = [effect.copy() for effect in self.effects]
+        clone.modifiers = dict(self.modifiers)
+        clone.journal = self.journal
+        return clone
+    
     def get_status(self):
         """Obtener el estado actual de la entidad."""
         status = "Vivo" if self.is_alive else "Derrotado"
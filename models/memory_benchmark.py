@@ -0,0 +1,116 @@
+# models/memory_benchmark.py
+import argparse
+import json
+import sys
+import tracemalloc
+
+from models.character import Character
+from models.monster import Monster
+
+# Catálogo pequeño: en una campaña grande muchos lanzadores conocen los mismos hechizos
+_SPELLS = [
+    {"name": f"Hechizo {index}", "description": "Un destello de energía arcana golpea al objetivo.",
+     "spell_type": "Ofensivo", "level": index % 4, "cast_time": "1 acción", "range": "60 pies",
+     "components": "V, S", "duration": "Instantáneo", "attack_roll": index % 2 == 0,
+     "saving_throw": None, "saving_throw_attribute": None, "damage_dice": "2d6",
+     "damage_type": "fuerza", "healing_dice": None, "aoe_type": None, "aoe_size": None,
+     "effects": []}
+    for index in range(12)
+]
+
+_EFFECT = {"name": "Bendecido", "description": "Suma 1d4 a las tiradas de ataque.", "duration": 10,
+           "effect_type": "positivo", "modifier": "ataque", "attribute": None, "value": 2,
+           "remaining_turns": 10}
+
+
+def _character_data(index):
+    """Diccionario de un personaje como el de characters.json."""
+    return {
+        "name": f"Personaje {index}", "max_hp": 30, "current_hp": 30, "armor_class": 15,
+        "initiative_mod": 2, "is_alive": True, "strength": 14, "dexterity": 15, "constitution": 12,
+        "intelligence": 16, "wisdom": 10, "charisma": 8, "level": 5, "proficiency_bonus": 3,
+        "experience": 6500, "weapon": {"name": "Espada larga", "type": "melee", "damage_dice": "1d8", "finesse": False},
+        "spells": [_SPELLS[(index + offset) % len(_SPELLS)] for offset in range(4)],
+        "abilities": [], "spell_slots": {"1": 4, "2": 3, "3": 2}, "max_mana": 65, "current_mana": 65,
+        "effects": [_EFFECT] if index % 4 == 0 else []
+    }
+
+
+def _monster_data(index):
+    """Diccionario de un monstruo como el de monsters.json."""
+    return {
+        "name": f"Monstruo {index}", "max_hp": 15, "current_hp": 15, "armor_class": 12,
+        "initiative_mod": 1, "is_alive": True, "attack_bonus": 4, "damage_dice": "1d6",
+        "damage_bonus": 2, "challenge_rating": 1, "experience_reward": 200, "abilities": [],
+        "spells": [_SPELLS[index % len(_SPELLS)]] if index % 3 == 0 else [],
+        "spell_slots": {"1": 2} if index % 3 == 0 else {}, "spell_dc": 10,
+        "effects": [_EFFECT] if index % 4 == 0 else []
+    }
+
+
+def build_entities(count):
+    """
+    Crear count entidades (mitad personajes, mitad monstruos) con from_dict.
+    
+    Cada diccionario se decodifica de su propio texto JSON, igual que al
+    cargar una lista de DataManager, para que ninguna cadena venga ya
+    compartida de la plantilla.
+    """
+    entities = []
+    for index in range(count):
+        if index % 2 == 0:
+            entities.append(Character.from_dict(json.loads(json.dumps(_character_data(index)))))
+        else:
+            entities.append(Monster.from_dict(json.loads(json.dumps(_monster_data(index)))))
+    return entities
+
+
+def measure(count):
+    """
+    Medir la memoria que retienen count entidades.
+    
+    Args:
+        count (int): Número de entidades a crear.
+    
+    Returns:
+        dict: Bytes retenidos en total y por entidad (según tracemalloc).
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = build_entities(count)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    
+    return {"entities": len(entities), "bytes": retained, "bytes_per_entity": retained / count}
+
+
+def _peak_rss():
+    """Memoria residente máxima del proceso en bytes, o None si no se puede consultar."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB y macOS en bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def main(argv=None):
+    """Punto de entrada: python -m models.memory_benchmark [--count N]"""
+    parser = argparse.ArgumentParser(description="Memoria retenida por un roster grande de entidades.")
+    parser.add_argument("--count", type=int, default=100000, help="Entidades a crear")
+    args = parser.parse_args(argv)
+    
+    result = measure(args.count)
+    print(f"Entidades: {result['entities']}")
+    print(f"Memoria retenida: {result['bytes'] / 2 ** 20:.1f} MB ({result['bytes_per_entity']:.0f} bytes por entidad)")
+    
+    peak = _peak_rss()
+    if peak is not None:
+        print(f"Memoria residente máxima del proceso: {peak / 2 ** 20:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,13 @@
 # models/monster.py
 from models.entity import Entity
-from core.dice import Dice
+from core.dice import Dice, DiceExpr
 
 class Monster(Entity):
     """Clase que representa a un monstruo o enemigo."""
     
+    __slots__ = ("attack_bonus", "damage_dice", "damage_bonus", "challenge_rating",
+                 "experience_reward", "abilities", "spells", "spell_slots", "spell_dc")
+    
     def __init__(self, name, max_hp, armor_class, initiative_mod=0, 
                  attack_bonus=0, damage_dice="1d6", damage_bonus=0, 
                  challenge_rating=0, experience_reward=0):
@@ -25,23 +28,38 @@ class Monster(Entity):
         self.spell_slots = {}
         self.spell_dc = 10 + self.challenge_rating // 2
     
+    def get_attack_modifier(self, weapon=None):
+        """Obtener el bono de ataque (incluye los efectos de ataque). weapon se ignora."""
+        return self.attack_bonus + self.modifiers.get("ataque", 0)
+    
+    def get_damage_modifier(self, weapon=None):
+        """Obtener el bono de daño (incluye los efectos de daño). weapon se ignora."""
+        return self.damage_bonus + self.modifiers.get("daño", 0)
+    
+    def get_spell_save_dc(self):
+        """Obtener la CD de salvación de los hechizos."""
+        return self.spell_dc
+    
     def attack(self, target, attack_roll):
         """Atacar a otra entidad."""
         if not self.is_alive:
             return f"{self.name} está derrotado y no puede atacar!"
         
-        total_attack_roll = attack_roll + self.attack_bonus
+        attack_mod = self.get_attack_modifier()
+        total_attack_roll = attack_roll + attack_mod
+        target_ac = target.get_armor_class()
         
         result = f"{self.name} ataca a {target.name} - "
-        result += f"Tirada: {attack_roll} + {self.attack_bonus} = {total_attack_roll} vs CA {target.armor_class}"
+        result += f"Tirada: {attack_roll} + {attack_mod} = {total_attack_roll} vs CA {target_ac}"
         
-        if total_attack_roll >= target.armor_class:
+        if total_attack_roll >= target_ac:
             # Impacto
             # Esto será reemplazado con tiradas de dados reales en el CombatEngine
             damage_roll = 0  # Marcador para la tirada de dados real
-            total_damage = damage_roll + self.damage_bonus
+            damage_mod = self.get_damage_modifier()
+            total_damage = damage_roll + damage_mod
             
-            result += f" - ¡IMPACTO! Daño: {damage_roll} + {self.damage_bonus} = {total_damage}"
+            result += f" - ¡IMPACTO! Daño: {damage_roll} + {damage_mod} = {total_damage}"
             result += "\n" + target.take_damage(total_damage)
         else:
             # Fallo
@@ -49,6 +67,27 @@ class Monster(Entity):
         
         return result
     
+    def get_attack_profile(self):
+        """
+        Describir cómo resuelve CombatEngine.attack un ataque del monstruo.
+        
+        Returns:
+            dict: Bono de ataque, términos de dados de daño (signo, número, caras),
+                  daño fijo en impacto normal y en crítico, y el daño que aplica
+                  attack() antes de la tirada real del motor.
+        """
+        damage_dice = DiceExpr.compile(self.damage_dice)
+        damage_mod = self.get_damage_modifier()
+        
+        return {
+            "attack_bonus": self.get_attack_modifier(),
+            "damage_terms": damage_dice.terms,
+            "hit_damage": damage_dice.modifier + damage_mod,
+            # En crítico el motor suma el bono de daño dos veces en lugar del modificador de los dados
+            "crit_damage": damage_mod * 2,
+            "placeholder_damage": damage_mod
+        }
+    
     def add_spell(self, spell):
         """
         Añadir un hechizo al repertorio del monstruo.
@@ -63,10 +102,11 @@ class Monster(Entity):
         if any(s.name.lower() == spell.name.lower() for s in self.spells):
             return f"{self.name} ya conoce el hechizo {spell.name}."
         
-        self.spells.append(spell)
+        # Lista nueva en lugar de append: las copias de CombatEngine.fork la comparten
+        self.spells = self.spells + [spell]
         return f"{self.name} ha adquirido el hechizo {spell.name}!"
 
-    def cast_spell(self, spell, target=None, spell_level=None):
+    def cast_spell(self, spell, target=None, spell_level=None, rng=None):
         """
         Lanzar un hechizo.
         
@@ -74,11 +114,13 @@ class Monster(Entity):
             spell (Spell): El hechizo a lanzar.
             target (Entity, optional): Objetivo del hechizo si es necesario.
             spell_level (int, optional): Nivel al que lanzar el hechizo (para potenciar).
+            rng (CombatRNG, optional): Generador del combate. Por defecto el módulo random.
             
         Returns:
             str: Resultado del lanzamiento del hechizo.
         """
         import random
+        rng = rng or random
         
         if not self.is_alive:
             return f"{self.name} está derrotado y no puede lanzar hechizos!"
@@ -95,6 +137,8 @@ class Monster(Entity):
             if self.spell_slots.get(cast_level, 0) <= 0:
                 return f"{self.name} no tiene espacios de hechizo de nivel {cast_level} disponibles!"
             self.spell_slots[cast_level] -= 1
+            if self.journal is not None:
+                self.journal.record_item(self.spell_slots, cast_level, self.spell_slots[cast_level] + 1)
         
         # Construir el mensaje de lanzamiento
         result = f"{self.name} lanza {spell.name}"
@@ -105,23 +149,10 @@ class Monster(Entity):
         # Aplicar efectos del hechizo según su tipo
         if spell.healing_dice and target:
             # Escalar curación si se lanza a nivel superior
-            healing_formula = spell.healing_dice
-            if cast_level > spell.level:
-                # Añadir dados adicionales por nivel
-                level_diff = cast_level - spell.level
-                # Extraer el número de dados y tipo
-                dice_parts = spell.healing_dice.split('d')
-                if len(dice_parts) == 2 and dice_parts[0].isdigit():
-                    num_dice = int(dice_parts[0]) + level_diff
-                    dice_type = dice_parts[1]
-                    healing_formula = f"{num_dice}d{dice_type}"
+            healing_formula = spell.scale_dice(spell.healing_dice, cast_level)
             
-            # Calcular curación
-            healing_roll, dice_rolls, mod = Dice.roll(healing_formula)
-            if "modificador" in healing_formula:
-                # Para monstruos, usar un valor fijo basado en el CR
-                modifier = self.challenge_rating // 2
-                healing_roll += modifier
+            # Calcular curación; para monstruos "modificador" es un valor fijo basado en el CR
+            healing_roll, dice_rolls, mod = Dice.roll(healing_formula, {"modificador": self.challenge_rating // 2}, rng)
             
             # Aplicar curación
             heal_message = target.heal(healing_roll)
@@ -129,28 +160,21 @@ class Monster(Entity):
         
         elif spell.damage_dice and target:
             # Escalar daño si se lanza a nivel superior
-            damage_formula = spell.damage_dice
-            if cast_level > spell.level:
-                # Añadir dados adicionales por nivel
-                level_diff = cast_level - spell.level
-                # Extraer el número de dados y tipo
-                dice_parts = spell.damage_dice.split('d')
-                if len(dice_parts) == 2 and dice_parts[0].isdigit():
-                    num_dice = int(dice_parts[0]) + level_diff
-                    dice_type = dice_parts[1]
-                    damage_formula = f"{num_dice}d{dice_type}"
+            damage_formula = spell.scale_dice(spell.damage_dice, cast_level)
             
             # Calcular daño
-            damage_roll, dice_rolls, mod = Dice.roll(damage_formula)
+            damage_roll, dice_rolls, mod = Dice.roll(damage_formula, rng=rng)
             
             # Si requiere tirada de ataque
             if spell.attack_roll:
-                attack_roll = random.randint(1, 20)
-                spell_attack = attack_roll + self.attack_bonus
+                attack_roll = rng.randint(1, 20)
+                attack_mod = self.get_attack_modifier()
+                spell_attack = attack_roll + attack_mod
                 
-                result += f"\nTirada de ataque: {attack_roll} + {self.attack_bonus} = {spell_attack} vs CA {target.armor_class}"
+                target_ac = target.get_armor_class()
+                result += f"\nTirada de ataque: {attack_roll} + {attack_mod} = {spell_attack} vs CA {target_ac}"
                 
-                if spell_attack >= target.armor_class:
+                if spell_attack >= target_ac:
                     result += f"\n¡IMPACTO! Daño: {'+'.join(map(str, dice_rolls))} ({sum(dice_rolls)}) = {damage_roll} de daño {spell.damage_type}"
                     target.take_damage(damage_roll)
                 else:
@@ -162,8 +186,8 @@ class Monster(Entity):
                 result += f"\n{target.name} debe realizar una tirada de salvación de {spell.saving_throw}"
                 
                 # Simular la tirada de salvación (esto sería diferente en un combate real)
-                save_dc = self.spell_dc
-                save_roll = random.randint(1, 20)
+                save_dc = self.get_spell_save_dc()
+                save_roll = rng.randint(1, 20)
                 
                 # Determinar el modificador del objetivo basado en el atributo requerido
                 # (Esto es una simplificación)
@@ -217,9 +241,23 @@ class Monster(Entity):
     
     def add_ability(self, ability):
         """Añadir una habilidad especial al monstruo."""
-        self.abilities.append(ability)
+        self.abilities = self.abilities + [ability]
         return f"{self.name} gana la habilidad {ability['name']}!"
     
+    def clone(self):
+        """Copiar el monstruo para CombatEngine.fork (ver Entity.clone)."""
+        clone = super().clone()
+        clone.attack_bonus = self.attack_bonus
+        clone.damage_dice = self.damage_dice
+        clone.damage_bonus = self.damage_bonus
+        clone.challenge_rating = self.challenge_rating
+        clone.experience_reward = self.experience_reward
+        clone.abilities = self.abilities
+        clone.spells = self.spells
+        clone.spell_slots = dict(self.spell_slots)
+        clone.spell_dc = self.spell_dc
+        return clone
+    
     def to_dict(self):
         """Convertir el monstruo a un diccionario para serialización."""
         data = super().to_dict()
@@ -255,15 +293,17 @@ class Monster(Entity):
         monster.is_alive = data["is_alive"]
         monster.abilities = data.get("abilities", [])
         
-        # Cargar hechizos
+        # Cargar hechizos (compartidos con otras entidades que conocen los mismos)
         from models.spell import Spell
-        monster.spells = [Spell.from_dict(spell_data) for spell_data in data.get("spells", [])]
+        monster.spells = [Spell.shared_from_dict(spell_data) for spell_data in data.get("spells", [])]
         
-        monster.spell_slots = data.get("spell_slots", {})
+        # JSON convierte las claves a texto; los niveles de espacio son enteros
+        monster.spell_slots = {int(level): slots for level, slots in data.get("spell_slots", {}).items()}
         monster.spell_dc = data.get("spell_dc", 10 + monster.challenge_rating // 2)
         
         # Cargar efectos
         from models.effect import Effect
         monster.effects = [Effect.from_dict(effect_data) for effect_data in data.get("effects", [])]
+        monster.refresh_modifiers()
         
         return monster
\ No newline at end of file
@@ -1,7 +1,21 @@
 # models/spell.py
+import marshal
+import weakref
+from core.dice import DiceExpr
+
+# Hechizos cargados con Spell.shared_from_dict: diccionario en marshal -> Spell.
+# Las referencias son débiles, así que un hechizo se libera cuando ya no lo
+# conoce ninguna entidad.
+_shared_spells = weakref.WeakValueDictionary()
+
 class Spell:
     """Clase que representa un hechizo individual en el juego."""
     
+    __slots__ = ("name", "description", "spell_type", "level", "cast_time", "range",
+                 "components", "duration", "attack_roll", "saving_throw",
+                 "saving_throw_attribute", "damage_dice", "damage_type", "healing_dice",
+                 "aoe_type", "aoe_size", "effects", "__weakref__")
+    
     def __init__(self, name, description, spell_type, level, cast_time="1 acción", 
                  range="60 pies", components="V, S", duration="Instantáneo",
                  attack_roll=False, saving_throw=None, saving_throw_attribute=None,
@@ -52,6 +66,23 @@ class Spell:
         level_str = "Truco" if self.level == 0 else f"Nivel {self.level}"
         return f"{self.name} ({level_str}): {self.description[:50]}..."
     
+    def scale_dice(self, dice_formula, cast_level):
+        """
+        Obtener la fórmula de dados al lanzar el hechizo a un nivel superior.
+        
+        Args:
+            dice_formula (str): Fórmula base (damage_dice o healing_dice).
+            cast_level (int): Nivel al que se lanza el hechizo.
+            
+        Returns:
+            str: La fórmula con un dado adicional por cada nivel por encima del base.
+        """
+        if cast_level <= self.level:
+            return dice_formula
+        
+        # Añadir un dado adicional por nivel al primer término de dados
+        return DiceExpr.compile(dice_formula).scaled(cast_level - self.level).notation
+    
     def get_full_description(self):
         """Obtener una descripción completa y formateada del hechizo."""
         level_str = "Truco" if self.level == 0 else f"Nivel {self.level}"
@@ -131,4 +162,31 @@ class Spell:
             aoe_type=data.get("aoe_type"),
             aoe_size=data.get("aoe_size"),
             effects=data.get("effects", [])
-        )
\ No newline at end of file
+        )
+    
+    @classmethod
+    def shared_from_dict(cls, data):
+        """
+        Obtener el hechizo de un diccionario compartiendo la instancia con otras entidades.
+        
+        Los personajes y monstruos de un roster suelen conocer los mismos
+        hechizos; en lugar de una copia por entidad, todos los diccionarios
+        iguales devuelven el mismo objeto. Las entidades nunca modifican sus
+        hechizos (add_spell y remove_spell sustituyen la lista), así que
+        compartirlos es seguro. El libro de hechizos, que sí los edita, usa
+        from_dict.
+        
+        Args:
+            data (dict): Diccionario de to_dict().
+            
+        Returns:
+            Spell: Instancia compartida.
+        """
+        # Formato 2: sin referencias internas, que en el 3 y siguientes dependen
+        # del número de referencias de cada objeto y no solo del contenido
+        key = marshal.dumps(data, 2)
+        spell = _shared_spells.get(key)
+        if spell is None:
+            spell = cls.from_dict(data)
+            _shared_spells[key] = spell
+        return spell
\ No newline at end of file
@@ -1,19 +1,22 @@
 # models/spellbook.py
-import json
 import os
 from models.spell import Spell
+from persistence.json_store import JsonListWriter, load_json
 
 class SpellBook:
     """Clase para gestionar la colección de hechizos disponibles."""
     
-    def __init__(self, spells_file="data/spells.json"):
+    def __init__(self, spells_file="data/spells.json", backend=None):
         """
         Inicializar el libro de hechizos.
         
         Args:
             spells_file (str, optional): Ruta al archivo JSON de hechizos. Por defecto "data/spells.json".
+            backend (SQLiteBackend, optional): Almacenamiento alternativo al archivo JSON.
         """
         self.spells_file = spells_file
+        self.backend = backend
+        self.writer = JsonListWriter(spells_file)
         self.spells = []
         self.load_spells()
         
@@ -25,10 +28,10 @@ class SpellBook:
     def load_spells(self):
         """Cargar hechizos desde el archivo JSON."""
         try:
-            if os.path.exists(self.spells_file):
-                with open(self.spells_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
+            if self.backend is not None:
+                self.spells = [Spell.from_dict(spell_data) for spell_data in self.backend.load_all("spells")]
+            elif os.path.exists(self.spells_file):
+                data = load_json(self.spells_file)
                 self.spells = [Spell.from_dict(spell_data) for spell_data in data]
             else:
                 self.spells = []
@@ -39,12 +42,12 @@ class SpellBook:
     def save_spells(self):
         """Guardar hechizos en el archivo JSON."""
         try:
-            # Asegurar que el directorio exista
-            os.makedirs(os.path.dirname(self.spells_file), exist_ok=True)
-            
             data = [spell.to_dict() for spell in self.spells]
-            with open(self.spells_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            if self.backend is not None:
+                self.backend.replace_all("spells", data)
+                return True
+            
+            self.writer.write(data)
             return True
         except Exception as e:
             print(f"Error al guardar hechizos: {e}")
@@ -65,7 +68,10 @@ class SpellBook:
             return False
         
         self.spells.append(spell)
-        self.save_spells()
+        if self.backend is not None:
+            self.backend.upsert("spells", spell.to_dict())
+        else:
+            self.save_spells()
         return True
     
     def remove_spell(self, spell_name):
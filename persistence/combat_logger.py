@@ -1,31 +1,144 @@
 # persistence/combat_logger.py
+import atexit
 import datetime
 import os
+import queue
+import threading
+import time
+
+# Tamaño de bloque para leer el final del log hacia atrás
+TAIL_BLOCK_SIZE = 8192
+
+# Marcadores de control para el hilo de escritura
+_FLUSH = object()
+_STOP = object()
 
 class CombatLogger:
     """Clase para registrar eventos de combate."""
     
-    def __init__(self, log_file="combat_log.txt"):
+    def __init__(self, log_file="combat_log.txt", buffered=False, batch_size=256,
+                 flush_interval=1.0, max_queue=10000):
+        """
+        Inicializar el registro.
+        
+        Args:
+            log_file (str, optional): Archivo de log. None desactiva el registro.
+            buffered (bool, optional): Escribir en lotes desde un hilo en segundo plano
+                en lugar de abrir el archivo en cada mensaje.
+            batch_size (int, optional): Entradas acumuladas que fuerzan una escritura.
+            flush_interval (float, optional): Segundos máximos que una entrada espera
+                en memoria antes de escribirse.
+            max_queue (int, optional): Tamaño de la cola; si se llena, log() espera
+                al hilo de escritura en lugar de descartar entradas.
+        """
+        # Con log_file=None el registro queda desactivado (simulaciones masivas)
         self.log_file = log_file
+        self.buffered = buffered and log_file is not None
+        self._queue = None
+        self._writer = None
+        if log_file is None:
+            return
         
         # Crear directorio para logs si no existe
         log_dir = os.path.dirname(log_file)
         if log_dir and not os.path.exists(log_dir):
             os.makedirs(log_dir)
+        
+        if self.buffered:
+            self.batch_size = batch_size
+            self.flush_interval = flush_interval
+            self._queue = queue.Queue(maxsize=max_queue)
+            self._writer = threading.Thread(target=self._write_loop, name="CombatLoggerWriter", daemon=True)
+            self._writer.start()
+            # Vaciar la cola al salir del proceso para no perder entradas
+            atexit.register(self.close)
     
     def log(self, message):
         """Registrar un mensaje en el log de combate."""
+        if self.log_file is None:
+            return
+        
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_entry = f"[{timestamp}] {message}\n"
+        self._append(log_entry)
+    
+    def _append(self, entry):
+        """Escribir una línea ya formateada, directamente o a través de la cola."""
+        if self._writer is not None:
+            self._queue.put(entry)
+            return
         
+        self._write_entries([entry])
+    
+    def _write_entries(self, entries):
+        """Añadir entradas al archivo de log con una sola apertura."""
         try:
             with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(log_entry)
+                f.write("".join(entries))
         except Exception as e:
             print(f"Error al escribir en el log: {e}")
     
+    def _write_loop(self):
+        """Hilo de escritura: vacía la cola en lotes por tamaño, por tiempo o a petición."""
+        batch = []
+        taken = 0  # elementos sacados de la cola pendientes de task_done
+        deadline = None
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+                taken += 1
+            except queue.Empty:
+                item = _FLUSH  # La entrada más antigua ya ha esperado flush_interval
+            
+            if item is not _FLUSH and item is not _STOP:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+                if len(batch) < self.batch_size and time.monotonic() < deadline:
+                    continue
+            
+            if batch:
+                self._write_entries(batch)
+                batch = []
+            for _ in range(taken):
+                self._queue.task_done()
+            taken = 0
+            
+            if item is _STOP:
+                return
+    
+    def flush(self):
+        """Esperar a que todas las entradas pendientes estén escritas en el archivo."""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+    
+    def start_encounter(self):
+        """Marcar el inicio de un encuentro (los registros segmentados abren segmento)."""
+        pass
+    
+    def end_encounter(self):
+        """Marcar el final de un encuentro: escribe todo lo pendiente."""
+        self.flush()
+    
+    def close(self):
+        """Escribir lo pendiente y detener el hilo de escritura."""
+        if self._writer is None:
+            return
+        
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self._writer = None
+        atexit.unregister(self.close)
+    
     def clear_log(self):
         """Limpiar el archivo de log."""
+        if self.log_file is None:
+            return
+        
+        self.flush()
         try:
             with open(self.log_file, 'w', encoding='utf-8') as f:
                 f.write("")
@@ -33,15 +146,53 @@ class CombatLogger:
             print(f"Error al limpiar el log: {e}")
     
     def get_last_entries(self, n=10):
-        """Obtener las últimas n entradas del log."""
+        """
+        Obtener las últimas n entradas del log.
+        
+        Lee el archivo hacia atrás por bloques desde el final, así que el coste
+        depende de n y no del tamaño del log.
+        """
         try:
-            if not os.path.exists(self.log_file):
+            if self.log_file is None or n <= 0:
                 return []
             
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            self.flush()
+            if not os.path.exists(self.log_file):
+                return []
             
-            return lines[-n:] if lines else []
+            return _tail_lines(self.log_file, n)
         except Exception as e:
             print(f"Error al leer el log: {e}")
-            return []
\ No newline at end of file
+            return []
+
+
+def _tail_lines(path, n, block_size=TAIL_BLOCK_SIZE):
+    """
+    Devolver las últimas n líneas de un archivo UTF-8, con su salto de línea.
+    
+    Equivale a readlines()[-n:] pero solo lee los bloques finales necesarios.
+    """
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        blocks = []
+        newlines = 0
+        # n + 1 saltos garantizan n líneas completas aunque el archivo acabe en salto
+        while position > 0 and newlines <= n:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+            newlines += block.count(b"\n")
+            blocks.append(block)
+    
+    # Los cortes de bloque pueden partir caracteres UTF-8, por eso se decodifica al final
+    text = b"".join(reversed(blocks)).decode('utf-8', errors='replace').replace("\r\n", "\n")
+    parts = text.split("\n")
+    lines = [line + "\n" for line in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    
+    # Si no se llegó al inicio, la primera línea puede estar incompleta
+    if position > 0:
+        lines = lines[1:]
+    return lines[-n:]
\ No newline at end of file
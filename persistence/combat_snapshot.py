@@ -0,0 +1,85 @@
+# persistence/combat_snapshot.py
+import marshal
+import struct
+import time
+
+# Cabecera: firma, versión del formato y momento del guardado (epoch)
+SNAPSHOT_MAGIC = b"DNDC"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sHd")
+
+def encode_state(state):
+    """
+    Codificar un estado de combate (el diccionario de DataManager) en binario.
+    
+    Los hechizos se guardan una sola vez en una tabla compartida y cada
+    entidad solo lleva sus índices, porque varios lanzadores suelen conocer
+    los mismos. El resto se serializa con marshal, que conserva las claves
+    enteras de spell_slots y es mucho más rápido que json.
+    
+    Args:
+        state (dict): Estado con "characters", "monsters", "initiative_order"...
+    
+    Returns:
+        bytes: Cabecera seguida del estado codificado.
+    """
+    spell_table = []
+    spell_indices = {}
+    
+    def compact(entities):
+        result = []
+        for data in entities:
+            data = dict(data)
+            indices = []
+            for spell in data.get("spells", []):
+                # Formato 2: la clave depende solo del contenido (ver Spell.shared_from_dict)
+                key = marshal.dumps(spell, 2)
+                if key not in spell_indices:
+                    spell_indices[key] = len(spell_table)
+                    spell_table.append(spell)
+                indices.append(spell_indices[key])
+            data["spells"] = indices
+            result.append(data)
+        return result
+    
+    payload = dict(state)
+    payload["characters"] = compact(state["characters"])
+    payload["monsters"] = compact(state["monsters"])
+    payload["spell_table"] = spell_table
+    
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, time.time())
+    return header + marshal.dumps(payload)
+
+def decode_state(data):
+    """
+    Decodificar un estado de combate generado por encode_state.
+    
+    Args:
+        data (bytes): Contenido del snapshot.
+    
+    Returns:
+        dict: Estado con el mismo formato que el JSON de DataManager.
+    
+    Raises:
+        ValueError: Si la firma o la versión no son válidas.
+    """
+    if len(data) < SNAPSHOT_HEADER.size:
+        raise ValueError("snapshot de combate truncado")
+    
+    magic, version, _ = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("el archivo no es un snapshot de combate")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"versión de snapshot no soportada: {version}")
+    
+    state = marshal.loads(data[SNAPSHOT_HEADER.size:])
+    spell_table = state.pop("spell_table")
+    for entity_data in state["characters"] + state["monsters"]:
+        entity_data["spells"] = [spell_table[index] for index in entity_data["spells"]]
+    return state
+
+def read_timestamp(path):
+    """Leer solo el momento del guardado de un snapshot (epoch)."""
+    with open(path, 'rb') as f:
+        _, _, timestamp = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+    return timestamp
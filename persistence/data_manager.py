@@ -5,11 +5,23 @@ import datetime
 # Cambiar importaciones relativas a absolutas
 from models.character import Character
 from models.monster import Monster
+from core.replay import CombatReplay
+from persistence.combat_snapshot import decode_state, encode_state
+from persistence.json_store import JsonListWriter, atomic_write, load_json, load_list_index, read_list_item
+from persistence.sqlite_backend import SQLiteBackend
 
 class DataManager:
     """Clase para manejar la persistencia de datos."""
     
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", backend="json"):
+        """
+        Inicializar el gestor de datos.
+        
+        Args:
+            data_dir (str, optional): Directorio de datos.
+            backend (str | object, optional): "json" (archivos JSON), "sqlite"
+                (data_dir/dnd.sqlite3) o un objeto con la interfaz de SQLiteBackend.
+        """
         self.data_dir = data_dir
         
         # Crear directorio para datos si no existe
@@ -19,14 +31,34 @@ class DataManager:
         # Rutas de archivos
         self.characters_file = os.path.join(data_dir, "characters.json")
         self.monsters_file = os.path.join(data_dir, "monsters.json")
-        self.combat_state_file = os.path.join(data_dir, "combat_state.json")
+        self.spells_file = os.path.join(data_dir, "spells.json")
+        self.combat_state_file = os.path.join(data_dir, "combat_state.bin")
+        self.combat_autosave_file = os.path.join(data_dir, "combat_autosave.bin")
+        # Formato anterior del combate guardado, todavía se puede cargar
+        self.legacy_combat_state_file = os.path.join(data_dir, "combat_state.json")
+        self.combat_replay_file = os.path.join(data_dir, "combat_replay.json")
+        
+        # Escritores con caché de fragmentos: solo se reserializa lo que se guarda
+        self.characters_writer = JsonListWriter(self.characters_file, ("level",))
+        self.monsters_writer = JsonListWriter(self.monsters_file, ("challenge_rating",))
+        
+        # Con backend None se usan los archivos JSON anteriores
+        if backend == "json":
+            self.backend = None
+        elif backend == "sqlite":
+            self.backend = SQLiteBackend(os.path.join(data_dir, "dnd.sqlite3"))
+        else:
+            self.backend = backend
     
     def save_characters(self, characters):
         """Guardar la lista de personajes en un archivo JSON."""
         try:
             data = [char.to_dict() for char in characters]
-            with open(self.characters_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            if self.backend is not None:
+                self.backend.replace_all("characters", data)
+                return True
+            
+            self.characters_writer.write(data)
             return True
         except Exception as e:
             print(f"Error al guardar personajes: {e}")
@@ -35,11 +67,12 @@ class DataManager:
     def load_characters(self):
         """Cargar la lista de personajes desde un archivo JSON."""
         try:
-            if not os.path.exists(self.characters_file):
+            if self.backend is not None:
+                data = self.backend.load_all("characters")
+            elif not os.path.exists(self.characters_file):
                 return []
-            
-            with open(self.characters_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            else:
+                data = load_json(self.characters_file)
             
             return [Character.from_dict(char_data) for char_data in data]
         except Exception as e:
@@ -50,8 +83,11 @@ class DataManager:
         """Guardar la lista de monstruos en un archivo JSON."""
         try:
             data = [monster.to_dict() for monster in monsters]
-            with open(self.monsters_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            if self.backend is not None:
+                self.backend.replace_all("monsters", data)
+                return True
+            
+            self.monsters_writer.write(data)
             return True
         except Exception as e:
             print(f"Error al guardar monstruos: {e}")
@@ -60,19 +96,115 @@ class DataManager:
     def load_monsters(self):
         """Cargar la lista de monstruos desde un archivo JSON."""
         try:
-            if not os.path.exists(self.monsters_file):
+            if self.backend is not None:
+                data = self.backend.load_all("monsters")
+            elif not os.path.exists(self.monsters_file):
                 return []
-            
-            with open(self.monsters_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            else:
+                data = load_json(self.monsters_file)
             
             return [Monster.from_dict(monster_data) for monster_data in data]
         except Exception as e:
             print(f"Error al cargar monstruos: {e}")
             return []
     
-    def save_combat_state(self, combat_engine):
-        """Guardar el estado actual del combate."""
+    def _load_index(self, collection, path, field):
+        """Índice ligero de una colección, del backend o del archivo JSON."""
+        if self.backend is not None:
+            return self.backend.load_index(collection)
+        return load_list_index(path, (field,))
+    
+    def _load_entry(self, collection, path, entry):
+        """Diccionario completo de una entrada del índice."""
+        if self.backend is not None:
+            return self.backend.get_by_id(collection, entry["row_id"])
+        return read_list_item(path, entry)
+    
+    def load_character_index(self):
+        """
+        Obtener la lista de personajes sin construirlos.
+        
+        Returns:
+            list: Entradas con name, level y la posición del personaje en el
+                almacenamiento; se convierten en Character con load_character.
+        """
+        try:
+            return self._load_index("characters", self.characters_file, "level")
+        except Exception as e:
+            print(f"Error al cargar el índice de personajes: {e}")
+            return []
+    
+    def load_character(self, entry):
+        """Construir el personaje de una entrada de load_character_index, o None."""
+        try:
+            data = self._load_entry("characters", self.characters_file, entry)
+            return Character.from_dict(data) if data is not None else None
+        except Exception as e:
+            print(f"Error al cargar personaje: {e}")
+            return None
+    
+    def load_monster_index(self):
+        """
+        Obtener la lista de monstruos sin construirlos.
+        
+        Returns:
+            list: Entradas con name, challenge_rating y la posición del monstruo;
+                se convierten en Monster con load_monster.
+        """
+        try:
+            return self._load_index("monsters", self.monsters_file, "challenge_rating")
+        except Exception as e:
+            print(f"Error al cargar el índice de monstruos: {e}")
+            return []
+    
+    def load_monster(self, entry):
+        """Construir el monstruo de una entrada de load_monster_index, o None."""
+        try:
+            data = self._load_entry("monsters", self.monsters_file, entry)
+            return Monster.from_dict(data) if data is not None else None
+        except Exception as e:
+            print(f"Error al cargar monstruo: {e}")
+            return None
+    
+    def delete_character(self, entry):
+        """Eliminar el personaje de una entrada de load_character_index."""
+        try:
+            if self.backend is not None:
+                return self.backend.delete("characters", entry["name"])
+            
+            # Solo se quita su fragmento; el resto de personajes no se reconstruye
+            if not self.characters_writer.remove(entry["name"]):
+                return False
+            self.characters_writer.flush()
+            return True
+        except Exception as e:
+            print(f"Error al eliminar personaje: {e}")
+            return False
+    
+    def delete_monster(self, entry):
+        """Eliminar el monstruo de una entrada de load_monster_index."""
+        try:
+            if self.backend is not None:
+                return self.backend.delete("monsters", entry["name"])
+            
+            # Solo se quita su fragmento; el resto de monstruos no se reconstruye
+            if not self.monsters_writer.remove(entry["name"]):
+                return False
+            self.monsters_writer.flush()
+            return True
+        except Exception as e:
+            print(f"Error al eliminar monstruo: {e}")
+            return False
+    
+    def save_combat_state(self, combat_engine, filename=None):
+        """
+        Guardar el estado actual del combate.
+        
+        Args:
+            combat_engine (CombatEngine): Motor con el combate en curso.
+            filename (str, optional): Snapshot binario de destino. Por defecto
+                combat_state.bin (o el backend, si hay uno).
+        """
         try:
             # Crear un diccionario con el estado del combate
             state = {
@@ -95,26 +227,43 @@ class DataManager:
                 elif id(entity) in monster_indices:
                     state["initiative_order"].append({"type": "monster", "index": monster_indices[id(entity)]})
             
-            with open(self.combat_state_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f, indent=2)
+            if self.backend is not None and filename is None:
+                self.backend.save_state("combat", state)
+                return True
             
+            atomic_write(filename or self.combat_state_file, encode_state(state))
             return True
         except Exception as e:
             print(f"Error al guardar estado del combate: {e}")
             return False
     
-    def load_combat_state(self, combat_engine):
-        """Cargar un estado de combate guardado."""
+    def load_combat_state(self, combat_engine, filename=None):
+        """
+        Cargar un estado de combate guardado.
+        
+        Args:
+            combat_engine (CombatEngine): Motor donde restaurar el combate.
+            filename (str, optional): Snapshot binario de origen, p. ej.
+                combat_autosave_file. Por defecto el combate guardado.
+        """
         try:
-            if not os.path.exists(self.combat_state_file):
+            path = filename or self.combat_state_file
+            if self.backend is not None and filename is None:
+                state = self.backend.load_state("combat")
+                if state is None:
+                    return False
+            elif os.path.exists(path):
+                with open(path, 'rb') as f:
+                    state = decode_state(f.read())
+            elif filename is None and os.path.exists(self.legacy_combat_state_file):
+                state = load_json(self.legacy_combat_state_file)
+            else:
                 return False
             
-            with open(self.combat_state_file, 'r', encoding='utf-8') as f:
-                state = json.load(f)
-            
             # Cargar personajes y monstruos
             combat_engine.characters = [Character.from_dict(char_data) for char_data in state["characters"]]
             combat_engine.monsters = [Monster.from_dict(monster_data) for monster_data in state["monsters"]]
+            combat_engine.attach_history()
             
             # Establecer estado del combate
             combat_engine.combat_active = state["combat_active"]
@@ -129,29 +278,82 @@ class DataManager:
                 elif entity_ref["type"] == "monster":
                     combat_engine.initiative_order.append(combat_engine.monsters[entity_ref["index"]])
             
+            # Los vencimientos de efectos se guardan en cada efecto (expires_at)
+            combat_engine.rebuild_effect_schedule()
             return True
         except Exception as e:
             print(f"Error al cargar estado del combate: {e}")
             return False
     
-    def save_character(self, character):
-        """Guardar un personaje individual."""
+    def has_combat_state(self):
+        """Indica si hay un combate guardado."""
+        if self.backend is not None:
+            return self.backend.has_state("combat")
+        return os.path.exists(self.combat_state_file) or os.path.exists(self.legacy_combat_state_file)
+    
+    def autosave_combat(self, combat_engine):
+        """Guardar el combate en el snapshot de autoguardado (tras cada turno)."""
+        return self.save_combat_state(combat_engine, self.combat_autosave_file)
+    
+    def has_combat_autosave(self):
+        """Indica si hay un autoguardado del combate."""
+        return os.path.exists(self.combat_autosave_file)
+    
+    def save_combat_replay(self, combat_engine, filename=None):
+        """
+        Guardar la semilla y las acciones del combate para poder repetirlo.
+        
+        Args:
+            combat_engine (CombatEngine): Motor con un combate iniciado con start_combat.
+            filename (str, optional): Ruta del archivo. Por defecto combat_replay.json.
+        """
         try:
-            # Cargar personajes existentes
-            characters = self.load_characters()
+            replay = CombatReplay.from_engine(combat_engine)
+            if self.backend is not None and filename is None:
+                self.backend.save_state("replay", replay.to_dict())
+                return True
             
-            # Buscar si el personaje ya existe
-            existing_index = next((i for i, c in enumerate(characters) if c.name == character.name), -1)
+            atomic_write(filename or self.combat_replay_file, json.dumps(replay.to_dict()))
+            return True
+        except Exception as e:
+            print(f"Error al guardar la repetición del combate: {e}")
+            return False
+    
+    def load_combat_replay(self, filename=None):
+        """
+        Cargar una repetición de combate guardada.
+        
+        Returns:
+            CombatReplay: La repetición, o None si no existe o no se pudo cargar.
+        """
+        try:
+            if self.backend is not None and filename is None:
+                data = self.backend.load_state("replay")
+                return CombatReplay.from_dict(data) if data is not None else None
             
-            if existing_index >= 0:
-                # Reemplazar personaje existente
-                characters[existing_index] = character
-            else:
-                # Añadir nuevo personaje
-                characters.append(character)
+            path = filename or self.combat_replay_file
+            if not os.path.exists(path):
+                return None
             
-            # Guardar todos los personajes
-            return self.save_characters(characters)
+            with open(path, 'r', encoding='utf-8') as f:
+                return CombatReplay.from_dict(json.load(f))
+        except Exception as e:
+            print(f"Error al cargar la repetición del combate: {e}")
+            return None
+    
+    def save_character(self, character):
+        """Guardar un personaje individual."""
+        try:
+            # Con backend basta un upsert por nombre
+            if self.backend is not None:
+                self.backend.upsert("characters", character.to_dict())
+                return True
+            
+            # Solo se serializa este personaje (reemplaza al del mismo nombre o se
+            # añade al final); los demás reutilizan su fragmento JSON
+            self.characters_writer.update(character.to_dict())
+            self.characters_writer.flush()
+            return True
         except Exception as e:
             print(f"Error al guardar personaje: {e}")
             return False
@@ -159,21 +361,38 @@ class DataManager:
     def save_monster(self, monster):
         """Guardar un monstruo individual."""
         try:
-            # Cargar monstruos existentes
-            monsters = self.load_monsters()
-            
-            # Buscar si el monstruo ya existe
-            existing_index = next((i for i, m in enumerate(monsters) if m.name == monster.name), -1)
-            
-            if existing_index >= 0:
-                # Reemplazar monstruo existente
-                monsters[existing_index] = monster
-            else:
-                # Añadir nuevo monstruo
-                monsters.append(monster)
+            # Con backend basta un upsert por nombre
+            if self.backend is not None:
+                self.backend.upsert("monsters", monster.to_dict())
+                return True
             
-            # Guardar todos los monstruos
-            return self.save_monsters(monsters)
+            # Solo se serializa este monstruo (reemplaza al del mismo nombre o se
+            # añade al final); los demás reutilizan su fragmento JSON
+            self.monsters_writer.update(monster.to_dict())
+            self.monsters_writer.flush()
+            return True
         except Exception as e:
             print(f"Error al guardar monstruo: {e}")
+            return False
+    
+    def import_json_files(self):
+        """
+        Copiar al backend los personajes, monstruos y hechizos de los archivos JSON.
+        
+        Returns:
+            bool: True si la importación terminó sin errores.
+        """
+        if self.backend is None:
+            return False
+        
+        try:
+            for collection, path in (("characters", self.characters_file),
+                                     ("monsters", self.monsters_file),
+                                     ("spells", self.spells_file)):
+                if os.path.exists(path):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        self.backend.replace_all(collection, json.load(f))
+            return True
+        except Exception as e:
+            print(f"Error al importar los archivos JSON: {e}")
             return False
\ No newline at end of file
@@ -0,0 +1,154 @@
+# persistence/event_log.py
+import json
+import os
+import time
+from persistence.combat_logger import CombatLogger
+
+# Tipos de evento que emite CombatEngine
+EVENT_TYPES = (
+    "initiative",
+    "turn_start",
+    "attack",
+    "damage",
+    "heal",
+    "spell_cast",
+    "effect_applied",
+    "effect_expired",
+    "combat_end"
+)
+
+class EventLog(CombatLogger):
+    """
+    Registro estructurado de eventos de combate, un objeto JSON por línea.
+    
+    Comparte con CombatLogger el modo con búfer y la gestión del archivo; en lugar
+    de texto ya formateado guarda campos tipados que se convierten en texto solo
+    cuando alguien lo pide (ver render_event).
+    """
+    
+    def __init__(self, log_file="combat_events.jsonl", **kwargs):
+        """
+        Inicializar el registro de eventos.
+        
+        Args:
+            log_file (str, optional): Archivo JSONL. None desactiva el registro.
+            **kwargs: Opciones de búfer de CombatLogger (buffered, batch_size...).
+        """
+        super().__init__(log_file, **kwargs)
+    
+    @property
+    def enabled(self):
+        """Indica si los eventos se están guardando."""
+        return self.log_file is not None
+    
+    def emit(self, event_type, **fields):
+        """
+        Registrar un evento.
+        
+        Args:
+            event_type (str): Uno de EVENT_TYPES.
+            **fields: Campos del evento (valores serializables en JSON).
+        """
+        if self.log_file is None:
+            return
+        
+        event = {"ts": round(time.time(), 3), "type": event_type}
+        event.update(fields)
+        self._append(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+    
+    def log(self, message):
+        """Registrar un mensaje libre como evento de tipo "message"."""
+        self.emit("message", text=message)
+    
+    def get_last_events(self, n=10):
+        """Obtener los últimos n eventos ya decodificados."""
+        return [json.loads(line) for line in self.get_last_entries(n) if line.strip()]
+
+
+def read_events(log_file="combat_events.jsonl", event_types=None):
+    """
+    Leer los eventos de un archivo JSONL de forma perezosa.
+    
+    Args:
+        log_file (str, optional): Archivo de eventos.
+        event_types (iterable, optional): Si se indica, solo se devuelven esos tipos.
+    
+    Yields:
+        dict: Cada evento en el orden en que se escribió.
+    """
+    if not os.path.exists(log_file):
+        return
+    
+    wanted = set(event_types) if event_types is not None else None
+    with open(log_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if wanted is None or event["type"] in wanted:
+                yield event
+
+
+def render_event(event):
+    """
+    Convertir un evento en el texto que se mostraría en el log de combate.
+    
+    Args:
+        event (dict): Evento emitido por CombatEngine.
+    
+    Returns:
+        str: Descripción legible del evento.
+    """
+    event_type = event["type"]
+    
+    if event_type == "initiative":
+        return f"{event['entity']} tira iniciativa: {event['roll']} + {event['modifier']} = {event['total']}"
+    
+    if event_type == "turn_start":
+        return f"Ronda {event['round']}, turno de {event['entity']}"
+    
+    if event_type == "attack":
+        total = event["roll"] + event["bonus"]
+        result = f"{event['attacker']} ataca a {event['target']} - "
+        result += f"Tirada: {event['roll']} + {event['bonus']} = {total} vs CA {event['armor_class']}"
+        if event["critical"]:
+            return result + " - ¡CRÍTICO!"
+        return result + (" - ¡IMPACTO!" if event["hit"] else " - ¡FALLO!")
+    
+    if event_type == "damage":
+        return f"{event['target']} recibe {event['amount']} de daño! HP: {event['hp']}/{event['max_hp']}"
+    
+    if event_type == "heal":
+        return f"{event['target']} se cura {event['amount']} HP! HP: {event['hp']}/{event['max_hp']}"
+    
+    if event_type == "spell_cast":
+        result = f"{event['caster']} lanza {event['spell']}"
+        if event.get("level", 0) > event.get("base_level", event.get("level", 0)):
+            result += f" a nivel {event['level']}"
+        if event.get("target"):
+            result += f" sobre {event['target']}"
+        return result + "!"
+    
+    if event_type == "effect_applied":
+        return f"{event['target']} está afectado por {event['effect']} ({event['duration']} turnos)"
+    
+    if event_type == "effect_expired":
+        return f"El efecto {event['effect']} ha terminado para {event['target']}"
+    
+    if event_type == "combat_end":
+        if event["winner"] == "monsters":
+            return "Combate terminado - Todos los personajes han sido derrotados"
+        if event["winner"] == "characters":
+            return "Combate terminado - Todos los monstruos han sido derrotados"
+        return "Combate terminado manualmente"
+    
+    if event_type == "message":
+        return event["text"]
+    
+    return json.dumps(event, ensure_ascii=False)
+
+
+def render_events(log_file="combat_events.jsonl"):
+    """Generar el texto de todos los eventos de un archivo, línea a línea."""
+    for event in read_events(log_file):
+        yield render_event(event)
\ No newline at end of file
@@ -0,0 +1,321 @@
+# persistence/json_store.py
+import gc
+import json
+import marshal
+import os
+import tempfile
+
+# Archivos JSON ya decodificados, compartidos por todo el proceso:
+# ruta absoluta -> ((mtime_ns, tamaño, inodo), datos en marshal)
+_parse_cache = {}
+
+def atomic_write(path, content):
+    """
+    Escribir un archivo de forma segura ante cortes.
+    
+    El contenido se escribe en un temporal del mismo directorio y se sustituye
+    con os.replace, así que el archivo queda con la versión anterior o con la
+    nueva, nunca a medias.
+    
+    Args:
+        path (str): Ruta del archivo destino.
+        content (str | bytes): Contenido completo; con bytes se escribe en binario.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp_", dir=directory)
+    try:
+        if isinstance(content, bytes):
+            f = os.fdopen(fd, 'wb')
+        else:
+            f = os.fdopen(fd, 'w', encoding='utf-8')
+        with f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def _without_gc(function, *args):
+    """
+    Ejecutar function con el recolector cíclico en pausa.
+    
+    Decodificar un catálogo grande crea cientos de miles de listas y
+    diccionarios, y cada umbral alcanzado dispara una recolección que no
+    puede liberar nada: pausarla reduce el tiempo de decodificación a menos
+    de la mitad.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return function(*args)
+    finally:
+        if enabled:
+            gc.enable()
+
+def _parse_file(path):
+    """Decodificar un archivo JSON."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_json(path):
+    """
+    Leer un archivo JSON a través del caché de proceso.
+    
+    La entrada se identifica por ruta, fecha de modificación, tamaño e inodo,
+    así que cualquier escritura (también de otro proceso, o un os.replace)
+    obliga a volver a decodificar. Cada llamada devuelve una copia
+    independiente que el llamador puede modificar.
+    
+    Args:
+        path (str): Archivo JSON.
+    
+    Returns:
+        object: Datos decodificados.
+    """
+    path = os.path.abspath(path)
+    # stat antes de leer: si el archivo cambia entre medias, la clave queda
+    # antigua y la siguiente llamada vuelve a leerlo
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    cached = _parse_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return _without_gc(marshal.loads, cached[1])
+    
+    data = _without_gc(_parse_file, path)
+    _parse_cache[path] = (key, marshal.dumps(data))
+    return data
+
+def clear_parse_cache():
+    """Vaciar el caché de archivos JSON decodificados."""
+    _parse_cache.clear()
+
+class JsonListWriter:
+    """
+    Guarda una lista de entidades como JSON con indent=2 reutilizando fragmentos.
+    
+    Mantiene en memoria, en el orden del archivo, el texto JSON ya sangrado de
+    cada elemento (en bytes ASCII, listo para escribir). update() y remove()
+    marcan como modificada solo la entidad que se guarda o se borra, y solo
+    esa se serializa; flush() escribe el archivo copiando el resto de
+    fragmentos tal cual, sin reconstruir ni comparar entidades. El archivo
+    resultante es idéntico al de json.dump(data, f, indent=2).
+    
+    Si el archivo cambia por fuera (otro proceso, edición a mano), la
+    siguiente operación vuelve a leerlo antes de aplicar los cambios.
+    """
+    
+    def __init__(self, path, index_fields=None):
+        """
+        Inicializar el escritor.
+        
+        Args:
+            path (str): Archivo JSON de la lista.
+            index_fields (tuple, optional): Campos que se copian al índice de la
+                lista (ver load_list_index). Sin ellos no se escribe índice.
+        """
+        self.path = path
+        self.index_fields = index_fields
+        # [nombre, fragmento, campos del índice] en el orden del archivo
+        self._items = []
+        # Nombres guardados o borrados desde el último flush
+        self._dirty = set()
+        # (mtime_ns, tamaño, inodo) del archivo que reflejan los fragmentos
+        self._file_key = None
+        # Elementos serializados para el último guardado
+        self.last_serialized = 0
+    
+    def _stat_key(self):
+        """Identidad del archivo en disco, o None si no existe."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    
+    def _item(self, data):
+        """Serializar un elemento: [nombre, fragmento, campos del índice]."""
+        # Sangría extra de 2 espacios: el elemento va dentro de la lista.
+        # json.dumps escapa todo lo que no es ASCII (ensure_ascii)
+        fragment = ("  " + json.dumps(data, indent=2).replace("\n", "\n  ")).encode("ascii")
+        index_data = {"name": data.get("name")}
+        for field in self.index_fields or ():
+            index_data[field] = data.get(field)
+        self.last_serialized += 1
+        return [data.get("name"), fragment, index_data]
+    
+    def _sync(self):
+        """Volver a leer el archivo si no es el que se escribió la última vez."""
+        key = self._stat_key()
+        if key != self._file_key:
+            records = load_json(self.path) if key is not None else []
+            self._items = [self._item(data) for data in records]
+            self._file_key = key
+    
+    def _begin(self):
+        """Preparar un cambio: empezar la cuenta del guardado y leer el archivo si cambió."""
+        if not self._dirty:
+            self.last_serialized = 0
+        self._sync()
+    
+    def update(self, data):
+        """
+        Guardar o sustituir un elemento (por nombre) hasta el siguiente flush.
+        
+        Args:
+            data (dict): Diccionario de to_dict() de la entidad.
+        """
+        self._begin()
+        item = self._item(data)
+        name = item[0]
+        for position, current in enumerate(self._items):
+            if current[0] == name:
+                self._items[position] = item
+                break
+        else:
+            self._items.append(item)
+        self._dirty.add(name)
+    
+    def remove(self, name):
+        """
+        Quitar el primer elemento con ese nombre hasta el siguiente flush.
+        
+        Returns:
+            bool: True si había un elemento con ese nombre.
+        """
+        self._begin()
+        for position, current in enumerate(self._items):
+            if current[0] == name:
+                del self._items[position]
+                self._dirty.add(name)
+                return True
+        return False
+    
+    def flush(self):
+        """Escribir el archivo si hay elementos modificados desde el último flush."""
+        if self._dirty:
+            self._write()
+    
+    def write(self, records):
+        """
+        Sustituir la lista completa y guardarla de forma atómica.
+        
+        No se sabe qué elementos cambiaron, así que se serializan todos; para
+        guardar una sola entidad están update() y flush().
+        
+        Args:
+            records (list): Diccionarios de to_dict() de cada entidad.
+        """
+        self.last_serialized = 0
+        self._items = [self._item(data) for data in records]
+        self._write()
+    
+    def _write(self):
+        """Escribir los fragmentos en memoria y su índice."""
+        fragments = [item[1] for item in self._items]
+        content = b"[\n" + b",\n".join(fragments) + b"\n]" if fragments else b"[]"
+        atomic_write(self.path, content)
+        self._file_key = self._stat_key()
+        self._dirty = set()
+        
+        if self.index_fields is not None:
+            entries = []
+            offset = 2
+            for position, (_, fragment, index_data) in enumerate(self._items):
+                length = len(fragment)
+                entries.append(dict(index_data, position=position, offset=offset, length=length))
+                offset += length + 2
+            _write_index(self.path, entries, self.index_fields)
+    
+    def invalidate(self):
+        """Olvidar los fragmentos (p. ej. si el archivo se modificó fuera)."""
+        self._items = []
+        self._dirty = set()
+        self._file_key = None
+
+def index_path(path):
+    """Ruta del índice que acompaña a un archivo de lista JSON."""
+    root, _ = os.path.splitext(path)
+    return root + ".idx.json"
+
+def _index_entry(data, index_fields, position, offset, length):
+    """Entrada del índice: campos ligeros más la posición del elemento en el archivo."""
+    entry = {"name": data.get("name")}
+    for field in index_fields:
+        entry[field] = data.get(field)
+    entry.update({"position": position, "offset": offset, "length": length})
+    return entry
+
+def _write_index(path, entries, index_fields):
+    """Guardar el índice junto con la identidad del archivo que describe y sus campos."""
+    stat = os.stat(path)
+    index = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "inode": stat.st_ino,
+             "fields": list(index_fields), "entries": entries}
+    atomic_write(index_path(path), json.dumps(index, separators=(",", ":")))
+
+def _scan_list(path, index_fields):
+    """Recorrer un archivo de lista JSON y calcular el offset en bytes de cada elemento."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    text = raw.decode('utf-8')
+    decoder = json.JSONDecoder()
+    entries = []
+    
+    position = text.index("[") + 1
+    byte_position = len(text[:position].encode('utf-8'))
+    while True:
+        # Saltar espacios y comas hasta el siguiente elemento
+        start = position
+        while position < len(text) and text[position] in " \t\r\n,":
+            position += 1
+        if position >= len(text) or text[position] == "]":
+            break
+        byte_position += len(text[start:position].encode('utf-8'))
+        
+        data, end = decoder.raw_decode(text, position)
+        length = len(text[position:end].encode('utf-8'))
+        entries.append(_index_entry(data, index_fields, len(entries), byte_position, length))
+        byte_position += length
+        position = end
+    return entries
+
+def load_list_index(path, index_fields):
+    """
+    Obtener el índice ligero de un archivo de lista JSON sin crear las entidades.
+    
+    Usa el índice guardado por JsonListWriter si sigue correspondiendo al
+    archivo (mismo tamaño, fecha e inodo) y tiene los mismos campos; si no,
+    recorre el archivo una vez y lo vuelve a guardar.
+    
+    Args:
+        path (str): Archivo JSON con una lista de diccionarios.
+        index_fields (tuple): Campos a incluir en cada entrada además del nombre.
+    
+    Returns:
+        list: Diccionarios con name, los index_fields, position, offset y length.
+    """
+    if not os.path.exists(path):
+        return []
+    
+    stat = os.stat(path)
+    try:
+        index = load_json(index_path(path))
+        # Un reemplazo atómico cambia el inodo aunque coincidan tamaño y fecha
+        if (index["size"] == stat.st_size and index["mtime_ns"] == stat.st_mtime_ns
+                and index["inode"] == stat.st_ino and index["fields"] == list(index_fields)):
+            return index["entries"]
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    entries = _scan_list(path, index_fields)
+    _write_index(path, entries, index_fields)
+    return entries
+
+def read_list_item(path, entry):
+    """Leer un solo elemento de un archivo de lista JSON a partir de su entrada de índice."""
+    with open(path, 'rb') as f:
+        f.seek(entry["offset"])
+        return json.loads(f.read(entry["length"]).decode('utf-8'))
@@ -0,0 +1,238 @@
+# persistence/log_analytics.py
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+
+# Formatos de línea que escriben CombatEngine.attack, roll_initiative, next_turn y check_combat_status
+# Cada entrada empieza con "[AAAA-MM-DD HH:MM:SS] " (22 caracteres)
+_TIMESTAMP_END = 20
+_MESSAGE_START = 22
+_ATTACK_PATTERN = re.compile(
+    r"^(?P<attacker>.+?) ataca a (?P<target>.+?)(?: con (?P<weapon>.+?))? - "
+    r"Tirada: (?P<roll>\d+) \+ (?P<bonus>-?\d+) = (?P<total>-?\d+) vs CA (?P<armor_class>-?\d+) - "
+    r"¡(?P<result>IMPACTO|CRÍTICO|FALLO)!(?: Daño: .* = (?P<damage>-?\d+))?$"
+)
+_INITIATIVE_PATTERN = re.compile(r"^(?P<entity>.+) tira iniciativa: (?P<roll>\d+) \+ (?P<modifier>-?\d+) = (?P<total>-?\d+)$")
+_ROUND_PATTERN = re.compile(r"^Ronda (?P<round>\d+) iniciada")
+_END_MESSAGES = {
+    "Combate terminado - Todos los personajes han sido derrotados": "monsters",
+    "Combate terminado - Todos los monstruos han sido derrotados": "characters",
+    "Combate terminado manualmente": None
+}
+
+# Cada cuántas líneas se informa del progreso
+PROGRESS_EVERY = 10000
+
+
+def read_lines(paths, progress=None):
+    """
+    Leer las líneas de uno o varios logs (texto o .gz) de forma perezosa.
+    
+    Args:
+        paths (list): Rutas de los archivos de log.
+        progress (callable, optional): Se llama como progress(bytes_leídos, bytes_totales)
+            cada PROGRESS_EVERY líneas y al terminar. En los .gz cuenta bytes comprimidos.
+    
+    Yields:
+        str: Cada línea sin el salto de línea final.
+    """
+    total = sum(os.path.getsize(path) for path in paths)
+    done = 0
+    for path in paths:
+        with open(path, 'rb') as raw:
+            stream = gzip.GzipFile(fileobj=raw) if path.endswith(".gz") else raw
+            for count, line in enumerate(stream, 1):
+                yield line.decode('utf-8', errors='replace').rstrip("\r\n")
+                if progress and count % PROGRESS_EVERY == 0:
+                    progress(done + raw.tell(), total)
+        done += os.path.getsize(path)
+    if progress:
+        progress(done, total)
+
+
+def parse_events(lines):
+    """
+    Convertir las líneas del log de texto en eventos tipados.
+    
+    Las líneas de continuación (sin marca de tiempo, p. ej. "X recibe N de daño!")
+    repiten el daño provisional de Entity.attack y se ignoran: el daño real está
+    en la línea del ataque.
+    
+    Yields:
+        dict: Eventos "combat_start", "initiative", "round", "attack" y "combat_end".
+    """
+    for line in lines:
+        # Comprobaciones de texto baratas antes de cualquier expresión regular
+        if not line.startswith("[") or line[_TIMESTAMP_END:_MESSAGE_START] != "] ":
+            continue
+        timestamp, message = line[1:_TIMESTAMP_END], line[_MESSAGE_START:]
+        
+        if message.startswith("Turno de "):
+            continue
+        
+        if message == "Combate iniciado":
+            yield {"type": "combat_start", "timestamp": timestamp}
+            continue
+        
+        if message in _END_MESSAGES:
+            yield {"type": "combat_end", "timestamp": timestamp, "winner": _END_MESSAGES[message]}
+            continue
+        
+        match = _ROUND_PATTERN.match(message) if message.startswith("Ronda ") else None
+        if match:
+            yield {"type": "round", "timestamp": timestamp, "round": int(match["round"])}
+            continue
+        
+        match = _ATTACK_PATTERN.match(message) if " ataca a " in message else None
+        if match:
+            yield {
+                "type": "attack",
+                "timestamp": timestamp,
+                "attacker": match["attacker"],
+                "target": match["target"],
+                "weapon": match["weapon"],
+                "roll": int(match["roll"]),
+                "bonus": int(match["bonus"]),
+                "armor_class": int(match["armor_class"]),
+                "hit": match["result"] != "FALLO",
+                "critical": match["result"] == "CRÍTICO",
+                "damage": int(match["damage"]) if match["damage"] else 0
+            }
+            continue
+        
+        match = _INITIATIVE_PATTERN.match(message) if " tira iniciativa: " in message else None
+        if match:
+            yield {
+                "type": "initiative",
+                "timestamp": timestamp,
+                "entity": match["entity"],
+                "roll": int(match["roll"]),
+                "modifier": int(match["modifier"]),
+                "total": int(match["total"])
+            }
+
+
+class LogStats:
+    """Agregados de un log en memoria constante (solo contadores por entidad)."""
+    
+    def __init__(self):
+        self.entities = {}
+        self.encounters = 0
+        self.finished = 0
+        self.outcomes = {"characters": 0, "monsters": 0, "manual": 0}
+        self.rounds_total = 0
+        self.rounds_histogram = {}
+        self._current_round = None
+    
+    def add(self, event):
+        """Incorporar un evento de parse_events."""
+        event_type = event["type"]
+        
+        if event_type == "combat_start":
+            self.encounters += 1
+            self._current_round = 0
+        elif event_type == "round" and self._current_round is not None:
+            self._current_round = max(self._current_round, event["round"])
+        elif event_type == "combat_end" and self._current_round is not None:
+            self.finished += 1
+            self.outcomes[event["winner"] or "manual"] += 1
+            self.rounds_total += self._current_round
+            self.rounds_histogram[self._current_round] = self.rounds_histogram.get(self._current_round, 0) + 1
+            self._current_round = None
+        elif event_type == "attack":
+            stats = self.entities.setdefault(event["attacker"], {"attacks": 0, "hits": 0, "crits": 0, "damage": 0})
+            stats["attacks"] += 1
+            if event["hit"]:
+                stats["hits"] += 1
+                stats["damage"] += event["damage"]
+            if event["critical"]:
+                stats["crits"] += 1
+    
+    def to_dict(self):
+        """Resumen con tasas de impacto y crítico, daño medio y rondas por encuentro."""
+        entities = {}
+        for name, stats in sorted(self.entities.items()):
+            entities[name] = dict(stats)
+            entities[name].update({
+                "hit_rate": stats["hits"] / stats["attacks"] if stats["attacks"] else 0.0,
+                "crit_rate": stats["crits"] / stats["attacks"] if stats["attacks"] else 0.0,
+                "average_damage": stats["damage"] / stats["hits"] if stats["hits"] else 0.0
+            })
+        
+        return {
+            "encounters": self.encounters,
+            "finished_encounters": self.finished,
+            "outcomes": dict(self.outcomes),
+            "average_rounds": self.rounds_total / self.finished if self.finished else 0.0,
+            "rounds_histogram": dict(sorted(self.rounds_histogram.items())),
+            "entities": entities
+        }
+
+
+def analyze(paths, progress=None):
+    """
+    Analizar uno o varios logs de combate en streaming.
+    
+    Args:
+        paths (list): Rutas de combat_log.txt (o copias .gz).
+        progress (callable, optional): Ver read_lines.
+    
+    Returns:
+        dict: Resumen de LogStats.to_dict().
+    """
+    stats = LogStats()
+    for event in parse_events(read_lines(paths, progress)):
+        stats.add(event)
+    return stats.to_dict()
+
+
+def print_progress(done, total):
+    """Mostrar el progreso en stderr sin ensuciar la salida del informe."""
+    percent = done / total * 100 if total else 100.0
+    print(f"\rProcesado: {percent:5.1f}% ({done / 2 ** 20:.1f} de {total / 2 ** 20:.1f} MB)",
+          end="" if done < total else "\n", file=sys.stderr, flush=True)
+
+
+def format_report(summary):
+    """Convertir el resumen en una tabla de texto."""
+    lines = [
+        f"Encuentros: {summary['encounters']} ({summary['finished_encounters']} terminados)",
+        f"Victorias del grupo: {summary['outcomes']['characters']}, "
+        f"derrotas: {summary['outcomes']['monsters']}, "
+        f"terminados a mano: {summary['outcomes']['manual']}",
+        f"Rondas medias por encuentro: {summary['average_rounds']:.2f}",
+        "",
+        f"{'Entidad':<24}{'Ataques':>8}{'Impacto':>9}{'Crítico':>9}{'Daño medio':>12}"
+    ]
+    for name, stats in summary["entities"].items():
+        lines.append(f"{name[:23]:<24}{stats['attacks']:>8}{stats['hit_rate']:>9.1%}"
+                     f"{stats['crit_rate']:>9.1%}{stats['average_damage']:>12.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Punto de entrada: python -m persistence.log_analytics combat_log.txt [...]"""
+    parser = argparse.ArgumentParser(description="Estadísticas de los logs de combate en texto.")
+    parser.add_argument("paths", nargs="*", default=["combat_log.txt"], help="Archivos de log (.txt o .gz)")
+    parser.add_argument("--json", action="store_true", help="Mostrar el resumen en JSON")
+    parser.add_argument("--quiet", action="store_true", help="No mostrar el progreso")
+    args = parser.parse_args(argv)
+    
+    try:
+        summary = analyze(args.paths, None if args.quiet else print_progress)
+    except Exception as e:
+        print(f"Error al analizar el log: {e}")
+        return 1
+    
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,178 @@
+# persistence/log_segments.py
+import gzip
+import os
+import struct
+import time
+from persistence.combat_logger import CombatLogger
+
+# Registro del índice: id del encuentro, inicio (epoch), segmento, offset y longitud
+INDEX_RECORD = struct.Struct("<QdIQQ")
+
+# Tamaño máximo de un segmento comprimido antes de empezar otro
+DEFAULT_MAX_SEGMENT_BYTES = 64 * 1024 * 1024
+
+class SegmentedCombatLogger(CombatLogger):
+    """
+    Registro de combate dividido por encuentros.
+    
+    Mientras dura un encuentro las entradas se escriben en texto plano en
+    current.log. Al terminar, ese texto se comprime como un miembro gzip
+    independiente y se añade al segmento actual (segment_0001.log.gz...), que
+    sigue siendo un gzip válido. El índice index.bin tiene un registro de
+    tamaño fijo por encuentro, así que localizar el encuentro N es un seek.
+    """
+    
+    def __init__(self, log_dir="combat_logs", max_segment_bytes=DEFAULT_MAX_SEGMENT_BYTES,
+                 compresslevel=6, **kwargs):
+        """
+        Inicializar el registro segmentado.
+        
+        Args:
+            log_dir (str, optional): Directorio de segmentos e índice.
+            max_segment_bytes (int, optional): Tamaño a partir del cual se abre un
+                segmento nuevo.
+            compresslevel (int, optional): Nivel de compresión gzip (1-9).
+            **kwargs: Opciones de búfer de CombatLogger (buffered, batch_size...).
+        """
+        super().__init__(os.path.join(log_dir, "current.log"), **kwargs)
+        self.log_dir = log_dir
+        self.index_file = os.path.join(log_dir, "index.bin")
+        self.max_segment_bytes = max_segment_bytes
+        self.compresslevel = compresslevel
+        self.encounter_id = None
+        self.encounter_started = None
+    
+    def segment_path(self, segment):
+        """Ruta del segmento comprimido con número segment."""
+        return os.path.join(self.log_dir, f"segment_{segment:04d}.log.gz")
+    
+    def start_encounter(self):
+        """Empezar un encuentro nuevo; cierra el anterior si seguía abierto."""
+        if self.encounter_id is not None:
+            self.end_encounter()
+        
+        # Lo registrado antes de start_combat (entidades añadidas) pertenece a este encuentro
+        self.encounter_id = self.count_encounters() + 1
+        self.encounter_started = time.time()
+    
+    def end_encounter(self):
+        """Comprimir el encuentro actual en su segmento y añadirlo al índice."""
+        self.flush()
+        if self.encounter_id is None:
+            return
+        
+        try:
+            with open(self.log_file, 'rb') as f:
+                member = gzip.compress(f.read(), compresslevel=self.compresslevel)
+            
+            segment = self._segment_for(len(member))
+            with open(self.segment_path(segment), 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(member)
+            
+            with open(self.index_file, 'ab') as f:
+                f.write(INDEX_RECORD.pack(self.encounter_id, self.encounter_started,
+                                          segment, offset, len(member)))
+            
+            # Vaciar el segmento activo para el siguiente encuentro
+            open(self.log_file, 'w').close()
+        except Exception as e:
+            print(f"Error al cerrar el segmento del log: {e}")
+        finally:
+            self.encounter_id = None
+            self.encounter_started = None
+    
+    def _segment_for(self, member_size):
+        """Elegir el segmento donde añadir un miembro de member_size bytes."""
+        count = self.count_encounters()
+        if not count:
+            return 1
+        
+        segment = self.get_index_entry(count)["segment"]
+        path = self.segment_path(segment)
+        if os.path.exists(path) and os.path.getsize(path) + member_size > self.max_segment_bytes:
+            return segment + 1
+        return segment
+    
+    def count_encounters(self):
+        """Número de encuentros cerrados en el índice."""
+        if not os.path.exists(self.index_file):
+            return 0
+        return os.path.getsize(self.index_file) // INDEX_RECORD.size
+    
+    def get_index_entry(self, encounter_id):
+        """
+        Leer la entrada del índice de un encuentro.
+        
+        Returns:
+            dict: encounter_id, timestamp, segment, offset y length, o None si no existe.
+        """
+        if not 1 <= encounter_id <= self.count_encounters():
+            return None
+        
+        with open(self.index_file, 'rb') as f:
+            f.seek((encounter_id - 1) * INDEX_RECORD.size)
+            record = INDEX_RECORD.unpack(f.read(INDEX_RECORD.size))
+        
+        keys = ("encounter_id", "timestamp", "segment", "offset", "length")
+        return dict(zip(keys, record))
+    
+    def read_encounter(self, encounter_id):
+        """
+        Obtener las entradas de un encuentro cerrado sin recorrer los demás.
+        
+        Returns:
+            list: Líneas del encuentro, o una lista vacía si no existe.
+        """
+        entry = self.get_index_entry(encounter_id)
+        if entry is None:
+            return []
+        
+        with open(self.segment_path(entry["segment"]), 'rb') as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+        
+        return gzip.decompress(member).decode('utf-8').splitlines(keepends=True)
+    
+    def find_encounter_at(self, timestamp):
+        """
+        Buscar el encuentro en curso en un instante dado (búsqueda binaria en el índice).
+        
+        Args:
+            timestamp (float): Instante como epoch, p. ej. datetime.timestamp().
+        
+        Returns:
+            int: Id del último encuentro iniciado en o antes de timestamp, o None.
+        """
+        low, high = 1, self.count_encounters()
+        found = None
+        while low <= high:
+            middle = (low + high) // 2
+            if self.get_index_entry(middle)["timestamp"] <= timestamp:
+                found = middle
+                low = middle + 1
+            else:
+                high = middle - 1
+        return found
+    
+    def get_last_entries(self, n=10):
+        """Obtener las últimas n entradas, completando con el último encuentro cerrado."""
+        entries = super().get_last_entries(n)
+        count = self.count_encounters()
+        if n > 0 and len(entries) < n and count:
+            entries = self.read_encounter(count)[len(entries) - n:] + entries
+        return entries
+    
+    def clear_log(self):
+        """Eliminar el segmento activo, los segmentos comprimidos y el índice."""
+        super().clear_log()
+        try:
+            count = self.count_encounters()
+            last_segment = self.get_index_entry(count)["segment"] if count else 0
+            for segment in range(1, last_segment + 1):
+                if os.path.exists(self.segment_path(segment)):
+                    os.remove(self.segment_path(segment))
+            if os.path.exists(self.index_file):
+                os.remove(self.index_file)
+        except Exception as e:
+            print(f"Error al limpiar el log: {e}")
@@ -0,0 +1,129 @@
+# persistence/sqlite_backend.py
+import datetime
+import json
+import sqlite3
+
+# Tablas de colecciones: columna extra indexada y cómo obtenerla del diccionario
+COLLECTIONS = {
+    "characters": ("level", lambda data: data.get("level", 1)),
+    "monsters": ("challenge_rating", lambda data: data.get("challenge_rating", 0)),
+    "spells": ("level", lambda data: data.get("level", 0))
+}
+
+class SQLiteBackend:
+    """
+    Almacenamiento de DataManager en una base de datos SQLite.
+    
+    Cada colección (personajes, monstruos, hechizos) es una tabla con el nombre
+    como clave única y el diccionario de to_dict() en JSON, de modo que guardar
+    una entidad es un upsert por nombre en lugar de reescribir todo el archivo.
+    """
+    
+    def __init__(self, db_file="data/dnd.sqlite3"):
+        """
+        Abrir (o crear) la base de datos.
+        
+        Args:
+            db_file (str, optional): Ruta del archivo SQLite.
+        """
+        self.db_file = db_file
+        self.connection = sqlite3.connect(db_file)
+        # WAL: las escrituras pequeñas no bloquean lecturas y son más rápidas
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+    
+    def _create_tables(self):
+        """Crear las tablas e índices si no existen."""
+        with self.connection:
+            for table, (column, _) in COLLECTIONS.items():
+                self.connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    f"id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, "
+                    f"{column} INTEGER NOT NULL DEFAULT 0, data TEXT NOT NULL)"
+                )
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS combat_states ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, saved_at TEXT NOT NULL)"
+            )
+    
+    def _row(self, collection, data):
+        """Valores de una fila a partir del diccionario de una entidad."""
+        _, extract = COLLECTIONS[collection]
+        return data["name"], extract(data), json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    
+    def load_all(self, collection):
+        """Obtener todas las entidades de una colección en orden de inserción."""
+        rows = self.connection.execute(f"SELECT data FROM {collection} ORDER BY id")
+        return [json.loads(data) for (data,) in rows]
+    
+    def get(self, collection, name):
+        """Obtener una entidad por nombre, o None si no existe."""
+        row = self.connection.execute(f"SELECT data FROM {collection} WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def load_index(self, collection):
+        """Obtener nombre, columna indexada e id de fila de cada entidad, sin decodificar el JSON."""
+        column, _ = COLLECTIONS[collection]
+        rows = self.connection.execute(f"SELECT id, name, {column} FROM {collection} ORDER BY id")
+        return [{"name": name, column: value, "position": position, "row_id": row_id}
+                for position, (row_id, name, value) in enumerate(rows)]
+    
+    def get_by_id(self, collection, row_id):
+        """Obtener una entidad por id de fila, o None si no existe."""
+        row = self.connection.execute(f"SELECT data FROM {collection} WHERE id = ?", (row_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def upsert(self, collection, data):
+        """Insertar o actualizar una entidad por nombre (conserva su posición)."""
+        column, _ = COLLECTIONS[collection]
+        with self.connection:
+            self.connection.execute(
+                f"INSERT INTO {collection} (name, {column}, data) VALUES (?, ?, ?) "
+                f"ON CONFLICT(name) DO UPDATE SET {column} = excluded.{column}, data = excluded.data",
+                self._row(collection, data)
+            )
+    
+    def delete(self, collection, name):
+        """Eliminar una entidad por nombre. Devuelve True si existía."""
+        with self.connection:
+            cursor = self.connection.execute(f"DELETE FROM {collection} WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+    
+    def replace_all(self, collection, records):
+        """Sustituir toda la colección en una sola transacción."""
+        column, _ = COLLECTIONS[collection]
+        with self.connection:
+            self.connection.execute(f"DELETE FROM {collection}")
+            self.connection.executemany(
+                f"INSERT INTO {collection} (name, {column}, data) VALUES (?, ?, ?) "
+                f"ON CONFLICT(name) DO UPDATE SET {column} = excluded.{column}, data = excluded.data",
+                (self._row(collection, data) for data in records)
+            )
+    
+    def count(self, collection):
+        """Número de entidades de una colección."""
+        return self.connection.execute(f"SELECT COUNT(*) FROM {collection}").fetchone()[0]
+    
+    def save_state(self, key, state):
+        """Guardar un estado (p. ej. el del combate) bajo una clave."""
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO combat_states (key, data, saved_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET data = excluded.data, saved_at = excluded.saved_at",
+                (key, json.dumps(state, ensure_ascii=False), datetime.datetime.now().isoformat())
+            )
+    
+    def load_state(self, key):
+        """Cargar un estado guardado, o None si no existe."""
+        row = self.connection.execute("SELECT data FROM combat_states WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def has_state(self, key):
+        """Indica si hay un estado guardado bajo la clave."""
+        return self.connection.execute("SELECT 1 FROM combat_states WHERE key = ?", (key,)).fetchone() is not None
+    
+    def close(self):
+        """Cerrar la conexión."""
+        self.connection.close()
\ No newline at end of file
@@ -0,0 +1,83 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# Los módulos del juego se importan de forma absoluta desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.combat_engine import CombatEngine
+from core.rng import CombatRNG
+from core.simulation import take_monster_turn
+from models.character import Character
+from models.monster import Monster
+from models.spell import Spell
+from persistence.combat_logger import CombatLogger
+from persistence.event_log import EventLog
+
+_HEX = {"name": "Rayo maléfico", "description": "", "spell_type": "Ofensivo", "level": 1,
+        "attack_roll": True, "damage_dice": "1d10", "damage_type": "necrótico",
+        "effects": [{"name": "ceguera", "description": "", "duration": 2, "effect_type": "negativo",
+                     "modifier": "ataque", "attribute": "FU", "value": -2}]}
+_WARD = {"name": "Escudo de fe", "description": "", "spell_type": "Defensivo", "level": 0,
+         "effects": [{"name": "Escudo de fe", "description": "", "duration": 3, "effect_type": "positivo",
+                      "modifier": "CA", "value": 2}]}
+
+
+@pytest.fixture
+def make_engine():
+    """Fábrica de motores con un combate ya iniciado y la iniciativa tirada."""
+    def make(seed=7, **options):
+        engine = CombatEngine(logger=CombatLogger(log_file=None), rng=CombatRNG(seed),
+                              events=EventLog(log_file=None), **options)
+        for index in range(3):
+            character = Character(f"Héroe {index}", 24, 14, 14, 12, 12, 16, 10, 10, level=3)
+            character.add_weapon({"name": "Espada", "type": "melee", "damage_dice": "1d8", "finesse": False})
+            character.spells = [Spell.from_dict(_HEX), Spell.from_dict(_WARD)]
+            engine.add_character(character)
+        for index in range(3):
+            monster = Monster(name=f"Gnoll {index}", max_hp=20, armor_class=13, initiative_mod=1,
+                              attack_bonus=4, damage_dice="1d8", damage_bonus=2, challenge_rating=2)
+            monster.spells = [Spell.from_dict(_HEX)]
+            monster.spell_slots = {1: 2}
+            engine.add_monster(monster)
+        engine.start_combat(seed)
+        engine.roll_initiative()
+        return engine
+    return make
+
+
+def play_turns(engine, turns):
+    """
+    Jugar turnos completos: los personajes alternan hechizos y ataques y los
+    monstruos usan la lógica del motor.
+    """
+    for _ in range(turns):
+        entity = engine.get_current_entity()
+        if entity.is_alive and entity in engine.characters:
+            target = engine.choose_random_enemy(entity)
+            if target is not None:
+                if entity.spell_slots.get(1, 0) and engine.round_number % 2:
+                    engine.cast_spell(entity, entity.spells[0], target)
+                elif engine.round_number % 3 == 0:
+                    engine.cast_spell(entity, entity.spells[1], entity)
+                else:
+                    engine.attack(entity, target)
+        elif entity.is_alive:
+            take_monster_turn(engine, entity)
+        engine.check_combat_status()
+        if not engine.combat_active:
+            return
+        engine.next_turn()
+
+
+def combat_state(engine):
+    """Estado observable del combate para comparar motores."""
+    entities = []
+    for entity in engine.characters + engine.monsters:
+        entities.append((entity.name, entity.current_hp, entity.is_alive, dict(entity.spell_slots),
+                         [(effect.name, effect.remaining_turns, effect.expires_at) for effect in entity.effects],
+                         {key: value for key, value in entity.modifiers.items() if value}))
+    return (entities, engine.round_number, engine.current_turn_index, engine.combat_active,
+            [entity.name for entity in engine.initiative_order])
@@ -0,0 +1,99 @@
+# tests/test_analytic_models.py
+import pytest
+
+from core.dpr import attack_dpr
+from core.markov import solve_encounter
+from core.simulation import simulate
+from core.vectorized import simulate_vectorized
+from models.character import Character
+from models.monster import Monster
+
+
+def _weak_encounter():
+    """Ambos bandos tienen daño negativo con algunas tiradas (FU 6 y 1d4-2)."""
+    character = Character("Aprendiz", 12, 12, 6, 10, 10, 10, 10, 10)
+    character.add_weapon({"name": "Daga", "type": "melee", "damage_dice": "1d4", "finesse": False})
+    monster = Monster(name="Rata", max_hp=6, armor_class=10, attack_bonus=2, damage_dice="1d4-2")
+    return [character], [monster]
+
+
+def _goblin_encounter():
+    """Dos personajes (cuerpo a cuerpo y a distancia) contra tres goblins, sin hechizos."""
+    fighter = Character("Guerrera", 22, 16, 16, 12, 14, 10, 10, 10, level=2)
+    fighter.add_weapon({"name": "Espada larga", "type": "melee", "damage_dice": "1d8", "finesse": False})
+    archer = Character("Arquero", 16, 14, 10, 16, 12, 10, 10, 10, level=2)
+    archer.add_weapon({"name": "Arco corto", "type": "ranged", "damage_dice": "1d6+1", "finesse": False})
+    monsters = [Monster(name=f"Goblin {index}", max_hp=9, armor_class=13, initiative_mod=2,
+                        attack_bonus=4, damage_dice="1d6", damage_bonus=2) for index in range(3)]
+    return [fighter, archer], monsters
+
+
+def _ogre_encounter():
+    """Dos personajes contra un ogro: pocos estados para la cadena de Markov y resultado ajustado."""
+    fighter = Character("Guerrera", 14, 15, 14, 12, 14, 10, 10, 10)
+    fighter.add_weapon({"name": "Hacha", "type": "melee", "damage_dice": "1d6", "finesse": False})
+    rogue = Character("Pícaro", 10, 13, 8, 16, 12, 10, 10, 10)
+    rogue.add_weapon({"name": "Daga", "type": "melee", "damage_dice": "1d4", "finesse": True})
+    ogre = Monster(name="Ogro joven", max_hp=24, armor_class=12, initiative_mod=-1,
+                   attack_bonus=5, damage_dice="2d6", damage_bonus=2)
+    return [fighter, rogue], [ogre]
+
+
+def test_negative_damage_never_heals_in_the_analytic_models():
+    """Como take_damage, los modelos recortan el daño a 0 y coinciden con simulate()."""
+    characters, monsters = _weak_encounter()
+    expected = simulate(characters, monsters, 2000, seed=1)["win_rate"]
+
+    assert simulate_vectorized(characters, monsters, 20000, seed=1)["win_rate"] == pytest.approx(expected, abs=0.04)
+    solved = solve_encounter(characters, monsters)
+    assert solved["win_probability"] == pytest.approx(expected, abs=0.04)
+    assert solved["draw_probability"] < 1e-6
+
+    for attacker, armor_class in ((characters[0], monsters[0].armor_class), (monsters[0], characters[0].armor_class)):
+        assert attack_dpr(attacker, armor_class)["expected_damage"] > 0
+
+
+def test_multi_term_weapon_dice():
+    """Las armas con varios términos de dados ("1d6+1d4", "2d6-1d4") funcionan en todos los modelos."""
+    character = Character("Duelista", 14, 13, 14, 12, 12, 10, 10, 10)
+    character.add_weapon({"name": "Espada llameante", "type": "melee", "damage_dice": "1d6+1d4", "finesse": False})
+    monster = Monster(name="Troll menor", max_hp=12, armor_class=12, attack_bonus=3, damage_dice="2d6-1d4+1")
+    characters, monsters = [character], [monster]
+    
+    assert character.get_attack_profile()["damage_terms"] == ((1, 1, 6), (1, 1, 4))
+    assert monster.get_attack_profile()["damage_terms"] == ((1, 2, 6), (-1, 1, 4))
+    
+    expected = simulate(characters, monsters, 2000, seed=2)["win_rate"]
+    assert simulate_vectorized(characters, monsters, 20000, seed=2)["win_rate"] == pytest.approx(expected, abs=0.04)
+    assert solve_encounter(characters, monsters)["win_probability"] == pytest.approx(expected, abs=0.04)
+    # 1d6+1d4 con FU 14 (+2): impacta con 6+ y hace 6 + 2 (12 + 2 en crítico) más el
+    # daño provisional de 2 de attack()
+    assert attack_dpr(character, 10)["expected_damage"] == pytest.approx(0.70 * 10 + 0.05 * 16)
+
+
+def test_vectorized_matches_simulate():
+    """El núcleo vectorizado reproduce las estadísticas de simulate() dentro del error de muestreo."""
+    characters, monsters = _goblin_encounter()
+    expected = simulate(characters, monsters, 1500, seed=3)
+    vectorized = simulate_vectorized(characters, monsters, 20000, seed=3)
+    
+    assert vectorized["runs"] == 20000 and vectorized["wins"] + vectorized["losses"] + vectorized["draws"] == 20000
+    assert vectorized["win_rate"] == pytest.approx(expected["win_rate"], abs=0.03)
+    assert vectorized["average_rounds"] == pytest.approx(expected["average_rounds"], rel=0.05)
+    assert vectorized["average_party_hp"] == pytest.approx(expected["average_party_hp"], rel=0.05)
+    
+    # Con la misma semilla el resultado es idéntico
+    again = simulate_vectorized(characters, monsters, 20000, seed=3)
+    assert (again["winner"] == vectorized["winner"]).all() and (again["monster_hp"] == vectorized["monster_hp"]).all()
+
+
+def test_solve_encounter_matches_monte_carlo():
+    """La probabilidad exacta de la cadena de Markov coincide con la tasa de victoria de simulate()."""
+    characters, monsters = _ogre_encounter()
+    solved = solve_encounter(characters, monsters)
+    expected = simulate(characters, monsters, 3000, seed=5)
+    
+    assert solved["win_probability"] + solved["loss_probability"] + solved["draw_probability"] == pytest.approx(1.0)
+    assert sum(solved["rounds"].values()) == pytest.approx(solved["win_probability"] + solved["loss_probability"])
+    assert solved["win_probability"] == pytest.approx(expected["win_rate"], abs=0.03)
+    assert solved["expected_rounds"] == pytest.approx(expected["average_rounds"], rel=0.05)
@@ -0,0 +1,79 @@
+# tests/test_combat_logger.py
+import time
+
+import pytest
+
+from persistence.combat_logger import CombatLogger, _tail_lines
+
+
+def _messages(path):
+    """Mensajes del log sin la marca de tiempo."""
+    with open(path, encoding='utf-8') as f:
+        return [line.split("] ", 1)[1].rstrip("\n") for line in f]
+
+
+def test_buffered_flush_writes_everything_in_order(tmp_path):
+    """flush() espera al hilo: todo lo registrado antes está en el archivo y en orden."""
+    path = tmp_path / "combat.log"
+    logger = CombatLogger(str(path), buffered=True, batch_size=1000, flush_interval=60)
+    try:
+        for index in range(300):
+            logger.log(f"Entrada {index}")
+        logger.flush()
+        assert _messages(path) == [f"Entrada {index}" for index in range(300)]
+
+        # Las entradas posteriores esperan en memoria hasta el siguiente flush
+        logger.log("Pendiente")
+        assert _messages(path)[-1] == "Entrada 299"
+        logger.flush()
+        assert _messages(path)[-1] == "Pendiente"
+    finally:
+        logger.close()
+
+
+def test_buffered_close_writes_pending_entries_and_stops_the_thread(tmp_path):
+    """close() escribe lo pendiente antes de parar; después se escribe directamente."""
+    path = tmp_path / "combat.log"
+    # Una cola mínima obliga a log() a esperar al hilo en lugar de descartar entradas
+    logger = CombatLogger(str(path), buffered=True, batch_size=7, flush_interval=60, max_queue=2)
+    writer = logger._writer
+    for index in range(100):
+        logger.log(f"Entrada {index}")
+    logger.close()
+
+    assert not writer.is_alive()
+    assert _messages(path) == [f"Entrada {index}" for index in range(100)]
+
+    logger.log("Tras cerrar")
+    logger.close()
+    assert _messages(path)[-1] == "Tras cerrar"
+    assert logger.get_last_entries(2)[0].endswith("Entrada 99\n")
+
+
+def test_buffered_entries_are_written_after_flush_interval(tmp_path):
+    """Sin flush explícito una entrada se escribe como mucho flush_interval después."""
+    path = tmp_path / "combat.log"
+    logger = CombatLogger(str(path), buffered=True, batch_size=1000, flush_interval=0.05)
+    try:
+        logger.log("Primera")
+        deadline = time.monotonic() + 5
+        while not (path.exists() and path.read_bytes().endswith(b"\n")) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _messages(path) == ["Primera"]
+    finally:
+        logger.close()
+
+
+@pytest.mark.parametrize("ending", ["\n", "\r\n", ""])
+def test_tail_lines_across_block_boundaries(tmp_path, ending):
+    """Con cualquier tamaño de bloque, CRLF y caracteres de varios bytes partidos dan las mismas líneas."""
+    lines = ["Ñandú ataca: ¡CRÍTICO! 🐉", "", "Línea con CRLF", "dragón", "x" * 30, "último: ü"]
+    data = "".join(line + ("\r\n" if index % 2 else "\n") for index, line in enumerate(lines[:-1]))
+    data += lines[-1] + ending
+    path = tmp_path / "combat.log"
+    path.write_bytes(data.encode('utf-8'))
+    
+    expected = [line + "\n" for line in lines[:-1]] + [lines[-1] + ("\n" if ending else "")]
+    for block_size in range(1, 20):
+        for n in range(1, len(lines) + 2):
+            assert _tail_lines(str(path), n, block_size) == expected[-n:]
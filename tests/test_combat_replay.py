@@ -0,0 +1,87 @@
+# tests/test_combat_replay.py
+import json
+
+import pytest
+
+from conftest import combat_state, play_turns
+from core.replay import CombatReplay
+
+
+def test_replay_reproduces_the_final_state(make_engine):
+    """La semilla y el registro de acciones bastan para llegar al mismo estado."""
+    engine = make_engine(seed=11)
+    play_turns(engine, 40)
+    assert any(action["action"] == "cast_spell" for action in engine.action_log)
+    
+    replayed = CombatReplay.from_engine(engine).run()
+    assert combat_state(replayed) == combat_state(engine)
+
+
+def test_replay_survives_serialization(make_engine):
+    """Una repetición guardada como JSON sigue reproduciendo el combate."""
+    engine = make_engine(seed=3)
+    play_turns(engine, 25)
+    
+    data = json.loads(json.dumps(CombatReplay.from_engine(engine).to_dict()))
+    replayed = CombatReplay.from_dict(data).run()
+    assert combat_state(replayed) == combat_state(engine)
+
+
+def test_replay_until_round_stops_early(make_engine):
+    """Con until_round la repetición se detiene al empezar esa ronda."""
+    engine = make_engine(seed=5)
+    play_turns(engine, 12)
+    assert engine.round_number > 2
+    
+    partial = CombatReplay.from_engine(engine).run(until_round=2)
+    assert partial.round_number == 2 and partial.current_turn_index == 0
+
+
+
+def test_forced_rolls_are_replayed(make_engine):
+    """Los d20 forzados (menú de trampas) quedan en el registro y se repiten."""
+    engine = make_engine(seed=11)
+    play_turns(engine, 3)
+    engine.force_d20(20, 1)
+    attacker = engine.get_current_entity()
+    target = engine.choose_random_enemy(attacker)
+    assert "¡CRÍTICO!" in engine.attack(attacker, target)
+    play_turns(engine, 10)
+    engine.force_d20(1)
+    engine.force_d20()
+    play_turns(engine, 10)
+    
+    replayed = CombatReplay.from_engine(engine).run()
+    assert combat_state(replayed) == combat_state(engine)
+
+
+def test_rolls_forced_before_the_combat_survive_the_reseed(make_engine):
+    """start_combat cambia la semilla pero mantiene (y registra) los d20 forzados."""
+    engine = make_engine(seed=4)
+    engine.rng.force_d20(20)
+    engine.rng.force_d20(19)
+    engine.start_combat(8)
+    assert engine.rng.getstate()[1] == (20, 19)
+    engine.roll_initiative()
+    first, second = engine.characters[:2]
+    assert (first.initiative_roll - first.initiative_mod, second.initiative_roll - second.initiative_mod) == (20, 19)
+    play_turns(engine, 12)
+    
+    replayed = CombatReplay.from_engine(engine).run()
+    assert combat_state(replayed) == combat_state(engine)
+
+def test_initial_state_is_not_shared_with_the_entities(make_engine):
+    """Gastar espacios de conjuro en combate no altera el estado inicial guardado."""
+    engine = make_engine(seed=11)
+    slots = [dict(data["spell_slots"]) for data in engine.initial_state["characters"]]
+    play_turns(engine, 40)
+    assert [data["spell_slots"] for data in engine.initial_state["characters"]] == slots
+
+
+def test_engine_without_replay_records_nothing(make_engine):
+    """replay=False no guarda estado inicial ni acciones, y no se puede repetir."""
+    engine = make_engine(seed=11, replay=False)
+    play_turns(engine, 10)
+    assert engine.initial_state is None and engine.action_log == []
+    with pytest.raises(ValueError):
+        CombatReplay.from_engine(engine)
@@ -0,0 +1,129 @@
+# tests/test_data_manager.py
+import os
+
+import pytest
+
+from models.character import Character
+from models.monster import Monster
+from persistence import json_store
+from persistence.data_manager import DataManager
+from persistence.json_store import JsonListWriter, load_json, load_list_index, read_list_item
+from persistence.sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def data_manager(request, tmp_path):
+    """DataManager sobre un directorio temporal con cada backend."""
+    manager = DataManager(str(tmp_path), backend=request.param)
+    yield manager
+    if manager.backend is not None:
+        manager.backend.close()
+
+
+def _character(name, level=1):
+    character = Character(name, 20, 13, 12, 14, 12, 10, 10, 10, level=level)
+    character.add_weapon({"name": "Daga", "type": "melee", "damage_dice": "1d4", "finesse": True})
+    return character
+
+
+def test_save_character_replaces_by_name_and_keeps_order(data_manager):
+    """Guardar un personaje existente lo sustituye en su sitio; uno nuevo va al final."""
+    for index in range(4):
+        assert data_manager.save_character(_character(f"Personaje {index}", level=index + 1))
+    
+    edited = _character("Personaje 1", level=9)
+    edited.current_hp = 3
+    assert data_manager.save_character(edited)
+    assert data_manager.save_character(_character("Nuevo"))
+    
+    loaded = data_manager.load_characters()
+    assert [char.name for char in loaded] == ["Personaje 0", "Personaje 1", "Personaje 2", "Personaje 3", "Nuevo"]
+    assert (loaded[1].level, loaded[1].current_hp) == (9, 3)
+
+
+def test_index_and_lazy_loading(data_manager):
+    """El índice lista nombre y desafío, y cada entrada se carga por separado."""
+    for index in range(3):
+        data_manager.save_monster(Monster(name=f"Monstruo {index}", max_hp=10, armor_class=12,
+                                          challenge_rating=index))
+    
+    index = data_manager.load_monster_index()
+    assert [(entry["name"], entry["challenge_rating"]) for entry in index] == \
+        [("Monstruo 0", 0), ("Monstruo 1", 1), ("Monstruo 2", 2)]
+    assert data_manager.load_monster(index[2]).name == "Monstruo 2"
+    
+    assert data_manager.delete_monster(index[0])
+    assert [monster.name for monster in data_manager.load_monsters()] == ["Monstruo 1", "Monstruo 2"]
+
+
+def test_combat_state_round_trip(data_manager, make_engine):
+    """El combate guardado se restaura con las mismas entidades, turno e iniciativa."""
+    engine = make_engine(seed=4)
+    engine.attack(engine.characters[0], engine.monsters[0])
+    engine.next_turn()
+    assert data_manager.save_combat_state(engine)
+    assert data_manager.has_combat_state()
+    
+    restored = make_engine(seed=99)
+    assert data_manager.load_combat_state(restored)
+    assert [char.to_dict() for char in restored.characters] == [char.to_dict() for char in engine.characters]
+    assert [monster.current_hp for monster in restored.monsters] == [monster.current_hp for monster in engine.monsters]
+    assert [entity.name for entity in restored.initiative_order] == [entity.name for entity in engine.initiative_order]
+    assert (restored.round_number, restored.current_turn_index) == (engine.round_number, engine.current_turn_index)
+
+
+def test_sqlite_upsert_and_import(tmp_path):
+    """El backend SQLite hace upsert por nombre e importa los archivos JSON existentes."""
+    json_manager = DataManager(str(tmp_path))
+    json_manager.save_characters([_character("Ana"), _character("Bruno", level=3)])
+    
+    backend = SQLiteBackend(str(tmp_path / "otro.sqlite3"))
+    try:
+        sqlite_manager = DataManager(str(tmp_path), backend=backend)
+        assert sqlite_manager.import_json_files()
+        assert backend.count("characters") == 2
+        
+        backend.upsert("characters", _character("Ana", level=5).to_dict())
+        assert backend.count("characters") == 2
+        assert backend.get("characters", "Ana")["level"] == 5
+        assert [entry["name"] for entry in backend.load_index("characters")] == ["Ana", "Bruno"]
+        assert backend.delete("characters", "Bruno") and not backend.delete("characters", "Bruno")
+    finally:
+        backend.close()
+
+
+def test_list_index_hit_reads_the_same_entities(tmp_path, monkeypatch):
+    """Un índice reutilizado lleva a los mismos elementos que cargar el archivo entero."""
+    path = str(tmp_path / "monsters.json")
+    monsters = [Monster(name=f"Dragón {index}", max_hp=10 + index, armor_class=12, challenge_rating=index)
+                for index in range(5)]
+    JsonListWriter(path, ("challenge_rating",)).write([monster.to_dict() for monster in monsters])
+    
+    def scan(*args):
+        raise AssertionError("el índice guardado debía reutilizarse")
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(json_store, "_scan_list", scan)
+        index = load_list_index(path, ("challenge_rating",))
+    full = load_json(path)
+    assert [entry["challenge_rating"] for entry in index] == list(range(5))
+    for entry in index:
+        item = read_list_item(path, entry)
+        assert item == full[entry["position"]]
+        assert Monster.from_dict(item).to_dict() == monsters[entry["position"]].to_dict()
+    
+    # Otros campos no reutilizan el índice
+    assert [entry["max_hp"] for entry in load_list_index(path, ("max_hp",))] == list(range(10, 15))
+    
+    # Un archivo sustituido con el mismo tamaño y fecha tiene otro inodo
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        content = f.read().replace(b'"max_hp": 13', b'"max_hp": 19')
+    copy = tmp_path / "copia.json"
+    copy.write_bytes(content)
+    os.replace(copy, path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(path).st_size == stat.st_size
+    index = load_list_index(path, ("max_hp",))
+    assert index[3]["max_hp"] == read_list_item(path, index[3])["max_hp"] == 19
+
@@ -0,0 +1,88 @@
+# tests/test_dice.py
+import itertools
+from fractions import Fraction
+
+import pytest
+
+from core.dice import Dice, DiceExpr
+from core.rng import CombatRNG
+
+
+def _brute_force(terms, modifier, critical=False, halved=False):
+    """Distribución recorriendo todas las combinaciones de caras."""
+    dice = [(sign, faces) for sign, count, faces in terms for _ in range(count)]
+    counts = {}
+    for faces in itertools.product(*(range(1, size + 1) for _, size in dice)):
+        dice_sum = sum(sign * face for (sign, _), face in zip(dice, faces))
+        total = (dice_sum * 2 if critical else dice_sum) + modifier
+        if halved:
+            total //= 2
+        counts[total] = counts.get(total, 0) + 1
+    outcomes = sum(counts.values())
+    return {total: counts[total] / outcomes for total in sorted(counts)}
+
+
+def test_compile_parses_terms_modifiers_and_symbols():
+    """La notación se descompone en dados, modificador fijo y modificadores simbólicos."""
+    expr = DiceExpr.compile("2d6 + 1d4 - 1 + d20 - modificador + 3")
+    assert expr.terms == ((1, 2, 6), (1, 1, 4), (1, 1, 20))
+    assert expr.modifier == 2
+    assert expr.symbols == ((-1, "modificador"),)
+    assert expr.resolve_modifier({"modificador": 4}) == -2
+    assert DiceExpr.compile("2D6 + 1D4 - 1 + D20 - MODIFICADOR + 3").terms == expr.terms
+    assert DiceExpr.compile("1d8") is DiceExpr.compile("1d8")
+
+
+@pytest.mark.parametrize("notation", ["", "3", "2d", "d", "2d6 3", "2d6++1", "2x6"])
+def test_invalid_notation_is_rejected(notation):
+    """Las notaciones sin dados o mal formadas no se compilan."""
+    assert not Dice.is_valid(notation)
+    with pytest.raises(ValueError):
+        DiceExpr.compile(notation)
+
+
+def test_single_term_and_scaling():
+    """parse acepta un solo término y scaled añade dados al primero."""
+    assert Dice.parse("3d6+2") == (3, 6, 2)
+    with pytest.raises(ValueError):
+        Dice.parse("1d6+1d4")
+    
+    scaled = DiceExpr.compile("2d6+1d4-1").scaled(2)
+    assert scaled.notation == "4d6+1d4-1"
+    assert scaled.terms == ((1, 4, 6), (1, 1, 4))
+    assert DiceExpr.compile("1d8").scaled(0) is DiceExpr.compile("1d8")
+
+
+def test_seeded_rolls_are_reproducible_and_in_range():
+    """Con la misma semilla se obtienen las mismas tiradas, siempre dentro del rango."""
+    assert Dice.roll("2d6+3", rng=CombatRNG(5)) == Dice.roll("2d6+3", rng=CombatRNG(5))
+    
+    rng = CombatRNG(9)
+    for _ in range(200):
+        total, rolls, modifier = Dice.roll("2d6+3", rng=rng)
+        assert modifier == 3 and len(rolls) == 2
+        assert total == sum(rolls) + 3 and 5 <= total <= 15
+
+
+@pytest.mark.parametrize("notation, terms, modifier", [
+    ("2d8+3", ((1, 2, 8),), 3),
+    ("1d6+1d4-1", ((1, 1, 6), (1, 1, 4)), -1),
+    ("3d4-1d6", ((1, 3, 4), (-1, 1, 6)), 0),
+])
+@pytest.mark.parametrize("critical, halved", [(False, False), (True, False), (False, True)])
+def test_distribution_is_exact(notation, terms, modifier, critical, halved):
+    """La distribución coincide con la enumeración de todas las combinaciones."""
+    assert Dice.distribution(notation, critical, halved) == _brute_force(terms, modifier, critical, halved)
+
+
+def test_expected_value_and_percentiles():
+    """Valor esperado y percentiles exactos de la distribución."""
+    assert Dice.expected_value("2d8+3") == pytest.approx(12.0)
+    assert Dice.expected_value("2d8+3", critical=True) == pytest.approx(21.0)
+    assert sum(Dice.distribution("2d8+3").values()) == pytest.approx(1.0)
+    assert Fraction(Dice.distribution("2d6")[7]).limit_denominator(100) == Fraction(1, 6)
+    
+    assert Dice.percentile("1d20", 0.5) == 10
+    assert Dice.percentile("2d6", 0.5) == 7
+    assert Dice.percentile("2d6", 0.0) == 2
+    assert Dice.percentile("2d6", 1.0) == 12
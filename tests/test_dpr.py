@@ -0,0 +1,95 @@
+# tests/test_dpr.py
+import itertools
+import math
+
+import pytest
+
+from core.combat_engine import CombatEngine
+from core.dice import DiceExpr
+from core.dpr import attack_dpr, clear_cache
+from models.character import Character
+from models.monster import Monster
+from persistence.combat_logger import CombatLogger
+from persistence.event_log import EventLog
+
+
+class _ScriptedRNG:
+    """Generador que devuelve los valores indicados en orden."""
+
+    def __init__(self, values):
+        self.values = list(values)
+
+    def randint(self, a, b):
+        value = self.values.pop(0)
+        assert a <= value <= b
+        return value
+
+
+def _engine_expectation(attacker, target, damage_dice):
+    """
+    Daño medio de CombatEngine.attack recorriendo todas las caras del d20 y de
+    los dados de daño, con sus probabilidades exactas.
+    """
+    engine = CombatEngine(logger=CombatLogger(log_file=None), events=EventLog(log_file=None),
+                          undo=False, replay=False)
+    engine.render_text = False
+    for entity in (attacker, target):
+        (engine.add_character if isinstance(entity, Character) else engine.add_monster)(entity)
+    engine.start_combat(1)
+
+    faces = [dice_type for _, num_dice, dice_type in DiceExpr.compile(damage_dice).terms for _ in range(num_dice)]
+    p_dice = 1 / (20 * math.prod(faces))
+    target.max_hp = 10 ** 6
+
+    expected = hit = crit = 0.0
+    for attack_roll in range(1, 21):
+        for rolls in itertools.product(*(range(1, face + 1) for face in faces)):
+            target.current_hp, target.is_alive = target.max_hp, True
+            engine.rng = _ScriptedRNG((attack_roll,) + rolls)
+            result = engine.attack(attacker, target)
+
+            damage = target.max_hp - target.current_hp
+            expected += damage * p_dice
+            if "¡IMPACTO!" in result or "¡CRÍTICO!" in result:
+                hit += p_dice
+                crit += p_dice if attack_roll == 20 else 0.0
+    return {"hit_chance": hit, "crit_chance": crit, "expected_damage": expected}
+
+
+def _character(strength, damage_dice):
+    character = Character("Aprendiz", 20, 14, strength, 10, 10, 10, 10, 10)
+    character.add_weapon({"name": "Arma", "type": "melee", "damage_dice": damage_dice, "finesse": False})
+    return character
+
+
+@pytest.mark.parametrize("strength, damage_dice, armor_class", [
+    (16, "1d8", 13),
+    (6, "1d4", 10),          # FU 6 (-2): muchos impactos hacen 0 de daño
+    (6, "1d6+1d4-1", 12),    # el crítico del personaje suma el modificador de los dados una vez
+    (14, "2d6-1d4", 22)      # solo impacta con 20 natural, que siempre es crítico
+])
+def test_character_dpr_matches_engine_enumeration(strength, damage_dice, armor_class):
+    """attack_dpr da exactamente la media del motor, incluido el recorte a 0 y el crítico."""
+    clear_cache()
+    character = _character(strength, damage_dice)
+    target = Monster(name="Muñeco", max_hp=100, armor_class=armor_class)
+
+    expected = _engine_expectation(character, target, damage_dice)
+    assert attack_dpr(character, armor_class) == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.parametrize("attack_bonus, damage_dice, damage_bonus, armor_class", [
+    (4, "1d6", 2, 13),
+    (2, "1d4-2", 0, 10),     # modificador de los dados negativo
+    (3, "2d4+3", -2, 12),    # el crítico del monstruo cambia el +3 de los dados por el bono dos veces
+    (0, "1d8-1d6", -1, 8)    # en crítico el término que resta también suma
+])
+def test_monster_dpr_matches_engine_enumeration(attack_bonus, damage_dice, damage_bonus, armor_class):
+    """attack_dpr reproduce también las particularidades del daño de los monstruos."""
+    clear_cache()
+    monster = Monster(name="Bruto", max_hp=30, armor_class=12, attack_bonus=attack_bonus,
+                      damage_dice=damage_dice, damage_bonus=damage_bonus)
+    target = Character("Muñeco", 100, armor_class, 10, 10, 10, 10, 10, 10)
+
+    expected = _engine_expectation(monster, target, damage_dice)
+    assert attack_dpr(monster, armor_class) == pytest.approx(expected, abs=1e-9)
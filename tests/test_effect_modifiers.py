@@ -0,0 +1,114 @@
+# tests/test_effect_modifiers.py
+import pytest
+
+from core.dpr import get_spell_attack_bonus, get_spell_save_dc, spell_dpr
+from core.rng import CombatRNG
+from models.character import Character
+from models.effect import Effect
+from models.monster import Monster
+from models.spell import Spell
+
+
+def _monster(attack_bonus=4):
+    return Monster(name="Orco", max_hp=30, armor_class=13, attack_bonus=attack_bonus, damage_bonus=2)
+
+
+def _character():
+    return Character("Aria", 30, 14, 10, 14, 12, 16, 10, 8, level=5, proficiency_bonus=3)
+
+
+def test_totals_after_apply_and_remove():
+    """El caché suma y resta cada efecto en su modificador y en su atributo."""
+    monster = _monster()
+    blessed = Effect("Bendecido", "", 3, "positivo", modifier="ataque", value=2)
+    cursed = Effect("Ceguera", "", 3, "negativo", modifier="ataque", attribute="FU", value=-3)
+    shield = Effect("Escudo", "", 3, "positivo", modifier="CA", value=5)
+    
+    for effect in (blessed, cursed, shield):
+        effect.apply(monster)
+    assert monster.get_effect_modifier("ataque") == -1
+    assert monster.get_effect_modifier("fu") == -3
+    assert monster.get_attack_modifier() == 3
+    assert monster.get_armor_class() == 18
+    
+    cursed.remove(monster)
+    assert monster.get_effect_modifier("ataque") == 2
+    assert monster.get_effect_modifier("fu") == 0
+    assert monster.get_attack_modifier() == 6
+    
+    blessed.remove(monster)
+    shield.remove(monster)
+    assert monster.get_attack_modifier() == 4
+    assert monster.get_armor_class() == 13
+
+
+def test_refresh_matches_incremental_totals():
+    """refresh_modifiers recalcula lo mismo que apply/remove."""
+    character = _character()
+    Effect("Fuerza de toro", "", 3, "positivo", modifier="atributo", attribute="fuerza", value=4).apply(character)
+    Effect("Ceguera", "", 3, "negativo", modifier="ataque", attribute="FU", value=-2).apply(character)
+    incremental = dict(character.modifiers)
+    
+    character.refresh_modifiers()
+    assert character.modifiers == incremental
+    assert character.get_attribute("strength") == 14
+    assert character.get_effect_modifier("ataque") == -2
+
+
+def test_spell_effect_changes_later_attack_total():
+    """El efecto de ataque de un hechizo (con atributo) cambia las tiradas posteriores del objetivo."""
+    data = {"name": "Rayo maléfico", "description": "", "spell_type": "Ofensivo", "level": 0,
+            "effects": [{"name": "ceguera", "description": "", "duration": 2, "effect_type": "negativo",
+                         "modifier": "ataque", "attribute": "FU", "value": -2}]}
+    caster = _character()
+    spell = Spell.from_dict(data)
+    caster.spells.append(spell)
+    target = _character()
+    monster = _monster()
+    
+    assert "Tirada: 10 + 4 = 14" in monster.attack(target, 10)
+    caster.cast_spell(spell, monster, rng=CombatRNG(1))
+    assert "Tirada: 10 + 2 = 12" in monster.attack(target, 10)
+    
+    before = target.get_spell_attack_modifier()
+    caster.cast_spell(spell, target, rng=CombatRNG(1))
+    assert target.get_spell_attack_modifier() == before - 2
+    assert target.get_attack_modifier(target.weapon) == caster.get_attack_modifier(caster.weapon) - 2
+
+
+def test_spell_attack_rolls_use_attack_effects():
+    """Las tiradas de ataque de hechizos incluyen los efectos de ataque del lanzador."""
+    data = {"name": "Saeta", "description": "", "spell_type": "Ofensivo", "level": 0,
+            "attack_roll": True, "damage_dice": "1d4", "damage_type": "fuerza"}
+    monster = _monster()
+    monster.spells.append(Spell.from_dict(data))
+    character = _character()
+    character.spells.append(Spell.from_dict(data))
+    for entity in (monster, character):
+        Effect("Bendecido", "", 3, "positivo", modifier="ataque", value=2).apply(entity)
+    
+    message = monster.cast_spell(monster.spells[0], _character(), rng=CombatRNG(7))
+    assert " + 6 = " in message.split("Tirada de ataque: ")[1]
+    
+    # Inteligencia 16 (+3), competencia +3 y el efecto +2
+    message = character.cast_spell(character.spells[0], _monster(), rng=CombatRNG(7))
+    assert " + 8 = " in message.split("Tirada de ataque: ")[1]
+
+
+def test_spell_dpr_uses_the_caster_effects():
+    """spell_dpr usa los mismos bonos que cast_spell, con los efectos activos."""
+    data = {"name": "Saeta", "description": "", "spell_type": "Ofensivo", "level": 0,
+            "attack_roll": True, "damage_dice": "1d4", "damage_type": "fuerza"}
+    spell = Spell.from_dict(data)
+    monster = _monster()
+    character = _character()
+    for entity in (monster, character):
+        before = spell_dpr(entity, spell, 15)["hit_chance"]
+        Effect("Bendecido", "", 3, "positivo", modifier="ataque", value=2).apply(entity)
+        Effect("Astucia", "", 3, "positivo", modifier="atributo", attribute="inteligencia", value=4).apply(entity)
+        assert spell_dpr(entity, spell, 15)["hit_chance"] == pytest.approx(before + (0.2 if entity is character else 0.1))
+    
+    assert get_spell_attack_bonus(monster) == 6 and get_spell_save_dc(monster) == monster.spell_dc
+    # Inteligencia 20 (+5), competencia +3 y el efecto +2
+    assert get_spell_attack_bonus(character) == 10
+    assert get_spell_save_dc(character) == 16
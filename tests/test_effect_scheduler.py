@@ -0,0 +1,82 @@
+# tests/test_effect_scheduler.py
+import itertools
+
+from core.effect_scheduler import EffectScheduler, expiry_key, turns_until
+from models.effect import Effect
+from models.monster import Monster
+
+
+def _effect(name, duration=3):
+    return Effect(name, "", duration, "negativo", modifier="ataque", value=-1)
+
+
+def test_expiry_key_counts_turns_of_the_affected_entity():
+    """El turno en curso no cuenta: el efecto vence al empezar el N-ésimo turno siguiente."""
+    now = (3, 2)
+    assert expiry_key(now, 4, 1) == (3, 4)
+    assert expiry_key(now, 1, 1) == (4, 1)
+    assert expiry_key(now, 2, 1) == (4, 2)
+    assert expiry_key(now, 4, 3) == (5, 4)
+    
+    for position, turns in itertools.product(range(6), range(1, 5)):
+        assert turns_until(expiry_key(now, position, turns), now) == turns
+
+
+def test_pop_due_returns_expirations_in_order_and_skips_stale_entries():
+    """Se sacan solo los vencidos, por (ronda, posición) y en orden de programación si empatan."""
+    monster = Monster(name="Orco", max_hp=10, armor_class=12)
+    effects = {name: _effect(name) for name in ("a", "b", "c", "d", "e", "f")}
+    for effect in effects.values():
+        effect.apply(monster)
+    
+    scheduler = EffectScheduler()
+    for name, key in (("a", (2, 3)), ("b", (1, 4)), ("c", (2, 1)), ("d", (2, 1)), ("e", (3, 0)), ("f", (2, 2))):
+        scheduler.schedule(monster, effects[name], key)
+    
+    # Quitado antes de tiempo y reprogramado más tarde: sus entradas antiguas se descartan
+    effects["c"].remove(monster)
+    scheduler.schedule(monster, effects["f"], (3, 1))
+    
+    assert [effect.name for _, effect in scheduler.pop_due((1, 5))] == ["b"]
+    assert [effect.name for _, effect in scheduler.pop_due((2, 3))] == ["d", "a"]
+    assert scheduler.pop_due((2, 5)) == []
+    assert [effect.name for _, effect in scheduler.pop_due((9, 0))] == ["e", "f"]
+    assert len(scheduler) == 0
+
+
+def test_engine_expires_effects_like_ticking_every_turn(make_engine):
+    """El motor termina cada efecto en el mismo turno que descontando turnos uno a uno."""
+    engine = make_engine(seed=21)
+    order = list(engine.initiative_order)
+    applied = []
+    for entity in order:
+        for duration in (1, 2, 3):
+            effect = _effect(f"{entity.name} {duration}", duration)
+            effect.apply(entity)
+            engine.schedule_effect(entity, effect)
+            applied.append((entity, effect))
+    
+    # Modelo ingenuo: al empezar el turno de una entidad se descuenta un turno a sus efectos
+    remaining = {id(effect): effect.duration for _, effect in applied}
+    expected = []
+    position = engine.current_turn_index
+    for turn in range(1, 4 * len(order)):
+        position = (position + 1) % len(order)
+        for entity, effect in applied:
+            if entity is order[position] and remaining[id(effect)] > 0:
+                remaining[id(effect)] -= 1
+                if remaining[id(effect)] == 0:
+                    expected.append((turn, effect.name))
+    
+    observed = []
+    active = {id(effect) for _, effect in applied}
+    for turn in range(1, 4 * len(order)):
+        engine.next_turn()
+        for entity, effect in applied:
+            if id(effect) in active and effect not in entity.effects:
+                active.discard(id(effect))
+                observed.append((turn, effect.name))
+                assert effect.remaining_turns == 0
+    
+    assert observed == expected and len(observed) == len(applied)
+    assert all(entity.get_effect_modifier("ataque") == 0 for entity in order)
@@ -0,0 +1,60 @@
+# tests/test_log_segments.py
+import gzip
+
+import pytest
+
+from persistence.log_segments import SegmentedCombatLogger
+
+
+def _messages(lines):
+    """Mensajes sin la marca de tiempo."""
+    return [line.split("] ", 1)[1].rstrip("\n") for line in lines]
+
+
+@pytest.mark.parametrize("buffered", [False, True])
+def test_encounters_read_back_through_the_index(tmp_path, buffered):
+    """Cada encuentro se lee por su entrada del índice, aunque los segmentos roten."""
+    logger = SegmentedCombatLogger(str(tmp_path), max_segment_bytes=400, buffered=buffered)
+    logged = {}
+    try:
+        for encounter in range(1, 9):
+            logger.start_encounter()
+            logged[encounter] = [f"Encuentro {encounter}: {actor} ataca ({roll * encounter})"
+                                 for roll, actor in enumerate(("Ñandú", "Gnoll", "Héroe") * encounter)]
+            for message in logged[encounter]:
+                logger.log(message)
+            logger.end_encounter()
+
+        logger.start_encounter()
+        logger.log("En curso")
+        logger.flush()
+
+        assert logger.count_encounters() == 8
+        entries = [logger.get_index_entry(encounter) for encounter in range(1, 9)]
+        assert [entry["encounter_id"] for entry in entries] == list(range(1, 9))
+        assert entries[-1]["segment"] > 1
+
+        for encounter in range(1, 9):
+            assert _messages(logger.read_encounter(encounter)) == logged[encounter]
+        assert logger.read_encounter(9) == [] and logger.get_index_entry(0) is None
+
+        # Cada segmento es un gzip válido con sus encuentros contiguos y en orden
+        for segment in sorted({entry["segment"] for entry in entries}):
+            members = [entry for entry in entries if entry["segment"] == segment]
+            assert members[0]["offset"] == 0
+            for previous, current in zip(members, members[1:]):
+                assert current["offset"] == previous["offset"] + previous["length"]
+            with gzip.open(logger.segment_path(segment), 'rt', encoding='utf-8') as f:
+                expected = [message for entry in members for message in logged[entry["encounter_id"]]]
+                assert _messages(f.readlines()) == expected
+            if len(members) > 1:
+                assert members[-1]["offset"] + members[-1]["length"] <= 400
+
+        assert logger.find_encounter_at(entries[0]["timestamp"] - 1) is None
+        assert logger.find_encounter_at(entries[4]["timestamp"]) >= 5
+        assert logger.find_encounter_at(entries[-1]["timestamp"] + 60) == 8
+
+        # Las últimas entradas se completan con el último encuentro cerrado
+        assert _messages(logger.get_last_entries(3)) == logged[8][-2:] + ["En curso"]
+    finally:
+        logger.close()
@@ -0,0 +1,105 @@
+# tests/test_models.py
+import copy
+
+import pytest
+
+from core.rng import CombatRNG
+from models.character import Character
+from models.effect import Effect
+from models.monster import Monster
+from models.spell import Spell
+
+_HEX = {"name": "Rayo maléfico", "description": "", "spell_type": "Ofensivo", "level": 1,
+        "attack_roll": True, "damage_dice": "1d10", "damage_type": "necrótico",
+        "effects": [{"name": "ceguera", "description": "", "duration": 2, "effect_type": "negativo",
+                     "modifier": "ataque", "attribute": "FU", "value": -2}]}
+
+
+def _slots(obj):
+    """Todos los atributos declarados en los __slots__ de la clase y sus bases."""
+    return {name for cls in type(obj).__mro__ for name in getattr(cls, "__slots__", ())
+            if name != "__weakref__"}
+
+
+def _character():
+    character = Character("Aria", 30, 14, 10, 14, 12, 16, 10, 8, level=3)
+    character.add_weapon({"name": "Daga", "type": "melee", "damage_dice": "1d4", "finesse": True})
+    character.spells = [Spell.from_dict(_HEX)]
+    character.current_hp = 17
+    Effect("Bendecido", "", 3, "positivo", modifier="ataque", value=2).apply(character)
+    return character
+
+
+def _monster():
+    monster = Monster(name="Gnoll", max_hp=20, armor_class=13, initiative_mod=1, attack_bonus=4,
+                      damage_dice="1d8", damage_bonus=2, challenge_rating=2)
+    monster.spells = [Spell.from_dict(_HEX)]
+    monster.spell_slots = {1: 2}
+    Effect("Ceguera", "", 2, "negativo", modifier="ataque", attribute="FU", value=-2).apply(monster)
+    return monster
+
+
+@pytest.mark.parametrize("make", [_character, _monster])
+def test_entities_round_trip_and_clone(make):
+    """Las entidades con __slots__ sobreviven a to_dict/from_dict y clone sin perder atributos."""
+    entity = make()
+    assert not hasattr(entity, "__dict__")
+    data = entity.to_dict()
+
+    restored = type(entity).from_dict(copy.deepcopy(data))
+    assert restored.to_dict() == data
+    assert all(hasattr(restored, name) for name in _slots(entity))
+    assert restored.modifiers == entity.modifiers and restored.get_attack_profile() == entity.get_attack_profile()
+
+    clone = entity.clone()
+    assert clone.to_dict() == data
+    for name in _slots(entity) - {"effects"}:
+        assert getattr(clone, name) == getattr(entity, name), name
+    assert [effect.to_dict() for effect in clone.effects] == [effect.to_dict() for effect in entity.effects]
+
+    # Lo que el combate modifica en su sitio no se comparte con el original
+    clone.take_damage(5)
+    clone.spell_slots[1] = 0
+    clone.effects[0].expire(clone)
+    assert entity.to_dict() == data
+    assert entity.effects[0].remaining_turns > 0 and entity.modifiers.get("ataque")
+
+
+def test_effect_and_spell_round_trip():
+    """Effect y Spell conservan todos sus campos, incluidos turnos restantes y vencimiento."""
+    effect = Effect("Ceguera", "No ve", 3, "negativo", modifier="ataque", attribute="FU", value=-2)
+    effect.remaining_turns = 1
+    effect.expires_at = (4, 2)
+    assert not hasattr(effect, "__dict__")
+    restored = Effect.from_dict(copy.deepcopy(effect.to_dict()))
+    assert restored.to_dict() == effect.to_dict() and restored.expires_at == (4, 2)
+
+    duplicate = effect.copy()
+    duplicate.remaining_turns = 0
+    assert effect.remaining_turns == 1 and all(hasattr(duplicate, name) for name in _slots(effect))
+
+    spell = Spell.from_dict(_HEX)
+    assert not hasattr(spell, "__dict__")
+    assert Spell.from_dict(spell.to_dict()).to_dict() == spell.to_dict()
+
+
+def test_shared_spell_is_not_changed_by_one_owner():
+    """Un hechizo compartido entre entidades cargadas no cambia por lo que haga una de ellas."""
+    data = _character().to_dict()
+    first, second = Character.from_dict(copy.deepcopy(data)), Character.from_dict(copy.deepcopy(data))
+    spell = first.spells[0]
+    assert second.spells[0] is spell and Spell.shared_from_dict(spell.to_dict()) is spell
+    before = copy.deepcopy(spell.to_dict())
+
+    # Lanzarlo a nivel superior y aplicar (y agotar) su efecto
+    target = _monster()
+    for seed in range(10):
+        first.spell_slots[2] = 1
+        first.cast_spell(spell, target, spell_level=2, rng=CombatRNG(seed))
+    for effect in list(target.effects):
+        effect.expire(target)
+
+    first.remove_spell(spell.name)
+    first.add_spell(Spell.from_dict(dict(_HEX, name="Otro")))
+    assert [s.name for s in first.spells] == ["Otro"]
+    assert second.spells == [spell] and spell.to_dict() == before
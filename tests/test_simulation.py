@@ -0,0 +1,44 @@
+# tests/test_simulation.py
+from core.simulation import simulate, split_runs
+from models.character import Character
+from models.monster import Monster
+
+
+def _party():
+    fighter = Character("Brenna", 28, 16, 16, 12, 14, 10, 10, 8, level=3)
+    fighter.add_weapon({"name": "Espada larga", "type": "melee", "damage_dice": "1d8", "finesse": False})
+    rogue = Character("Tomas", 22, 14, 10, 16, 12, 12, 10, 10, level=3)
+    rogue.add_weapon({"name": "Estoque", "type": "melee", "damage_dice": "1d8", "finesse": True})
+    return [fighter, rogue]
+
+
+def _monsters():
+    return [Monster(name=f"Gnoll {index}", max_hp=22, armor_class=15, initiative_mod=1,
+                    attack_bonus=4, damage_dice="1d8", damage_bonus=2, challenge_rating=1)
+            for index in range(3)]
+
+
+def test_split_runs_covers_every_index_once():
+    """Los bloques son contiguos y cubren todos los combates una sola vez."""
+    for n_runs, n_chunks in ((10, 3), (3, 8), (1, 1), (17, 17)):
+        chunks = split_runs(n_runs, n_chunks)
+        assert chunks[0][0] == 0 and chunks[-1][1] == n_runs
+        assert all(stop == start for (_, stop), (start, _) in zip(chunks, chunks[1:]))
+
+
+def test_seeded_simulation_is_identical_for_any_worker_count():
+    """Con la misma semilla, los resultados no dependen del número de procesos."""
+    party, monsters = _party(), _monsters()
+    serial = simulate(party, monsters, 24, seed=1234, workers=1)
+    assert 0 < serial["wins"] < serial["runs"], "el encuentro debería estar equilibrado"
+    
+    for workers in (2, 3):
+        assert simulate(party, monsters, 24, seed=1234, workers=workers) == serial
+
+
+def test_simulation_leaves_the_originals_untouched():
+    """Cada combate usa copias: las entidades originales siguen intactas."""
+    party, monsters = _party(), _monsters()
+    simulate(party, monsters, 5, seed=7)
+    assert [char.current_hp for char in party] == [char.max_hp for char in party]
+    assert [monster.current_hp for monster in monsters] == [monster.max_hp for monster in monsters]
@@ -0,0 +1,100 @@
+# tests/test_undo.py
+from conftest import combat_state, play_turns
+from core.replay import CombatReplay
+from core.simulation import take_monster_turn
+
+
+def test_undo_and_redo_round_trip_every_step(make_engine):
+    """Deshacer paso a paso recorre los estados al revés y rehacer vuelve al final."""
+    engine = make_engine(seed=11)
+    start = combat_state(engine)
+    play_turns(engine, 40)
+    final = combat_state(engine)
+    steps = len(engine.history.undo_stack)
+    assert steps > 40
+    
+    undone = []
+    while engine.history.can_undo():
+        engine.undo()
+        undone.append(combat_state(engine))
+    assert len(undone) == steps
+    
+    redone = []
+    while engine.history.can_redo():
+        engine.redo()
+        redone.append(combat_state(engine))
+    assert redone == undone[-2::-1] + [final]
+    
+    # El primer paso es la tirada de iniciativa de make_engine
+    while engine.history.can_undo():
+        engine.undo()
+    engine.redo()
+    assert combat_state(engine) == start
+
+
+def test_undone_action_repeats_with_the_same_rolls(make_engine):
+    """Deshacer devuelve el generador atrás: repetir la acción da el mismo resultado."""
+    engine = make_engine(seed=2)
+    attacker, target = engine.characters[0], engine.monsters[0]
+    before = combat_state(engine)
+    
+    first = engine.attack(attacker, target)
+    after = combat_state(engine)
+    engine.undo()
+    assert combat_state(engine) == before
+    assert engine.attack(attacker, target) == first
+    assert combat_state(engine) == after
+
+
+def test_new_action_discards_redo(make_engine):
+    """Una acción nueva tras deshacer descarta los pasos que se podían rehacer."""
+    engine = make_engine(seed=2)
+    play_turns(engine, 6)
+    engine.undo()
+    engine.undo()
+    assert engine.history.can_redo()
+    
+    play_turns(engine, 1)
+    assert not engine.history.can_redo()
+    assert engine.redo() == "No hay acciones para rehacer."
+
+
+def test_replay_matches_after_undo_and_divergence(make_engine):
+    """El registro de acciones también se deshace, así que la repetición sigue siendo válida."""
+    engine = make_engine(seed=11)
+    play_turns(engine, 20)
+    for _ in range(5):
+        engine.undo()
+    play_turns(engine, 10)
+    
+    replayed = CombatReplay.from_engine(engine).run()
+    assert combat_state(replayed) == combat_state(engine)
+
+
+
+def test_replay_matches_after_redoing_a_monster_turn_differently(make_engine):
+    """Elegir la acción de un monstruo con pasos por rehacer también queda en el registro."""
+    engine = make_engine(seed=11)
+    play_turns(engine, 7)
+    while engine.get_current_entity() not in engine.monsters:
+        play_turns(engine, 1)
+    monster = engine.get_current_entity()
+    
+    take_monster_turn(engine, monster)
+    engine.undo()
+    assert engine.history.can_redo()
+    take_monster_turn(engine, monster)
+    assert not engine.history.can_redo()
+    engine.undo()
+    engine.undo()
+    play_turns(engine, 10)
+    
+    replayed = CombatReplay.from_engine(engine).run()
+    assert combat_state(replayed) == combat_state(engine)
+
+def test_engine_without_history(make_engine):
+    """Con undo=False no se registra ningún paso."""
+    engine = make_engine(seed=2, undo=False)
+    play_turns(engine, 6)
+    assert engine.history is None
+    assert engine.undo() == "No hay acciones para deshacer."
@@ -1,6 +1,6 @@
 # ui/cheat_menu.py
 import os
-import random
+from core.dice import Dice
 from models.effect import Effect
 from models.spell import Spell
 from models.spellbook import SpellBook
@@ -135,17 +135,11 @@ class CheatMenu:
             d20_value = int(input("\nValor forzado para d20 (1-20, 0 para aleatorio): ").strip())
             
             if 0 <= d20_value <= 20:
-                # Monkey patch la función random.randint
-                original_randint = random.randint
-                
-                def patched_randint(a, b):
-                    if a == 1 and b == 20:
-                        # Restaurar la función original después de usarla
-                        random.randint = original_randint
-                        return d20_value
-                    return original_randint(a, b)
-                
-                random.randint = patched_randint
+                # El motor los pasa a su generador y los registra para la repetición
+                if d20_value:
+                    self.combat_engine.force_d20(d20_value)
+                else:
+                    self.combat_engine.force_d20()
                 
                 if d20_value == 0:
                     print("\nLa próxima tirada de d20 será aleatoria.")
@@ -259,7 +253,7 @@ class CheatMenu:
                         import re
                         new_dice = input(f"Nuevos dados de daño (actual: {entity.damage_dice}): ").strip()
                         # Validar formato de dados
-                        if re.match(r"\d+d\d+", new_dice):
+                        if Dice.is_valid(new_dice):
                             entity.damage_dice = new_dice
                             print(f"\nDados de daño de {entity.name} modificados a {new_dice}.")
                         else:
@@ -483,6 +477,7 @@ class CheatMenu:
             
             # Aplicar el efecto
             result = effect.apply(entity)
+            self.combat_engine.schedule_effect(entity, effect)
             print(f"\n{result}")
         
         except ValueError:
@@ -505,7 +500,7 @@ class CheatMenu:
         print(f"\nEfectos activos en {entity.name}:")
         
         for i, effect in enumerate(entity.effects, 1):
-            remaining = " (Permanente)" if effect.duration == -1 else f" ({effect.remaining_turns} turnos restantes)"
+            remaining = " (Permanente)" if effect.duration == -1 else f" ({self.combat_engine.effect_remaining_turns(effect)} turnos restantes)"
             print(f"{i}. {effect.name}{remaining}: {effect.description}")
         
         try:
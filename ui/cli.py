@@ -1,14 +1,16 @@
 # ui/cli.py
+import datetime
 import os
 import re
-import random
 # Importaciones absolutas
 from core.dice import Dice
 from models.character import Character
 from models.monster import Monster
 from ui.spell_manager import SpellManager
 from core.combat_engine import CombatEngine
+from persistence.combat_snapshot import read_timestamp
 from persistence.data_manager import DataManager
+from persistence.log_segments import SegmentedCombatLogger
 from ui.cheat_menu import CheatMenu
 
 
@@ -16,7 +18,7 @@ class CLI:
     """Interfaz de línea de comandos para la aplicación de combate."""
     
     def __init__(self):
-        self.combat_engine = CombatEngine()
+        self.combat_engine = CombatEngine(logger=SegmentedCombatLogger())
         self.data_manager = DataManager()
         self.cheat_menu = CheatMenu(self.combat_engine)
         self.running = True
@@ -96,12 +98,13 @@ class CLI:
         self.print_header("Gestión de Personajes")
         
         while True:
-            characters = self.data_manager.load_characters()
+            # Solo el índice: los personajes se construyen al elegir uno
+            characters = self.data_manager.load_character_index()
             
             print("Personajes Disponibles:")
             if characters:
-                for i, character in enumerate(characters, 1):
-                    print(f"{i}. {character.name} (Nivel {character.level})")
+                for i, entry in enumerate(characters, 1):
+                    print(f"{i}. {entry['name']} (Nivel {entry['level']})")
             else:
                 print("No hay personajes guardados.")
             
@@ -177,7 +180,7 @@ class CLI:
             weapon_name = self.get_input("Nombre del arma: ", lambda x: len(x) > 0)
             weapon_type = self.get_input("Tipo de arma (melee/ranged): ", lambda x: x in ["melee", "ranged"])
             weapon_damage_dice = self.get_input("Dados de daño (ej. 1d6, 2d8): ", 
-                                               lambda x: re.match(r"\d+d\d+", x))
+                                               lambda x: Dice.is_valid(x))
             
             weapon = {
                 "name": weapon_name,
@@ -218,13 +221,16 @@ class CLI:
         self.print_header("Detalles de Personaje")
         
         # Seleccionar personaje
-        for i, character in enumerate(characters, 1):
-            print(f"{i}. {character.name}")
+        for i, entry in enumerate(characters, 1):
+            print(f"{i}. {entry['name']}")
         
         choice = int(self.get_input("\nSelecciona un personaje: ", 
                                    lambda x: x.isdigit() and 1 <= int(x) <= len(characters)))
         
-        character = characters[choice - 1]
+        character = self.data_manager.load_character(characters[choice - 1])
+        if character is None:
+            input("Presiona Enter para continuar...")
+            return
         
         self.print_header(f"Detalles de {character.name}")
         
@@ -282,13 +288,16 @@ class CLI:
         self.print_header("Editar Personaje")
         
         # Seleccionar personaje
-        for i, character in enumerate(characters, 1):
-            print(f"{i}. {character.name}")
+        for i, entry in enumerate(characters, 1):
+            print(f"{i}. {entry['name']}")
         
         choice = int(self.get_input("\nSelecciona un personaje: ", 
                                    lambda x: x.isdigit() and 1 <= int(x) <= len(characters)))
         
-        character = characters[choice - 1]
+        character = self.data_manager.load_character(characters[choice - 1])
+        if character is None:
+            input("Presiona Enter para continuar...")
+            return
         
         self.print_header(f"Editar {character.name}")
         
@@ -343,7 +352,7 @@ class CLI:
                 weapon_name = self.get_input("Nombre del arma: ", lambda x: len(x) > 0)
                 weapon_type = self.get_input("Tipo de arma (melee/ranged): ", lambda x: x in ["melee", "ranged"])
                 weapon_damage_dice = self.get_input("Dados de daño (ej. 1d6, 2d8): ", 
-                                                  lambda x: re.match(r"\d+d\d+", x))
+                                                  lambda x: Dice.is_valid(x))
                 
                 weapon = {
                     "name": weapon_name,
@@ -414,24 +423,21 @@ class CLI:
         self.print_header("Eliminar Personaje")
         
         # Seleccionar personaje
-        for i, character in enumerate(characters, 1):
-            print(f"{i}. {character.name}")
+        for i, entry in enumerate(characters, 1):
+            print(f"{i}. {entry['name']}")
         
         choice = int(self.get_input("\nSelecciona un personaje a eliminar: ", 
                                    lambda x: x.isdigit() and 1 <= int(x) <= len(characters)))
         
-        character = characters[choice - 1]
+        entry = characters[choice - 1]
         
-        confirm = self.get_input(f"¿Estás seguro de que deseas eliminar a {character.name}? (s/n): ", 
+        confirm = self.get_input(f"¿Estás seguro de que deseas eliminar a {entry['name']}? (s/n): ", 
                                lambda x: x.lower() in ["s", "n"])
         
         if confirm.lower() == "s":
-            # Eliminar personaje de la lista
-            characters.pop(choice - 1)
-            
-            # Guardar la lista actualizada
-            if self.data_manager.save_characters(characters):
-                print(f"\nPersonaje {character.name} eliminado con éxito!")
+            # Eliminar el personaje y guardar la lista actualizada
+            if self.data_manager.delete_character(entry):
+                print(f"\nPersonaje {entry['name']} eliminado con éxito!")
             else:
                 print("\nError al eliminar el personaje.")
         else:
@@ -444,12 +450,13 @@ class CLI:
         self.print_header("Gestión de Monstruos")
         
         while True:
-            monsters = self.data_manager.load_monsters()
+            # Solo el índice: los monstruos se construyen al elegir uno
+            monsters = self.data_manager.load_monster_index()
             
             print("Monstruos Disponibles:")
             if monsters:
-                for i, monster in enumerate(monsters, 1):
-                    print(f"{i}. {monster.name} (CR {monster.challenge_rating})")
+                for i, entry in enumerate(monsters, 1):
+                    print(f"{i}. {entry['name']} (CR {entry['challenge_rating']})")
             else:
                 print("No hay monstruos guardados.")
             
@@ -501,7 +508,7 @@ class CLI:
             
             # Estadísticas de ataque
             attack_bonus = int(self.get_input("Bono de ataque: ", lambda x: x.isdigit() or (x.startswith("-") and x[1:].isdigit())))
-            damage_dice = self.get_input("Dados de daño (ej. 1d6, 2d8): ", lambda x: re.match(r"\d+d\d+", x))
+            damage_dice = self.get_input("Dados de daño (ej. 1d6, 2d8): ", lambda x: Dice.is_valid(x))
             damage_bonus = int(self.get_input("Bono de daño: ", lambda x: x.isdigit() or (x.startswith("-") and x[1:].isdigit())))
             
             # Información adicional
@@ -537,13 +544,16 @@ class CLI:
         self.print_header("Detalles de Monstruo")
         
         # Seleccionar monstruo
-        for i, monster in enumerate(monsters, 1):
-            print(f"{i}. {monster.name}")
+        for i, entry in enumerate(monsters, 1):
+            print(f"{i}. {entry['name']}")
         
         choice = int(self.get_input("\nSelecciona un monstruo: ", 
                                    lambda x: x.isdigit() and 1 <= int(x) <= len(monsters)))
         
-        monster = monsters[choice - 1]
+        monster = self.data_manager.load_monster(monsters[choice - 1])
+        if monster is None:
+            input("Presiona Enter para continuar...")
+            return
         
         self.print_header(f"Detalles de {monster.name}")
         
@@ -585,13 +595,16 @@ class CLI:
         self.print_header("Editar Monstruo")
         
         # Seleccionar monstruo
-        for i, monster in enumerate(monsters, 1):
-            print(f"{i}. {monster.name}")
+        for i, entry in enumerate(monsters, 1):
+            print(f"{i}. {entry['name']}")
         
         choice = int(self.get_input("\nSelecciona un monstruo: ", 
                                    lambda x: x.isdigit() and 1 <= int(x) <= len(monsters)))
         
-        monster = monsters[choice - 1]
+        monster = self.data_manager.load_monster(monsters[choice - 1])
+        if monster is None:
+            input("Presiona Enter para continuar...")
+            return
         
         self.print_header(f"Editar {monster.name}")
         
@@ -629,7 +642,7 @@ class CLI:
                 attack_bonus = int(self.get_input(f"Nuevo bono de ataque (actual: {monster.attack_bonus}): ", 
                                                 lambda x: x.isdigit() or (x.startswith("-") and x[1:].isdigit())))
                 damage_dice = self.get_input(f"Nuevos dados de daño (actual: {monster.damage_dice}): ", 
-                                            lambda x: re.match(r"\d+d\d+", x))
+                                            lambda x: Dice.is_valid(x))
                 damage_bonus = int(self.get_input(f"Nuevo bono de daño (actual: {monster.damage_bonus}): ", 
                                                 lambda x: x.isdigit() or (x.startswith("-") and x[1:].isdigit())))
                 
@@ -676,24 +689,21 @@ class CLI:
         self.print_header("Eliminar Monstruo")
         
         # Seleccionar monstruo
-        for i, monster in enumerate(monsters, 1):
-            print(f"{i}. {monster.name}")
+        for i, entry in enumerate(monsters, 1):
+            print(f"{i}. {entry['name']}")
         
         choice = int(self.get_input("\nSelecciona un monstruo a eliminar: ", 
                                    lambda x: x.isdigit() and 1 <= int(x) <= len(monsters)))
         
-        monster = monsters[choice - 1]
+        entry = monsters[choice - 1]
         
-        confirm = self.get_input(f"¿Estás seguro de que deseas eliminar a {monster.name}? (s/n): ", 
+        confirm = self.get_input(f"¿Estás seguro de que deseas eliminar a {entry['name']}? (s/n): ", 
                                lambda x: x.lower() in ["s", "n"])
         
         if confirm.lower() == "s":
-            # Eliminar monstruo de la lista
-            monsters.pop(choice - 1)
-            
-            # Guardar la lista actualizada
-            if self.data_manager.save_monsters(monsters):
-                print(f"\nMonstruo {monster.name} eliminado con éxito!")
+            # Eliminar el monstruo y guardar la lista actualizada
+            if self.data_manager.delete_monster(entry):
+                print(f"\nMonstruo {entry['name']} eliminado con éxito!")
             else:
                 print("\nError al eliminar el monstruo.")
         else:
@@ -706,11 +716,14 @@ class CLI:
         self.print_header("Preparar Combate")
         
         # Reiniciar el motor de combate
-        self.combat_engine = CombatEngine()
+        self.combat_engine = CombatEngine(logger=SegmentedCombatLogger())
+        self.combat_engine.autosave = self.data_manager.autosave_combat
+        self.cheat_menu.combat_engine = self.combat_engine
         
         # Cargar personajes y monstruos disponibles
-        available_characters = self.data_manager.load_characters()
-        available_monsters = self.data_manager.load_monsters()
+        # Solo los índices; se construyen las entidades elegidas
+        available_characters = self.data_manager.load_character_index()
+        available_monsters = self.data_manager.load_monster_index()
         
         if not available_characters:
             print("No hay personajes disponibles. Crea personajes primero.")
@@ -724,8 +737,8 @@ class CLI:
         
         # Seleccionar personajes para el combate
         print("Selecciona los personajes para el combate:")
-        for i, character in enumerate(available_characters, 1):
-            print(f"{i}. {character.name} (Nivel {character.level})")
+        for i, entry in enumerate(available_characters, 1):
+            print(f"{i}. {entry['name']} (Nivel {entry['level']})")
         
         selected_characters = []
         while True:
@@ -735,9 +748,11 @@ class CLI:
             if choice == "0":
                 break
             
-            character_index = int(choice) - 1
-            selected_characters.append(available_characters[character_index])
-            print(f"{available_characters[character_index].name} añadido al combate.")
+            character = self.data_manager.load_character(available_characters[int(choice) - 1])
+            if character is None:
+                continue
+            selected_characters.append(character)
+            print(f"{character.name} añadido al combate.")
         
         if not selected_characters:
             print("No se seleccionaron personajes. Volviendo al menú principal.")
@@ -750,8 +765,8 @@ class CLI:
         
         # Seleccionar monstruos para el combate
         print("\nSelecciona los monstruos para el combate:")
-        for i, monster in enumerate(available_monsters, 1):
-            print(f"{i}. {monster.name} (CR {monster.challenge_rating})")
+        for i, entry in enumerate(available_monsters, 1):
+            print(f"{i}. {entry['name']} (CR {entry['challenge_rating']})")
         
         selected_monsters = []
         while True:
@@ -761,8 +776,9 @@ class CLI:
             if choice == "0":
                 break
             
-            monster_index = int(choice) - 1
-            monster = available_monsters[monster_index]
+            monster = self.data_manager.load_monster(available_monsters[int(choice) - 1])
+            if monster is None:
+                continue
             
             # Preguntar cuántas instancias de este monstruo añadir
             count = int(self.get_input(f"¿Cuántos {monster.name} quieres añadir? ", 
@@ -849,11 +865,13 @@ class CLI:
             "6": "Ver estado del combate",
             "7": "Guardar combate",
             "8": "Menú de trampas",
-            "9": "Terminar combate"
+            "9": "Terminar combate",
+            "10": "Deshacer última acción",
+            "11": "Rehacer acción"
         })
         
         choice = self.get_input("Elige una acción: ", 
-                              lambda x: x in ["1", "2", "3", "4", "5", "6", "7", "8", "9"])
+                              lambda x: x in ["1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11"])
         
         if choice == "1":  # Atacar
             # Mostrar objetivos disponibles
@@ -1038,7 +1056,7 @@ class CLI:
                 print(f"\n{character.name} intenta lanzar {selected_spell.name}...")
                 input("Presiona Enter para continuar...")
                 
-                spell_result = character.cast_spell(selected_spell, target, cast_level)
+                spell_result = self.combat_engine.cast_spell(character, selected_spell, target, cast_level)
                 print(f"\n{spell_result}")
             
             except ValueError as e:
@@ -1063,6 +1081,9 @@ class CLI:
         
         elif choice == "7":  # Guardar combate
             save_result = self.data_manager.save_combat_state(self.combat_engine)
+            # La repetición solo existe para combates iniciados en esta sesión
+            if save_result and self.combat_engine.combat_seed is not None:
+                save_result = self.data_manager.save_combat_replay(self.combat_engine)
             if save_result:
                 print("\nCombate guardado con éxito!")
             else:
@@ -1088,6 +1109,15 @@ class CLI:
                 # No avanzar al siguiente turno
                 return
         
+        elif choice in ["10", "11"]:  # Deshacer / rehacer
+            if choice == "10":
+                print(f"\n{self.combat_engine.undo()}")
+            else:
+                print(f"\n{self.combat_engine.redo()}")
+            input("Presiona Enter para continuar...")
+            # El turno puede haber cambiado: volver al bucle de combate
+            return
+        
         # Avanzar al siguiente turno si no se ha terminado el combate
         if self.combat_engine.combat_active:
             input("\nPresiona Enter para continuar al siguiente turno...")
@@ -1097,45 +1127,24 @@ class CLI:
         """Manejar el turno de un monstruo."""
         print(f"\nEs el turno de {monster.name}")
         
-        # Determinar si tiene hechizos disponibles
-        has_spells = hasattr(monster, 'spells') and monster.spells
+        # El motor decide entre ataque normal o hechizo y elige el objetivo
+        spell, target = self.combat_engine.choose_monster_action(monster)
         
-        # Si tiene hechizos, elegir entre ataque normal o hechizo
-        if has_spells and random.random() < 0.3:  # 30% de probabilidad de lanzar hechizo
-            # Elegir un hechizo aleatorio
-            spell = random.choice(monster.spells)
-            
-            # Elegir un objetivo para el hechizo
-            alive_characters = [char for char in self.combat_engine.characters if char.is_alive]
-            
-            if not alive_characters:
-                print(f"{monster.name} no tiene objetivos disponibles.")
-                input("Presiona Enter para continuar...")
-                self.combat_engine.next_turn()
-                return
-            
-            # Seleccionar un personaje como objetivo
-            target = random.choice(alive_characters)
-            
+        if not target:
+            print(f"{monster.name} no tiene objetivos disponibles.")
+            input("Presiona Enter para continuar...")
+            self.combat_engine.next_turn()
+            return
+        
+        if spell:
             print(f"{monster.name} lanza {spell.name} a {target.name}...")
             input("Presiona Enter para continuar...")
             
             # Lanzar el hechizo
-            spell_result = monster.cast_spell(spell, target)
+            spell_result = self.combat_engine.cast_spell(monster, spell, target)
             print(f"\n{spell_result}")
         else:
             # Ataque normal
-            alive_characters = [char for char in self.combat_engine.characters if char.is_alive]
-            
-            if not alive_characters:
-                print(f"{monster.name} no tiene objetivos disponibles.")
-                input("Presiona Enter para continuar...")
-                self.combat_engine.next_turn()
-                return
-            
-            # Seleccionar un personaje aleatorio como objetivo
-            target = random.choice(alive_characters)
-            
             print(f"{monster.name} ataca a {target.name}...")
             input("Presiona Enter para continuar...")
             
@@ -1151,14 +1160,29 @@ class CLI:
         """Cargar un combate guardado."""
         self.print_header("Cargar Combate Guardado")
         
-        if not os.path.exists(self.data_manager.combat_state_file):
+        has_state = self.data_manager.has_combat_state()
+        has_autosave = self.data_manager.has_combat_autosave()
+        if not has_state and not has_autosave:
             print("No hay combates guardados disponibles.")
             input("Presiona Enter para continuar...")
             return
         
+        # Elegir entre el combate guardado y el autoguardado del último turno
+        filename = None
+        if has_autosave:
+            saved_at = datetime.datetime.fromtimestamp(read_timestamp(self.data_manager.combat_autosave_file))
+            print(f"Hay un autoguardado del {saved_at.strftime('%Y-%m-%d %H:%M:%S')}.")
+            if not has_state or self.get_input("¿Cargar el autoguardado? (s/n): ").lower() == "s":
+                filename = self.data_manager.combat_autosave_file
+        
         # Intentar cargar el estado del combate
-        self.combat_engine = CombatEngine()
-        if self.data_manager.load_combat_state(self.combat_engine):
+        self.combat_engine = CombatEngine(logger=SegmentedCombatLogger())
+        self.combat_engine.autosave = self.data_manager.autosave_combat
+        self.cheat_menu.combat_engine = self.combat_engine
+        if self.data_manager.load_combat_state(self.combat_engine, filename):
+            # El combate restaurado no pasa por start_combat: abrir aquí su segmento del log
+            if self.combat_engine.combat_active:
+                self.combat_engine.logger.start_encounter()
             print("Combate cargado con éxito!")
             input("Presiona Enter para continuar el combate...")
             self.run_combat()
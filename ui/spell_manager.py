@@ -1,6 +1,7 @@
 # ui/spell_manager.py
 import os
 import re
+from core.dice import Dice
 from models.spell import Spell
 from models.spellbook import SpellBook
 
@@ -215,11 +216,11 @@ class SpellManager:
             
             if spell_effect == "daño":
                 damage_dice = self.get_input("Dados de daño (ej. 2d6, 1d8): ", 
-                                           lambda x: re.match(r"\d+d\d+", x))
+                                           lambda x: Dice.is_valid(x))
                 damage_type = self.get_input("Tipo de daño (fuego, frío, contundente, etc.): ")
             elif spell_effect == "curación":
                 healing_dice = self.get_input("Dados de curación (ej. 1d8+modificador, 2d4): ", 
-                                           lambda x: re.match(r"\d+d\d+", x) or "modificador" in x.lower())
+                                           lambda x: Dice.is_valid(x))
             
             # Área de efecto
             has_aoe = self.get_input("¿Tiene área de efecto? (s/n): ", lambda x: x.lower() in ["s", "n"]).lower() == "s"
@@ -399,7 +400,7 @@ class SpellManager:
             if spell_effect == "daño":
                 damage_dice = self.get_input(
                     f"Dados de daño ({damage_dice or ''}): ", 
-                    lambda x: x == "" or re.match(r"\d+d\d+", x)
+                    lambda x: x == "" or Dice.is_valid(x)
                 ) or damage_dice
                 
                 damage_type = self.get_input(f"Tipo de daño ({damage_type or ''}): ") or damage_type
@@ -407,7 +408,7 @@ class SpellManager:
             elif spell_effect == "curación":
                 healing_dice = self.get_input(
                     f"Dados de curación ({healing_dice or ''}): ", 
-                    lambda x: x == "" or re.match(r"\d+d\d+", x) or "modificador" in x.lower()
+                    lambda x: x == "" or Dice.is_valid(x)
                 ) or healing_dice
                 
                 damage_dice = None